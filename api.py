@@ -0,0 +1,418 @@
+"""
+UC Schools Admission Rankings JSON API
+Headless access to the dashboard's data for other tools
+
+Serves rankings, school records, comparisons and analytics as JSON from the
+same data engine as the Streamlit app (hot-reloading snapshot, key index,
+aggregates and sketches). Responses carry an ETag and Last-Modified derived
+from the dataset version and are cached in memory per version.
+
+Run with:  python api.py --port 8502
+"""
+
+import argparse
+import email.utils
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from data_store import ALL_ROWS, HISTOGRAM_EDGES, build_catalogs, compute_analytics, filter_rankings
+from datasets import MANIFEST_PATH, DatasetRegistry
+from pivot import DIMENSIONS, MEASURES, PivotEngine
+from exports import (
+    FORMATS, ExportCache, available_formats, content_disposition, export_filename, split_frame
+)
+from sketches import build_sketches
+from streaming import filter_chunks, iter_chunks
+
+
+RESPONSE_CACHE_SIZE = 1024
+MAX_LIMIT = 1000
+
+
+def to_records(df):
+    """JSON-ready records (NaN -> null, numpy scalars -> Python)"""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, pd.DataFrame):
+        return to_records(value)
+    if isinstance(value, pd.Series):
+        return _json_default(value.to_frame().T)[0]
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ResponseCache:
+    """Bounded LRU of encoded responses keyed by (version, request)"""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DataApi:
+    """Query layer over the registry's datasets (live snapshots or streaming aggregates)
+
+    Every endpoint takes an optional ``dataset`` parameter (an id from the
+    manifest); without it the default dataset is served.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.cache = ResponseCache()
+        self.exports = ExportCache()
+
+    def dataset(self, query):
+        dataset_id = query.get('dataset', [None])[-1]
+        try:
+            return self.registry.get(dataset_id)
+        except KeyError:
+            raise ApiError(404, f"Unknown dataset {dataset_id!r}")
+
+    def pin(self, query):
+        """Pin the data for one request: (dataset, version, modified, snapshot, aggregates)"""
+        dataset = self.dataset(query)
+        return (dataset, *dataset.pin())
+
+    # ----- Endpoints -----
+
+    def rankings(self, params, snapshot, agg):
+        college = params.get('college', "All UC")
+        school_type = params.get('type', "All")
+        city = params.get('city', "All Cities")
+        limit = _int_param(params, 'limit', 50)
+        if agg is not None:
+            rows = agg.leaderboard(college, school_type, city).head(limit)
+        else:
+            rows = filter_rankings(snapshot.df, college, school_type, city, limit)
+        return {'college': college, 'type': school_type, 'city': city, 'count': len(rows), 'schools': rows}
+
+    def schools(self, params, snapshot, agg):
+        college = params.get('college', "All UC")
+        if agg is not None:
+            names = agg.school_names(college)
+        else:
+            df = snapshot.df
+            names = sorted((df if college == "All UC" else df[df['College'] == college])['School'].unique().tolist())
+        return {'college': college, 'count': len(names), 'schools': names}
+
+    def school(self, params, snapshot, agg):
+        name = _required(params, 'name')
+        college = params.get('college')
+        if agg is not None:
+            rows = agg.school_rows(name, college)
+        elif college is not None:
+            row = snapshot.row(name, college)
+            rows = pd.DataFrame([row]) if row is not None else pd.DataFrame()
+        else:
+            rows = snapshot.df[snapshot.df['School'] == name]
+        if len(rows) == 0:
+            raise ApiError(404, f"No school named {name!r}" + (f" for {college}" if college else ""))
+        return {'school': name, 'records': rows}
+
+    def compare(self, params, snapshot, agg, names):
+        if not 2 <= len(names) <= 3:
+            raise ApiError(400, "Pass 2-3 'school' parameters")
+        records = []
+        for name in names:
+            records.append(self.school({**params, 'name': name}, snapshot, agg)['records'].iloc[0])
+        return {'schools': pd.DataFrame(records)}
+
+    def analytics(self, params, snapshot, agg):
+        college = params.get('college', "All UC")
+        if agg is not None:
+            tables = agg.analytics(college)
+            sketches = agg.sketches
+        else:
+            df = snapshot.df
+            tables = compute_analytics(df if college == "All UC" else df[df['College'] == college])
+            sketches = snapshot.derived('sketches', build_sketches)
+
+        sketch = sketches.get(ALL_ROWS if college == "All UC" else college)
+        if sketch is not None:
+            tables['distribution'] = {
+                'edges': HISTOGRAM_EDGES,
+                'counts': sketch.rates.histogram(HISTOGRAM_EDGES),
+                **sketch.summary(),
+            }
+        return {'college': college, **tables}
+
+    def pivot(self, params, snapshot, agg, query):
+        if agg is not None:
+            raise ApiError(400, "Pivots are not available for exports served in streaming mode")
+        rows, columns = query.get('rows', []), query.get('cols', [])
+        measure = params.get('measure', "Applied")
+        unknown = [d for d in rows + columns if d not in DIMENSIONS]
+        if unknown:
+            raise ApiError(400, f"Unknown dimension(s) {', '.join(unknown)}; use {', '.join(DIMENSIONS)}")
+        if measure not in MEASURES:
+            raise ApiError(400, f"Unknown measure {measure!r}")
+        filters = {} if "Campus" in rows + columns else {"Campus": params.get('campus', "All UC")}
+        try:
+            table = snapshot.derived('pivot', PivotEngine).pivot(rows, columns, measure, filters)
+        except ValueError as e:
+            raise ApiError(400, str(e))
+        return {'rows': rows, 'columns': columns, 'measure': measure, 'filters': filters,
+                'table': table.reset_index()}
+
+    def datasets(self):
+        """Datasets in the manifest (not cached: loading state changes)"""
+        loaded = set(self.registry.loaded())
+        payload = {'default': self.registry.default, 'datasets': [
+            {'id': dataset_id, 'name': self.registry.name(dataset_id), 'loaded': dataset_id in loaded}
+            for dataset_id in self.registry.ids()
+        ]}
+        body = json.dumps(payload).encode("utf-8")
+        etag = '"datasets-%s"' % hashlib.sha1(body).hexdigest()[:10]
+        return 200, body, etag, email.utils.formatdate(usegmt=True)
+
+    def quality(self, snapshot, agg):
+        report = agg.quality if agg is not None else snapshot.quality
+        if report is None:
+            raise ApiError(404, "No data-quality report for this dataset")
+        return {**report.summary(), 'samples': report.samples}
+
+    def export(self, query):
+        """Resolve an export request: (version, filename, mime, chunk iterator)
+
+        scope=filtered (default) applies college/type/city like /api/rankings
+        but without the row limit; scope=full exports every row.
+        """
+        dataset, version, _, snapshot, agg = self.pin(query)
+        params = {k: v[-1] for k, v in query.items()}
+        fmt = params.get('format', 'csv')
+        if fmt not in available_formats():
+            raise ApiError(400, f"Format must be one of {', '.join(available_formats())}")
+        scope = params.get('scope', 'filtered')
+        if scope not in ('filtered', 'full'):
+            raise ApiError(400, "Parameter 'scope' must be 'filtered' or 'full'")
+
+        college = params.get('college', "All UC")
+        campuses = agg.campuses() if agg is not None else snapshot.derived('catalogs', build_catalogs)['campuses']
+        if college != "All UC" and college not in campuses:
+            raise ApiError(400, f"Unknown college {college!r}")
+        school_type = params.get('type', "All")
+        city = params.get('city', "All Cities")
+        if scope == 'full':
+            filters = {}
+        else:
+            filters = {'college': college, 'school_type': school_type, 'city': city}
+
+        if agg is not None:
+            def make_frames():
+                return filter_chunks(iter_chunks(dataset.path), **{
+                    'college': None if college == "All UC" else college,
+                    'school_type': None if school_type == "All" else school_type,
+                    'city': None if city == "All Cities" else city,
+                } if filters else {})
+        else:
+            def make_frames():
+                return split_frame(filter_rankings(snapshot.df, **filters, limit=None) if filters else snapshot.df)
+
+        key = (version, 'api', scope, tuple(sorted(filters.items())), fmt)
+        filename = export_filename("uc_admissions" if scope == 'full' else f"uc_rankings_{college}", fmt)
+        return version, filename, FORMATS[fmt][2], self.exports.stream(key, make_frames, fmt)
+
+    # ----- Dispatch -----
+
+    def handle(self, path, query):
+        """Return (status, body bytes, etag, last-modified) for a GET"""
+        if path == "/api/datasets":
+            return self.datasets()
+
+        dataset, version, modified, snapshot, agg = self.pin(query)
+        key = (version, path, tuple(sorted((name, tuple(values)) for name, values in query.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        params = {k: v[-1] for k, v in query.items()}
+
+        if path == "/api/version":
+            payload = {'version': version, 'last_modified': email.utils.formatdate(modified, usegmt=True)}
+        elif path == "/api/rankings":
+            payload = self.rankings(params, snapshot, agg)
+        elif path == "/api/schools":
+            payload = self.schools(params, snapshot, agg)
+        elif path == "/api/school":
+            payload = self.school(params, snapshot, agg)
+        elif path == "/api/compare":
+            payload = self.compare({k: v for k, v in params.items() if k != 'school'}, snapshot, agg,
+                                   query.get('school', []))
+        elif path == "/api/analytics":
+            payload = self.analytics(params, snapshot, agg)
+        elif path == "/api/pivot":
+            payload = self.pivot(params, snapshot, agg, query)
+        elif path == "/api/quality":
+            payload = self.quality(snapshot, agg)
+        else:
+            raise ApiError(404, f"Unknown endpoint {path}")
+
+        body = json.dumps(payload, default=_json_default, allow_nan=False).encode("utf-8")
+        etag = '"%s-%s"' % (version, hashlib.sha1(repr(key).encode()).hexdigest()[:10])
+        entry = (200, body, etag, email.utils.formatdate(modified, usegmt=True))
+        self.cache.put(key, entry)
+        return entry
+
+
+def _required(params, name):
+    if not params.get(name):
+        raise ApiError(400, f"Missing required parameter {name!r}")
+    return params[name]
+
+
+def _int_param(params, name, default):
+    try:
+        return max(1, min(int(params.get(name, default)), MAX_LIMIT))
+    except ValueError:
+        raise ApiError(400, f"Parameter {name!r} must be an integer")
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler (keep-alive) with conditional GET support"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "UCSchoolsAPI/1.0"
+    api = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            return self._send(200, b'{"status": "ok"}')
+        if url.path.rstrip("/") == "/api/export":
+            return self._export(parse_qs(url.query))
+
+        try:
+            status, body, etag, modified = self.api.handle(url.path.rstrip("/") or "/", parse_qs(url.query))
+        except ApiError as e:
+            return self._send(e.status, json.dumps({'error': str(e)}).encode("utf-8"))
+        except Exception as e:
+            self.log_error("Error serving %s: %r", self.path, e)
+            return self._send(500, b'{"error": "Internal server error"}')
+
+        headers = {'ETag': etag, 'Last-Modified': modified, 'Cache-Control': 'public, max-age=0, must-revalidate'}
+        if self._not_modified(etag, modified):
+            return self._send(304, b"", headers)
+        self._send(status, body, headers)
+
+    def _export(self, query):
+        """Stream an export with chunked transfer encoding"""
+        try:
+            version, filename, mime, chunks = self.api.export(query)
+            first = next(chunks, b"")
+        except ApiError as e:
+            return self._send(e.status, json.dumps({'error': str(e)}).encode("utf-8"))
+        except Exception as e:
+            self.log_error("Error serving %s: %r", self.path, e)
+            return self._send(500, b'{"error": "Internal server error"}')
+
+        self.send_response(200)
+        self.send_header('Content-Type', mime)
+        self.send_header('Content-Disposition', content_disposition(filename))
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('X-Data-Version', version)
+        self.end_headers()
+        try:
+            for chunk in [first] if first else []:
+                self._write_chunk(chunk)
+            for chunk in chunks:
+                if chunk:
+                    self._write_chunk(chunk)
+        except Exception as e:
+            # Headers are already sent; drop the connection rather than end the body cleanly
+            self.log_error("Error streaming %s: %r", self.path, e)
+            self.close_connection = True
+            return
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, chunk):
+        self.wfile.write(b"%x\r\n" % len(chunk))
+        self.wfile.write(chunk)
+        self.wfile.write(b"\r\n")
+
+    def _not_modified(self, etag, modified):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+                return email.utils.parsedate_to_datetime(modified) <= since
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)) if status != 304 else "0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_request(self, code='-', size='-'):
+        # Per-request access logging costs more than a cached request itself
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve UC admission data as JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--data", default=None, help="Serve a single snapshot CSV instead of the manifest")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help="Dataset manifest (default: data/datasets.json)")
+    args = parser.parse_args()
+
+    registry = DatasetRegistry.single(args.data) if args.data else DatasetRegistry.from_manifest(args.manifest)
+    ApiHandler.api = DataApi(registry)
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    print(f"Serving UC admission data on http://{args.host}:{args.port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,40 @@ UC Schools Admission Rankings Dashboard
 A comprehensive Streamlit app for exploring UC admission data
 """
 
+import os
+from urllib.parse import urlencode
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from data_store import (
+    ALL_ROWS, HISTOGRAM_EDGES, available_years, build_catalogs, compute_analytics,
+    filter_rankings, load_partition, partition_signature,
+    school_history, source_signature, year_quality, year_trends
+)
+from components import (
+    APP_CSS, COUNTY_METRICS, build_county_figures, create_analytics_figures,
+    create_comparison_chart, create_comparison_rate_chart,
+    create_demographic_applications_chart,
+    create_demographic_chart, create_demographic_table,
+    create_trend_sparkline, get_rate_badge_color,
+    get_rate_color, render_metric_card, render_school_card
+)
+from bundle import figures_from_specs
+from datasets import DatasetRegistry, snapshot_usage
+from latency import LatencyMonitor
+from geo import load_manifest
+from payload import PayloadMeter, compact_html, figure_bytes, frame_bytes
+from pivot import DIMENSIONS, MEASURES, PivotEngine
+from memory import MemoryLedger, enable_copy_on_write, estimate_bytes, format_bytes
+from exports import FORMATS, ChunkedReader, ExportCache, available_formats, export_filename, split_frame
+from sketches import build_sketches, year_sketches
+from streaming import filter_chunks, iter_chunks
+from view_state import VIEW_PARAMS, ResultCache, decode_view, encode_view, view_signature
 
 
 # Page configuration
@@ -19,499 +47,563 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Custom CSS for mobile-friendly, modern design
-st.markdown("""
-<style>
-    /* Import Google Font */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    * {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Main container */
-    .main .block-container {
-        padding: 1rem 1rem 3rem 1rem;
-        max-width: 1400px;
-    }
-    
-    /* Header styling */
-    .main-header {
-        background: linear-gradient(135deg, #1a365d 0%, #2c5282 50%, #2b6cb0 100%);
-        padding: 2rem;
-        border-radius: 16px;
-        margin-bottom: 1.5rem;
-        text-align: center;
-        box-shadow: 0 4px 20px rgba(0,0,0,0.3);
-    }
-    
-    .main-header h1 {
-        color: #fff;
-        font-size: 2rem;
-        font-weight: 700;
-        margin: 0;
-        text-shadow: 0 2px 4px rgba(0,0,0,0.2);
-    }
-    
-    .main-header p {
-        color: #bee3f8;
-        font-size: 1rem;
-        margin: 0.5rem 0 0 0;
-    }
-    
-    /* School cards */
-    .school-card {
-        background: linear-gradient(145deg, #1e2530 0%, #252d3a 100%);
-        border-radius: 12px;
-        padding: 1.25rem;
-        margin-bottom: 1rem;
-        border: 1px solid #2d3748;
-        transition: all 0.3s ease;
-        cursor: pointer;
-    }
-    
-    .school-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 25px rgba(0,0,0,0.3);
-        border-color: #4299e1;
-    }
-    
-    .school-name {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #fff;
-        margin-bottom: 0.5rem;
-    }
-    
-    .school-city {
-        font-size: 0.85rem;
-        color: #a0aec0;
-        margin-bottom: 0.75rem;
-    }
-    
-    .school-stats {
-        display: flex;
-        gap: 1rem;
-        flex-wrap: wrap;
-        margin-bottom: 0.75rem;
-    }
-    
-    .stat-item {
-        background: #2d3748;
-        padding: 0.4rem 0.75rem;
-        border-radius: 8px;
-        font-size: 0.8rem;
-    }
-    
-    .stat-label {
-        color: #718096;
-        font-weight: 400;
-    }
-    
-    .stat-value {
-        color: #fff;
-        font-weight: 600;
-        margin-left: 0.25rem;
-    }
-    
-    /* Badges */
-    .badge {
-        display: inline-block;
-        padding: 0.25rem 0.75rem;
-        border-radius: 20px;
-        font-size: 0.75rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    .badge-public {
-        background: linear-gradient(135deg, #276749 0%, #38a169 100%);
-        color: #fff;
-    }
-    
-    .badge-private {
-        background: linear-gradient(135deg, #744210 0%, #d69e2e 100%);
-        color: #fff;
-    }
-    
-    .badge-rate-high {
-        background: linear-gradient(135deg, #22543d 0%, #48bb78 100%);
-        color: #fff;
-    }
-    
-    .badge-rate-medium {
-        background: linear-gradient(135deg, #744210 0%, #ecc94b 100%);
-        color: #1a202c;
-    }
-    
-    .badge-rate-low {
-        background: linear-gradient(135deg, #742a2a 0%, #fc8181 100%);
-        color: #fff;
-    }
-    
-    /* Progress bar */
-    .progress-container {
-        background: #2d3748;
-        border-radius: 10px;
-        height: 8px;
-        overflow: hidden;
-        margin-top: 0.5rem;
-    }
-    
-    .progress-bar {
-        height: 100%;
-        border-radius: 10px;
-        transition: width 0.5s ease;
-    }
-    
-    .progress-high {
-        background: linear-gradient(90deg, #38a169 0%, #68d391 100%);
-    }
-    
-    .progress-medium {
-        background: linear-gradient(90deg, #d69e2e 0%, #f6e05e 100%);
-    }
-    
-    .progress-low {
-        background: linear-gradient(90deg, #e53e3e 0%, #fc8181 100%);
-    }
-    
-    /* Filter buttons */
-    .stButton > button {
-        border-radius: 20px;
-        padding: 0.5rem 1.25rem;
-        font-weight: 500;
-        transition: all 0.2s ease;
-        border: 2px solid transparent;
-    }
-    
-    .stButton > button:hover {
-        transform: scale(1.02);
-    }
-    
-    /* Metric cards */
-    .metric-card {
-        background: linear-gradient(145deg, #2d3748 0%, #1a202c 100%);
-        border-radius: 12px;
-        padding: 1.25rem;
-        text-align: center;
-        border: 1px solid #4a5568;
-    }
-    
-    .metric-value {
-        font-size: 2rem;
-        font-weight: 700;
-        color: #63b3ed;
-    }
-    
-    .metric-label {
-        font-size: 0.85rem;
-        color: #a0aec0;
-        margin-top: 0.25rem;
-    }
-    
-    /* Section headers */
-    .section-header {
-        font-size: 1.25rem;
-        font-weight: 600;
-        color: #fff;
-        margin: 1.5rem 0 1rem 0;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid #4299e1;
-    }
-    
-    /* Comparison cards */
-    .comparison-card {
-        background: linear-gradient(145deg, #1e2530 0%, #252d3a 100%);
-        border-radius: 12px;
-        padding: 1.5rem;
-        border: 1px solid #2d3748;
-        height: 100%;
-    }
-    
-    .comparison-header {
-        text-align: center;
-        padding-bottom: 1rem;
-        border-bottom: 1px solid #4a5568;
-        margin-bottom: 1rem;
-    }
-    
-    /* Detail modal */
-    .detail-section {
-        background: #1e2530;
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin-bottom: 1rem;
-    }
-    
-    .detail-title {
-        font-size: 1rem;
-        font-weight: 600;
-        color: #63b3ed;
-        margin-bottom: 1rem;
-    }
-    
-    /* Mobile responsive */
-    @media (max-width: 768px) {
-        .main-header h1 {
-            font-size: 1.5rem;
-        }
-        
-        .school-stats {
-            flex-direction: column;
-            gap: 0.5rem;
-        }
-        
-        .metric-value {
-            font-size: 1.5rem;
-        }
-    }
-    
-    /* Hide Streamlit elements */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background: #1a202c;
-        padding: 0.5rem;
-        border-radius: 12px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        border-radius: 8px;
-        padding: 0.75rem 1.5rem;
-        font-weight: 500;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #2b6cb0 0%, #4299e1 100%);
-    }
-    
-    /* Selectbox styling */
-    .stSelectbox > div > div {
-        background: #2d3748;
-        border-radius: 8px;
-    }
-    
-    /* Multiselect styling */
-    .stMultiSelect > div > div {
-        background: #2d3748;
-        border-radius: 8px;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Filters and slices share data with the snapshot until written
+enable_copy_on_write()
+
+# Yearly frames (and their pivot engines) kept in memory at once
+YEAR_CACHE_SIZE = 6
+
+# Base URL of a running api.py; full-dataset exports then link to its chunked /api/export
+API_URL = os.environ.get("UC_API_URL", "").rstrip("/")
+
+# Rows a table keeps when the rerun's payload budget is already spent
+TABLE_MIN_ROWS = 25
+
+# Stylesheet reference when static file serving is on (see .streamlit/config.toml)
+STATIC_CSS = '<style>@import url("app/static/style.css");</style>'
+
+
+def current_meter():
+    """Payload meter for the rerun in progress"""
+    if '_payload_meter' not in st.session_state:
+        st.session_state['_payload_meter'] = PayloadMeter()
+    return st.session_state['_payload_meter']
+
+
+def emit_html(html, category="HTML"):
+    """Render an HTML snippet (compacted) and count its bytes"""
+    html = compact_html(html)
+    current_meter().add(category, len(html.encode("utf-8")))
+    st.markdown(html, unsafe_allow_html=True)
+
+
+def show_chart(fig):
+    """Render a Plotly figure and count its serialised spec"""
+    current_meter().add("Charts", figure_bytes(fig))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def show_table(frame, name, key, **kwargs):
+    """Render a table cut to the rows that fit the rerun's payload budget
+
+    The rest is one "Show all" click away, kept for this view (``key``).
+    """
+    slug = name.lower().replace(" ", "_")
+    shown = len(frame)
+    if shown > TABLE_MIN_ROWS and st.session_state.get(f'{slug}_show_all') != key:
+        shown = current_meter().fit_rows(frame_bytes(frame) / len(frame), len(frame), minimum=TABLE_MIN_ROWS)
+    part = frame if shown == len(frame) else frame.head(shown)
+    current_meter().add("Tables", frame_bytes(part))
+    st.dataframe(part, **kwargs)
+    if shown < len(frame):
+        st.caption(f"Showing {shown:,} of {len(frame):,} rows")
+        if st.button(f"Show all {len(frame):,} rows", key=f"{slug}_show_all_btn"):
+            st.session_state[f'{slug}_show_all'] = key
+            st.rerun()
+
+
+def current_budget():
+    """Latency budget of the rerun in progress"""
+    if '_latency_budget' not in st.session_state:
+        st.session_state['_latency_budget'] = get_latency_monitor().start()
+    return st.session_state['_latency_budget']
+
+
+def deferred_section(name, key):
+    """Whether to skip a non-essential section, leaving a "load more" placeholder
+
+    Sections are deferred while the rerun's latency budget is at risk, until
+    the user loads them for this view (``key``).
+    """
+    slug = name.lower().replace(" ", "_")
+    budget = current_budget()
+    if st.session_state.get(f'show_{slug}') == key or not budget.at_risk():
+        return False
+    budget.defer(name)
+    st.caption(f"⏱️ {name} deferred while the server is busy.")
+    if st.button(f"Load {name.lower()}", key=f"load_{slug}_btn"):
+        st.session_state[f'show_{slug}'] = key
+        st.rerun()
+    return True
+
+
+def inject_stylesheet():
+    """Reference the cached static stylesheet, or inline it without static serving"""
+    if st.get_option("server.enableStaticServing"):
+        emit_html(STATIC_CSS, "Stylesheet")
+    else:
+        emit_html(APP_CSS, "Stylesheet")
+
+
+@st.cache_resource
+def get_dataset_registry():
+    """Datasets listed in the manifest, loaded on first use and shared
+
+    Each dataset is a hot-reloading snapshot (or streaming aggregates for very
+    large files); sessions pin one version per rerun and keep serving it
+    until their next rerun.
+    """
+    return DatasetRegistry.from_manifest()
+
+
+@st.cache_resource
+def get_year_cache():
+    """Process-wide LRU of yearly frames and pivot engines, each sized once when loaded"""
+    return ResultCache(max_entries=YEAR_CACHE_SIZE, sizer=estimate_bytes)
+
+
+def load_year(year, signature):
+    """Load one admissions year from its memory-mapped partition
+
+    Shared by all sessions (not copied per session); ``signature``
+    invalidates the entry when the yearly export changes.
+    """
+    return get_year_cache().get_or_compute((year, signature), lambda: load_partition(year))
+
+
+def load_year_pivot(year, signature):
+    """Pivot engine over one admissions year (codes built on first use)"""
+    return get_year_cache().get_or_compute((year, signature, 'pivot'),
+                                           lambda: PivotEngine(load_year(year, signature)))
+
+
+@st.cache_resource
+def load_year_sketches(year, signature):
+    """Per-campus rate and distinct-count sketches for one year"""
+    return year_sketches(year)
 
 
 @st.cache_data
-def load_data():
-    """Load and preprocess the CSV data"""
-    try:
-        # Try relative path first (for deployment)
-        df = pd.read_csv("data/UC_Schools_Admission_Rankings.csv")
-    except:
-        try:
-            # Try parent directory path
-            df = pd.read_csv("../data/UC_Schools_Admission_Rankings.csv")
-        except:
-            # Fallback for local development
-            df = pd.read_csv("/Users/muskan.kukreja/Documents/mk-git-test/Finance/UC-Schools/UC_Schools_Admission_Rankings.csv")
-    
-    # Clean column names
-    df.columns = df.columns.str.strip()
+def load_year_trends(signatures):
+    """Per-campus aggregates for every yearly export"""
+    return year_trends([year for year, _ in signatures])
+
+
+def get_year_signatures():
+    """(year, signature) pairs for every yearly export"""
+    return tuple((year, partition_signature(year)) for year in available_years())
+
+
+def get_school_figure(snapshot, school, kind, builder):
+    """Build a per-school figure, reusing the snapshot's figure cache when live"""
+    if snapshot is None:
+        return builder(school)
+    return snapshot.figure(school['School'], school['College'], kind, lambda: builder(school))
+
+
+@st.cache_resource
+def get_export_cache():
+    """Process-wide cache of encoded exports, shared by all sessions"""
+    return ExportCache()
+
+
+def render_export_controls(scope, make_frames, version, signature, file_stem, api_query=None, out_of_core=False):
+    """Format picker plus a download button for one export
+
+    The file is encoded only when the download is clicked (Streamlit runs the
+    callable on its own thread), never on an ordinary rerun. With
+    ``api_query`` and UC_API_URL set, the button links to the API's chunked
+    /api/export instead, so this process never holds the file.
+    ``out_of_core`` exports re-read a file too large for memory; without the
+    API they are not offered, as the download button holds the whole file.
+    """
+    if out_of_core and not (API_URL and api_query is not None):
+        st.caption("Exports of the whole file are served by the API in streaming mode; "
+                   "set UC_API_URL to enable them.")
+        return
+
+    formats = available_formats()
+    export_cache = get_export_cache()
     
-    # Ensure numeric columns are properly typed
-    numeric_cols = ['Applied', 'Admitted', 'Enrolled', 'Admit_Rate_%', 
-                   'African_American_Applied', 'African_American_Admitted', 'African_American_Admit_Rate_%',
-                   'Hispanic_Latinx_Applied', 'Hispanic_Latinx_Admitted', 'Hispanic_Latinx_Admit_Rate_%',
-                   'Asian_Applied', 'Asian_Admitted', 'Asian_Admit_Rate_%',
-                   'White_Applied', 'White_Admitted', 'White_Admit_Rate_%',
-                   'International_Applied', 'International_Admitted', 'International_Admit_Rate_%']
+    col1, col2 = st.columns([1, 2])
     
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    with col1:
+        fmt = st.selectbox("Format", options=formats, format_func=lambda f: FORMATS[f][0], key=f"export_fmt_{scope}")
     
-    return df
+    with col2:
+        if API_URL and api_query is not None:
+            st.link_button(f"⬇️ Download {FORMATS[fmt][0]}",
+                           f"{API_URL}/api/export?{urlencode({**api_query, 'format': fmt})}")
+        else:
+            cache_key = (version, scope, signature, fmt)
+            st.download_button(
+                f"⬇️ Download {FORMATS[fmt][0]}",
+                data=lambda: ChunkedReader(export_cache.chunks(cache_key, make_frames, fmt)),
+                file_name=export_filename(file_stem, fmt),
+                mime=FORMATS[fmt][2],
+                on_click="ignore",
+                key=f"export_dl_{scope}"
+            )
 
 
-def get_rate_color(rate):
-    """Return color class based on admit rate"""
-    if rate >= 70:
-        return "high"
-    elif rate >= 40:
-        return "medium"
-    else:
-        return "low"
+@st.cache_resource
+def get_result_cache():
+    """Process-wide cache of per-view results (frames, card HTML, figures)"""
+    return ResultCache(sizer=estimate_bytes)
 
 
-def get_rate_badge_color(rate):
-    """Return badge color hex based on admit rate"""
-    if rate >= 70:
-        return "#48bb78"
-    elif rate >= 40:
-        return "#ecc94b"
-    else:
-        return "#fc8181"
+@st.cache_resource
+def get_latency_monitor():
+    """Process-wide rerun times and degradation events"""
+    return LatencyMonitor()
 
 
-def render_school_card(school, idx, show_details=False):
-    """Render a school card with all information"""
-    rate_class = get_rate_color(school['Admit_Rate_%'])
-    type_class = "public" if school['Private_Public'] == "Public" else "private"
-    
-    card_html = f"""
-    <div class="school-card">
-        <div style="display: flex; justify-content: space-between; align-items: flex-start; flex-wrap: wrap; gap: 0.5rem;">
-            <div>
-                <div class="school-name">#{idx} {school['School']}</div>
-                <div class="school-city">📍 {school['City']}, {school['County']} County</div>
-            </div>
-            <div style="display: flex; gap: 0.5rem; flex-wrap: wrap;">
-                <span class="badge badge-{type_class}">{school['Private_Public']}</span>
-                <span class="badge badge-rate-{rate_class}">{school['Admit_Rate_%']:.1f}%</span>
-            </div>
-        </div>
-        <div class="school-stats">
-            <div class="stat-item">
-                <span class="stat-label">Applied:</span>
-                <span class="stat-value">{int(school['Applied']):,}</span>
-            </div>
-            <div class="stat-item">
-                <span class="stat-label">Admitted:</span>
-                <span class="stat-value">{int(school['Admitted']):,}</span>
-            </div>
-            <div class="stat-item">
-                <span class="stat-label">Enrolled:</span>
-                <span class="stat-value">{int(school['Enrolled']):,}</span>
-            </div>
-            <div class="stat-item">
-                <span class="stat-label">UC Campus:</span>
-                <span class="stat-value">{school['College']}</span>
-            </div>
-        </div>
-        <div class="progress-container">
-            <div class="progress-bar progress-{rate_class}" style="width: {min(school['Admit_Rate_%'], 100)}%;"></div>
-        </div>
-    </div>
+@st.cache_resource
+def get_memory_ledger():
+    """Process-wide memory accounting for sessions and shared caches"""
+    ledger = MemoryLedger()
+    result_cache = get_result_cache()
+    export_cache = get_export_cache()
+    ledger.register_cache("View results", lambda: (result_cache.bytes, len(result_cache)))
+    ledger.register_cache("Encoded exports", lambda: (export_cache.bytes, len(export_cache)))
+    year_cache = get_year_cache()
+    # Memory-mapped: pages are shared with the OS file cache
+    ledger.register_cache("Yearly partitions (mapped)", lambda: (year_cache.bytes, len(year_cache)))
+    ledger.register_cache("Datasets", get_dataset_registry().usage)
+    return ledger
+
+
+def current_session_id():
+    """Id of the session running this script (a fixed id outside a server)"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+
+def cached_view(name, key, builder, lineage=None):
+    """Shared per-view result, charged to this session's memory ledger
+
+    Sessions over their memory budget still get the result, but it is not
+    kept in the shared cache. With a ``lineage`` (the view across dataset
+    versions and selections), a rerun whose latency budget is at risk gets
+    the view's last good result while the current one is built in the
+    background, so ``builder`` must not call Streamlit. When that result is
+    for another selection, a caption says so and offers a refresh.
     """
-    return card_html
+    ledger = get_memory_ledger()
+    session_id = current_session_id()
+    result_cache = get_result_cache()
+    admit = lambda size: ledger.admits(session_id, size)
+    if lineage is not None and current_budget().at_risk():
+        value, stale_key = result_cache.get_or_revalidate(key, lineage, builder, admit)
+        if stale_key is not None:
+            current_budget().serve_stale(name)
+            if stale_key[1] != key[1]:
+                st.caption(f"⏱️ Showing the {name.lower()} of your previous selection while this one is prepared.")
+                if st.button("Refresh", key=f"refresh_{name.lower()}_btn"):
+                    st.rerun()
+    else:
+        value = result_cache.get_or_compute(key, builder, admit, lineage)
+    size = result_cache.entry_bytes(key)
+    ledger.charge(session_id, name, estimate_bytes(value) if size is None else size)
+    return value
 
 
-def render_metric_card(value, label, icon=""):
-    """Render a metric card"""
-    return f"""
-    <div class="metric-card">
-        <div class="metric-value">{icon} {value}</div>
-        <div class="metric-label">{label}</div>
-    </div>
+def view_is_stale(name):
+    """Whether this rerun shows a stale result for the view ``name``"""
+    return name in current_budget().stale
+
+
+def enforce_memory_budget(snapshot, dataset_id):
+    """Evict cached intermediates while the global memory budget is exceeded
+
+    Idle datasets go last; the one this session is viewing is kept.
     """
+    def evict_figures(nbytes):
+        freed, _ = snapshot_usage(snapshot)
+        freed -= snapshot.derived('nbytes', estimate_bytes)
+        snapshot.clear_figures()
+        return freed
 
+    evictors = [get_result_cache().shrink, get_export_cache().shrink, get_year_cache().shrink]
+    if snapshot is not None:
+        evictors.append(evict_figures)
+    evictors.append(lambda nbytes: get_dataset_registry().shrink(nbytes, keep=dataset_id))
+    return get_memory_ledger().enforce(evictors)
 
-def create_demographic_chart(school):
-    """Create a demographic breakdown chart for a school"""
-    demographics = {
-        'Asian': school.get('Asian_Admit_Rate_%', 0),
-        'Hispanic/Latinx': school.get('Hispanic_Latinx_Admit_Rate_%', 0),
-        'White': school.get('White_Admit_Rate_%', 0),
-        'African American': school.get('African_American_Admit_Rate_%', 0),
-        'International': school.get('International_Admit_Rate_%', 0)
-    }
-    
-    # Filter out zero values
-    demographics = {k: v for k, v in demographics.items() if v > 0}
+
+def render_debug_panel():
+    """Memory accounting for this session and the shared caches (?debug=1)"""
+    ledger = get_memory_ledger()
+    session_id = current_session_id()
+    caches = ledger.cache_usage()
+    sessions = ledger.session_usage()
+    result_cache = get_result_cache()
     
-    if not demographics:
+    with st.sidebar:
+        st.markdown("### 🧠 Memory")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("This session", format_bytes(ledger.session_bytes(session_id)),
+                      help=f"Budget {format_bytes(ledger.session_budget)}")
+        with col2:
+            st.metric("Shared caches", format_bytes(sum(b for b, _ in caches.values())),
+                      help=f"Budget {format_bytes(ledger.global_budget)}")
+        
+        meter = current_meter()
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Payload (this rerun)", format_bytes(meter.total),
+                      help=f"Budget {format_bytes(meter.budget)}; " + ", ".join(
+                          f"{name} {format_bytes(nbytes)}" for name, nbytes in meter.parts.items()))
+        with col2:
+            st.metric("Stylesheet", "static" if st.get_option("server.enableStaticServing") else "inline")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            lookups = result_cache.hits + result_cache.misses
+            st.metric("View cache hits", f"{result_cache.hits / lookups:.0%}" if lookups else "–")
+        with col2:
+            st.metric("Evictions", f"{ledger.evictions:,}", help=f"{ledger.rejections:,} results not cached (session over budget)")
+        
+        monitor = get_latency_monitor()
+        p50, p95 = monitor.percentile(50), monitor.percentile(95)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Rerun p50 / p95", "–" if p50 is None else f"{p50 * 1000:,.0f} / {p95 * 1000:,.0f} ms",
+                      help=f"Budget {monitor.budget * 1000:,.0f} ms")
+        with col2:
+            st.metric("Degraded reruns", f"{monitor.degraded:,}",
+                      help=f"of {monitor.reruns:,}; {result_cache.stale_hits:,} stale views served")
+        
+        st.caption("Caches")
+        st.dataframe(pd.DataFrame(
+            [{'Cache': name, 'Size': format_bytes(nbytes), 'Entries': entries} for name, (nbytes, entries) in caches.items()]
+        ), hide_index=True, use_container_width=True)
+        
+        st.caption("This session")
+        st.dataframe(pd.DataFrame(
+            [{'Result': name, 'Size': format_bytes(nbytes)} for name, nbytes in ledger.session_items(session_id).items()]
+        ), hide_index=True, use_container_width=True)
+        
+        st.caption(f"{len(sessions)} active session(s), {format_bytes(sum(sessions.values()))} attributed")
+        
+        if monitor.events:
+            st.caption("Degradation")
+            st.dataframe(pd.DataFrame([{
+                'Time': pd.Timestamp(event['time'], unit='s').strftime("%H:%M:%S"),
+                'Rerun': f"{event['elapsed'] * 1000:,.0f} ms",
+                'Reason': event['reason'],
+                'Degraded': ", ".join(event['deferred'] + [f"stale {view}" for view in event['stale']]
+                                      + (["short page"] if event['page_capped'] else [])),
+            } for event in reversed(monitor.events)]), hide_index=True, use_container_width=True)
+
+
+def render_quality_report(quality):
+    """Data-quality summary from ingest: quarantined rows and masked group cells"""
+    summary = quality.summary()
+    with st.expander(f"🩺 Data Quality ({summary['quarantined']:,} quarantined, {summary['flagged']:,} flagged)"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Rows Read", f"{summary['rows']:,}")
+        with col2:
+            st.metric("Quarantined", f"{summary['quarantined']:,}",
+                      help="Rows with inconsistent totals, left out of every view")
+        with col3:
+            st.metric("Masked Group Cells", f"{sum(summary['masked_cells'].values()):,}",
+                      help="Demographic groups with inconsistent counts, treated as having no data")
+        if summary['issues']:
+            st.dataframe(pd.DataFrame(list(summary['issues'].items()), columns=['Issue', 'Rows']),
+                         use_container_width=True, hide_index=True)
+        if len(quality.samples) > 0:
+            if len(quality.samples) < summary['flagged']:
+                st.caption(f"First {len(quality.samples):,} of {summary['flagged']:,} flagged rows")
+            show_table(quality.samples, "Flagged samples", (summary['rows'], len(quality.samples)),
+                       use_container_width=True, hide_index=True)
+
+
+def restore_view():
+    """Seed widget state from the URL once, when a session opens a link"""
+    if st.session_state.get('_view_restored'):
+        return
+    st.session_state['_view_restored'] = True
+    query = {param: st.query_params.get_all(param) for param in st.query_params}
+    for key, value in decode_view(query).items():
+        st.session_state[key] = value
+
+
+def keep_valid(key, options, multi=False):
+    """Drop a restored widget value that is not among the current options"""
+    if key not in st.session_state:
+        return
+    value = st.session_state[key]
+    if multi:
+        st.session_state[key] = [v for v in value if v in options][:3]
+    elif value not in options:
+        del st.session_state[key]
+
+
+def sync_view():
+    """Mirror the current widget state into the URL (defaults omitted)"""
+    query = encode_view(st.session_state)
+    for param, _ in VIEW_PARAMS.values():
+        current = st.query_params.get_all(param)
+        wanted = query.get(param)
+        if wanted is None:
+            if current:
+                del st.query_params[param]
+        elif current != (wanted if isinstance(wanted, list) else [wanted]):
+            st.query_params[param] = wanted
+
+
+def build_rankings(df, stream_agg, leaderboards, uc_filter, type_filter, city_filter):
+    """Filtered top-50 frame plus the rendered HTML of each card"""
+    if stream_agg is not None:
+        filtered_df = stream_agg.leaderboard(uc_filter, type_filter, city_filter)
+    elif leaderboards is not None:
+        filtered_df = df.iloc[leaderboards.get((uc_filter, type_filter, city_filter), [])]
+    else:
+        filtered_df = filter_rankings(df, uc_filter, type_filter, city_filter)
+    cards = [render_school_card(school, idx) for idx, (_, school) in enumerate(filtered_df.iterrows(), 1)]
+    return filtered_df, cards
+
+
+@st.cache_resource
+def load_county_geometry():
+    """Manifest of the bundled county geometry, or None without a bundle
+
+    The map needs the GeoJSON served as a static file, so it is only used
+    when static serving is on.
+    """
+    if not st.get_option("server.enableStaticServing"):
         return None
-    
-    fig = go.Figure(data=[
-        go.Bar(
-            x=list(demographics.keys()),
-            y=list(demographics.values()),
-            marker_color=['#4299e1', '#48bb78', '#ed8936', '#9f7aea', '#f56565'],
-            text=[f'{v:.1f}%' for v in demographics.values()],
-            textposition='outside'
-        )
-    ])
-    
-    fig.update_layout(
-        title=dict(text="Admission Rate by Demographics", font=dict(size=14, color='#fff')),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#a0aec0'),
-        yaxis=dict(
-            title="Admit Rate (%)",
-            gridcolor='#2d3748',
-            range=[0, max(demographics.values()) * 1.2]
-        ),
-        xaxis=dict(title="", tickangle=-45),
-        height=350,
-        margin=dict(l=40, r=40, t=60, b=80)
-    )
-    
-    return fig
+    return load_manifest()
 
 
-def create_demographic_applications_chart(school):
-    """Create a chart showing applications by demographics"""
-    demographics = {
-        'Asian': school.get('Asian_Applied', 0),
-        'Hispanic/Latinx': school.get('Hispanic_Latinx_Applied', 0),
-        'White': school.get('White_Applied', 0),
-        'African American': school.get('African_American_Applied', 0),
-        'International': school.get('International_Applied', 0)
+def build_analytics_view(campus, analytics, campus_sketch, geometry, figures=None):
+    """Analytics tables plus every figure in the Analytics tab, for one campus
+
+    ``geometry`` is the county geometry manifest (or None); ``figures`` are
+    prebuilt campus figures (from a bundle), built here when None.
+    """
+    if figures is None:
+        rate_counts = campus_sketch.rates.histogram(HISTOGRAM_EDGES) if campus_sketch is not None else []
+        figures = create_analytics_figures(analytics, rate_counts, HISTOGRAM_EDGES)
+    county_figures, county_is_map = build_county_figures(analytics['county_stats'], geometry)
+    return {
+        'campus': campus,
+        'county_figures': county_figures,
+        'county_is_map': county_is_map,
+        'analytics': analytics,
+        'rate_summary': campus_sketch.summary() if campus_sketch is not None else None,
+        **figures,
     }
-    
-    # Filter out zero values
-    demographics = {k: v for k, v in demographics.items() if v > 0}
-    
-    if not demographics:
+
+
+def format_delta(current, previous, suffix=""):
+    """Format a year-over-year delta for st.metric, or None without a baseline"""
+    if previous is None:
         return None
-    
-    fig = go.Figure(data=[
-        go.Pie(
-            labels=list(demographics.keys()),
-            values=list(demographics.values()),
-            hole=0.4,
-            marker_colors=['#4299e1', '#48bb78', '#ed8936', '#9f7aea', '#f56565']
-        )
-    ])
-    
-    fig.update_layout(
-        title=dict(text="Applications by Demographics", font=dict(size=14, color='#fff')),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#a0aec0'),
-        height=350,
-        margin=dict(l=20, r=20, t=60, b=20),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2)
-    )
-    
-    return fig
+    return f"{current - previous:+,.1f}{suffix}"
 
 
 def main():
-    # Load data
-    df = load_data()
+    # Latency budget for this rerun (degrades the page when at risk)
+    st.session_state['_latency_budget'] = budget = get_latency_monitor().start()
     
+    # Restore filters and selections from a shared link
+    restore_view()
+    get_memory_ledger().begin(current_session_id())
+    st.session_state['_payload_meter'] = PayloadMeter()
+    inject_stylesheet()
+
     # Header
-    st.markdown("""
+    emit_html("""
     <div class="main-header">
         <h1>🎓 UC Schools Admission Rankings</h1>
         <p>Explore admission statistics for California high schools applying to UC campuses</p>
     </div>
-    """, unsafe_allow_html=True)
+    """)
+    degraded_notice = st.empty()
+
+    # Dataset selector (only when the manifest lists several)
+    registry = get_dataset_registry()
+    dataset_ids = registry.ids()
+    if len(dataset_ids) > 1:
+        keep_valid("dataset", dataset_ids)
+        if "dataset" not in st.session_state:
+            st.session_state["dataset"] = registry.default
+        dataset_id = st.selectbox("Dataset", options=dataset_ids, format_func=registry.name, key="dataset")
+    else:
+        dataset_id = registry.default
+    dataset = registry.get(dataset_id)
+    
+    # Available admissions years (yearly exports are optional)
+    year_signatures = get_year_signatures() if dataset.spec['years'] else ()
+    years = [year for year, _ in year_signatures]
+
+    # Year selector: "Current" is the live snapshot, older cycles load lazily
+    selected_year = None
+    baseline_year = None
+    if years:
+        year_options = ["Current"] + [str(y) for y in reversed(years)]
+        keep_valid("year", year_options)
+        year_choice = st.selectbox("Admissions Cycle", options=year_options, key="year")
+        if year_choice != "Current":
+            selected_year = int(year_choice)
+            earlier = [y for y in years if y < selected_year]
+            baseline_year = earlier[-1] if earlier else None
+        else:
+            baseline_year = years[-1]
+
+    # Load data (pinned for the whole rerun)
+    data_path = dataset.path
+    streaming = selected_year is None and dataset.streaming
+    stream_agg = None
+    snapshot = None
+    if streaming:
+        # Large export: serve running aggregates, never the full frame
+        data_signature, _, stream_agg, _ = dataset.aggregates(stale_ok=budget.at_risk())
+        if data_signature != tuple(source_signature(data_path)):
+            budget.serve_stale("Aggregates")
+        df = None
+    elif selected_year is None:
+        snapshot = dataset.live.current
+        df = snapshot.df
+    else:
+        df = load_year(selected_year, dict(year_signatures)[selected_year])
+    
+    # Loaded datasets and yearly frames are registered with the memory ledger already
+    ledger = get_memory_ledger()
+
+    # Mergeable distribution sketches, built once per dataset version
+    if streaming:
+        sketches = stream_agg.sketches
+    elif snapshot is not None:
+        sketches = snapshot.derived('sketches', build_sketches)
+    else:
+        sketches = load_year_sketches(selected_year, dict(year_signatures)[selected_year])
+
+    # Option lists, computed once per snapshot version (or prebuilt in the bundle)
+    catalogs = snapshot.derived('catalogs', build_catalogs) if snapshot is not None else None
+
+    # Version of the data being served, for export caching
+    if streaming:
+        dataset_version = f"stream:{dataset_id}:{data_signature}"
+    elif snapshot is not None:
+        dataset_version = snapshot.version
+    else:
+        dataset_version = f"{selected_year}:{dict(year_signatures)[selected_year]}"
+    
+    # /api/export query for an export of the current dataset (yearly exports are not served by the API)
+    def api_export(query):
+        return {**query, 'dataset': dataset_id} if selected_year is None else None
     
+    # A view across dataset versions and selections, for serving its last good result
+    def lineage(key):
+        return (dataset_id, selected_year, key[1][0])
+
     # Main navigation tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 Rankings", "🔍 School Details", "⚖️ Compare Schools", "📈 Analytics"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["📊 Rankings", "🔍 School Details", "⚖️ Compare Schools", "📈 Analytics", "🧮 Pivot"])
     
     # ===== TAB 1: RANKINGS =====
     with tab1:
         # Filter section
-        st.markdown('<div class="section-header">🎯 Filters</div>', unsafe_allow_html=True)
+        emit_html('<div class="section-header">🎯 Filters</div>')
+        
+        keep_valid("uc_filter", ["All UC", "UC Berkeley", "UCLA", "UCSD"])
+        keep_valid("type_filter", ["All", "Public", "Private"])
         
         col1, col2, col3 = st.columns(3)
         
@@ -530,93 +622,133 @@ def main():
             )
         
         with col3:
-            cities = ["All Cities"] + sorted(df['City'].unique().tolist())
+            if streaming:
+                city_names = stream_agg.city_names
+            elif catalogs is not None:
+                city_names = catalogs['cities']
+            else:
+                city_names = df['City'].unique().tolist()
+            cities = ["All Cities"] + sorted(city_names)
+            keep_valid("city_filter", cities)
             city_filter = st.selectbox(
                 "City",
                 options=cities,
                 key="city_filter"
             )
         
-        # Apply filters
-        filtered_df = df.copy()
-        
-        if uc_filter != "All UC":
-            filtered_df = filtered_df[filtered_df['College'] == uc_filter]
-        
-        if type_filter != "All":
-            filtered_df = filtered_df[filtered_df['Private_Public'] == type_filter]
-        
-        if city_filter != "All Cities":
-            filtered_df = filtered_df[filtered_df['City'] == city_filter]
-        
-        # Sort by admit rate and get top 50
-        filtered_df = filtered_df.sort_values('Admit_Rate_%', ascending=False).head(50)
+        # Apply filters and keep the top 50 by admit rate (shared across sessions)
+        rankings_key = (dataset_version, view_signature(
+            'rankings', uc_filter=uc_filter, type_filter=type_filter, city_filter=city_filter))
+        filtered_df, cards = cached_view(
+            "Rankings", rankings_key, lambda: build_rankings(
+                df, stream_agg, snapshot.prebuilt('leaderboards') if snapshot is not None else None,
+                uc_filter, type_filter, city_filter), lineage(rankings_key))
         
         # Summary metrics
-        st.markdown('<div class="section-header">📈 Summary</div>', unsafe_allow_html=True)
+        emit_html('<div class="section-header">📈 Summary</div>')
         
         metric_cols = st.columns(4)
         
         with metric_cols[0]:
-            st.markdown(render_metric_card(
+            emit_html(render_metric_card(
                 f"{len(filtered_df)}",
                 "Schools Shown",
                 "🏫"
-            ), unsafe_allow_html=True)
+            ))
         
         with metric_cols[1]:
             avg_rate = filtered_df['Admit_Rate_%'].mean() if len(filtered_df) > 0 else 0
-            st.markdown(render_metric_card(
+            emit_html(render_metric_card(
                 f"{avg_rate:.1f}%",
                 "Avg Admit Rate",
                 "📊"
-            ), unsafe_allow_html=True)
+            ))
         
         with metric_cols[2]:
             total_applied = filtered_df['Applied'].sum()
-            st.markdown(render_metric_card(
+            emit_html(render_metric_card(
                 f"{int(total_applied):,}",
                 "Total Applied",
                 "📝"
-            ), unsafe_allow_html=True)
+            ))
         
         with metric_cols[3]:
             total_admitted = filtered_df['Admitted'].sum()
-            st.markdown(render_metric_card(
+            emit_html(render_metric_card(
                 f"{int(total_admitted):,}",
                 "Total Admitted",
                 "✅"
-            ), unsafe_allow_html=True)
+            ))
+        
+        # Export of the shown results or the full dataset
+        with st.expander("⬇️ Export"):
+            export_scope = st.radio("Rows", ["Shown results", "Full dataset"], horizontal=True, key="rankings_export_rows")
+            if export_scope == "Shown results" and view_is_stale("Rankings"):
+                st.caption("Available once the results are up to date.")
+            elif export_scope == "Shown results":
+                render_export_controls("rankings", lambda: split_frame(filtered_df), dataset_version,
+                                       (uc_filter, type_filter, city_filter), "uc_rankings")
+            else:
+                full_frames = (lambda: iter_chunks(data_path)) if streaming else (lambda: split_frame(df))
+                render_export_controls("rankings", full_frames, dataset_version, ("full",), "uc_admissions_full",
+                                       api_export({'scope': "full"}), out_of_core=streaming)
         
         # Rankings list
-        st.markdown('<div class="section-header">🏆 Top Schools by Admit Rate</div>', unsafe_allow_html=True)
+        emit_html('<div class="section-header">🏆 Top Schools by Admit Rate</div>')
         
         if len(filtered_df) == 0:
             st.warning("No schools match your filter criteria. Try adjusting your filters.")
         else:
-            for idx, (_, school) in enumerate(filtered_df.iterrows(), 1):
-                st.markdown(render_school_card(school, idx), unsafe_allow_html=True)
+            # Stop adding cards once the rerun's payload budget is spent
+            if st.session_state.get('rankings_show_all') == rankings_key:
+                shown = len(cards)
+            else:
+                shown = current_meter().fit([len(card.encode("utf-8")) for card in cards], minimum=10)
+                shown = budget.cap_page(shown)
+            
+            for idx, (_, school) in enumerate(filtered_df.head(shown).iterrows(), 1):
+                emit_html(cards[idx - 1], "Cards")
                 
                 # Add a button to view details
                 if st.button(f"View Details →", key=f"detail_btn_{idx}_{school['School']}"):
                     st.session_state['selected_school'] = school['School']
                     st.session_state['selected_college'] = school['College']
+            
+            if shown < len(cards):
+                if st.button(f"Show all {len(cards)} schools", key="rankings_show_all_btn"):
+                    st.session_state['rankings_show_all'] = rankings_key
+                    st.rerun()
     
     # ===== TAB 2: SCHOOL DETAILS =====
     with tab2:
-        st.markdown('<div class="section-header">🔍 School Detail View</div>', unsafe_allow_html=True)
+        emit_html('<div class="section-header">🔍 School Detail View</div>')
         
         # School selector
         col1, col2 = st.columns(2)
         
+        if streaming:
+            detail_campuses = stream_agg.campuses()
+        elif catalogs is not None:
+            detail_campuses = catalogs['campuses']
+        else:
+            detail_campuses = df['College'].unique().tolist()
+        keep_valid("detail_uc", detail_campuses)
+        
         with col1:
             uc_campus = st.selectbox(
                 "Select UC Campus",
-                options=df['College'].unique().tolist(),
+                options=detail_campuses,
                 key="detail_uc"
             )
         
-        campus_schools = df[df['College'] == uc_campus]['School'].unique().tolist()
+        if streaming:
+            campus_schools = stream_agg.school_names(uc_campus)
+        elif catalogs is not None:
+            campus_schools = catalogs['schools'].get(uc_campus, [])
+        else:
+            campus_schools = df[df['College'] == uc_campus]['School'].unique().tolist()
+        
+        keep_valid("detail_school", campus_schools)
         
         with col2:
             selected_school = st.selectbox(
@@ -626,88 +758,83 @@ def main():
             )
         
         if selected_school:
-            school_data = df[(df['School'] == selected_school) & (df['College'] == uc_campus)].iloc[0]
+            if streaming:
+                school_data = stream_agg.school_rows(selected_school, uc_campus).iloc[0]
+            elif snapshot is not None:
+                school_data = snapshot.row(selected_school, uc_campus)
+            else:
+                school_data = df[(df['School'] == selected_school) & (df['College'] == uc_campus)].iloc[0]
             
             # School header
             rate_color = get_rate_badge_color(school_data['Admit_Rate_%'])
-            st.markdown(f"""
+            emit_html(f"""
             <div class="detail-section">
-                <h2 style="color: #fff; margin: 0 0 0.5rem 0;">{school_data['School']}</h2>
-                <p style="color: #a0aec0; margin: 0;">
+                <h2 class="detail-name">{school_data['School']}</h2>
+                <p class="detail-meta">
                     📍 {school_data['City']}, {school_data['County']} County | 
                     🎓 {school_data['Private_Public']} School |
                     🏛️ {school_data['College']}
                 </p>
             </div>
-            """, unsafe_allow_html=True)
+            """)
+            
+            # Year-over-year history for this school (empty without yearly exports)
+            history = school_history(school_data['School'], school_data['College']) if years else pd.DataFrame()
+            baseline = None
+            if baseline_year is not None and len(history) > 0:
+                baseline_rows = history[history['Year'] == baseline_year]
+                if len(baseline_rows) > 0:
+                    baseline = baseline_rows.iloc[0]
             
             # Key metrics
             metric_cols = st.columns(4)
             
             with metric_cols[0]:
-                st.metric("Admit Rate", f"{school_data['Admit_Rate_%']:.1f}%")
+                st.metric("Admit Rate", f"{school_data['Admit_Rate_%']:.1f}%",
+                          delta=format_delta(school_data['Admit_Rate_%'], None if baseline is None else baseline['Admit_Rate_%'], " pts"))
             with metric_cols[1]:
-                st.metric("Applied", f"{int(school_data['Applied']):,}")
+                st.metric("Applied", f"{int(school_data['Applied']):,}",
+                          delta=format_delta(school_data['Applied'], None if baseline is None else baseline['Applied']))
             with metric_cols[2]:
-                st.metric("Admitted", f"{int(school_data['Admitted']):,}")
+                st.metric("Admitted", f"{int(school_data['Admitted']):,}",
+                          delta=format_delta(school_data['Admitted'], None if baseline is None else baseline['Admitted']))
             with metric_cols[3]:
-                st.metric("Enrolled", f"{int(school_data['Enrolled']):,}")
+                st.metric("Enrolled", f"{int(school_data['Enrolled']):,}",
+                          delta=format_delta(school_data['Enrolled'], None if baseline is None else baseline['Enrolled']))
+            
+            # Trend sparklines
+            if len(history) >= 2:
+                if baseline_year is not None:
+                    st.caption(f"Changes shown against {baseline_year}")
+                spark_col1, spark_col2 = st.columns(2)
+                with spark_col1:
+                    show_chart(create_trend_sparkline(history['Year'], history['Admit_Rate_%'], "Admit Rate Trend"))
+                with spark_col2:
+                    show_chart(create_trend_sparkline(history['Year'], history['Applied'], "Applications Trend", '#48bb78', ''))
             
             # Demographic charts
-            st.markdown('<div class="section-header">👥 Demographic Breakdown</div>', unsafe_allow_html=True)
+            emit_html('<div class="section-header">👥 Demographic Breakdown</div>')
             
             chart_col1, chart_col2 = st.columns(2)
             
             with chart_col1:
-                demo_rate_chart = create_demographic_chart(school_data)
+                demo_rate_chart = get_school_figure(snapshot, school_data, 'demographic_rates', create_demographic_chart)
                 if demo_rate_chart:
-                    st.plotly_chart(demo_rate_chart, use_container_width=True)
+                    show_chart(demo_rate_chart)
                 else:
                     st.info("No demographic admit rate data available for this school.")
             
             with chart_col2:
-                demo_app_chart = create_demographic_applications_chart(school_data)
+                demo_app_chart = get_school_figure(snapshot, school_data, 'demographic_applications', create_demographic_applications_chart)
                 if demo_app_chart:
-                    st.plotly_chart(demo_app_chart, use_container_width=True)
+                    show_chart(demo_app_chart)
                 else:
                     st.info("No demographic application data available for this school.")
             
             # Detailed demographic table
-            st.markdown('<div class="section-header">📋 Detailed Demographics</div>', unsafe_allow_html=True)
+            emit_html('<div class="section-header">📋 Detailed Demographics</div>')
             
-            demo_data = {
-                'Demographic': ['Asian', 'Hispanic/Latinx', 'White', 'African American', 'International', 'Pacific Islander', 'American Indian'],
-                'Applied': [
-                    int(school_data.get('Asian_Applied', 0)),
-                    int(school_data.get('Hispanic_Latinx_Applied', 0)),
-                    int(school_data.get('White_Applied', 0)),
-                    int(school_data.get('African_American_Applied', 0)),
-                    int(school_data.get('International_Applied', 0)),
-                    int(school_data.get('Pacific_Islander_Applied', 0)),
-                    int(school_data.get('American_Indian_Applied', 0))
-                ],
-                'Admitted': [
-                    int(school_data.get('Asian_Admitted', 0)),
-                    int(school_data.get('Hispanic_Latinx_Admitted', 0)),
-                    int(school_data.get('White_Admitted', 0)),
-                    int(school_data.get('African_American_Admitted', 0)),
-                    int(school_data.get('International_Admitted', 0)),
-                    int(school_data.get('Pacific_Islander_Admitted', 0)),
-                    int(school_data.get('American_Indian_Admitted', 0))
-                ],
-                'Admit Rate (%)': [
-                    school_data.get('Asian_Admit_Rate_%', 0),
-                    school_data.get('Hispanic_Latinx_Admit_Rate_%', 0),
-                    school_data.get('White_Admit_Rate_%', 0),
-                    school_data.get('African_American_Admit_Rate_%', 0),
-                    school_data.get('International_Admit_Rate_%', 0),
-                    school_data.get('Pacific_Islander_Admit_Rate_%', 0),
-                    school_data.get('American_Indian_Admit_Rate_%', 0)
-                ]
-            }
-            
-            demo_df = pd.DataFrame(demo_data)
-            demo_df = demo_df[demo_df['Applied'] > 0]  # Only show demographics with data
+            demo_df = create_demographic_table(school_data)
             
             if len(demo_df) > 0:
                 st.dataframe(
@@ -720,12 +847,14 @@ def main():
     
     # ===== TAB 3: COMPARISON TOOL =====
     with tab3:
-        st.markdown('<div class="section-header">⚖️ School Comparison Tool</div>', unsafe_allow_html=True)
+        emit_html('<div class="section-header">⚖️ School Comparison Tool</div>')
         st.markdown("Select 2-3 schools to compare their admission statistics side-by-side.")
         
         # School selection
         col1, col2 = st.columns(2)
         
+        keep_valid("compare_uc", ["All UC", "UC Berkeley", "UCLA", "UCSD"])
+        
         with col1:
             compare_uc = st.selectbox(
                 "Select UC Campus for Comparison",
@@ -733,11 +862,17 @@ def main():
                 key="compare_uc"
             )
         
-        if compare_uc == "All UC":
+        if streaming:
+            compare_schools_list = stream_agg.school_names(compare_uc)
+        elif catalogs is not None:
+            compare_schools_list = catalogs['schools'].get(compare_uc, [])
+        elif compare_uc == "All UC":
             compare_schools_list = df['School'].unique().tolist()
         else:
             compare_schools_list = df[df['College'] == compare_uc]['School'].unique().tolist()
         
+        keep_valid("compare_schools", compare_schools_list, multi=True)
+        
         with col2:
             selected_schools = st.multiselect(
                 "Select Schools (2-3)",
@@ -747,14 +882,24 @@ def main():
             )
         
         if len(selected_schools) >= 2:
-            # Create comparison data
-            compare_data = []
-            for school_name in selected_schools:
-                if compare_uc == "All UC":
-                    school_info = df[df['School'] == school_name].iloc[0]
-                else:
-                    school_info = df[(df['School'] == school_name) & (df['College'] == compare_uc)].iloc[0]
-                compare_data.append(school_info)
+            # Comparison rows and charts (shared across sessions)
+            def build_comparison():
+                compare_data = []
+                for school_name in selected_schools:
+                    if streaming:
+                        school_rows = stream_agg.school_rows(school_name,
+                                                             None if compare_uc == "All UC" else compare_uc)
+                        school_info = school_rows.iloc[0]
+                    elif compare_uc == "All UC":
+                        school_info = df[df['School'] == school_name].iloc[0]
+                    else:
+                        school_info = df[(df['School'] == school_name) & (df['College'] == compare_uc)].iloc[0]
+                    compare_data.append(school_info)
+                return compare_data, create_comparison_chart(compare_data), create_comparison_rate_chart(compare_data)
+            
+            compare_key = (dataset_version, view_signature(
+                'compare', compare_uc=compare_uc, compare_schools=selected_schools))
+            compare_data, fig, fig2 = cached_view("Comparison", compare_key, build_comparison)
             
             # Side-by-side comparison
             cols = st.columns(len(compare_data))
@@ -762,16 +907,16 @@ def main():
             for i, (col, school) in enumerate(zip(cols, compare_data)):
                 with col:
                     rate_class = get_rate_color(school['Admit_Rate_%'])
-                    st.markdown(f"""
+                    emit_html(f"""
                     <div class="comparison-card">
                         <div class="comparison-header">
-                            <h3 style="color: #fff; font-size: 1rem; margin: 0;">{school['School']}</h3>
-                            <p style="color: #a0aec0; font-size: 0.8rem; margin: 0.5rem 0 0 0;">
+                            <h3 class="comparison-name">{school['School']}</h3>
+                            <p class="comparison-meta">
                                 📍 {school['City']} | {school['Private_Public']}
                             </p>
                         </div>
                     </div>
-                    """, unsafe_allow_html=True)
+                    """)
                     
                     st.metric("Admit Rate", f"{school['Admit_Rate_%']:.1f}%")
                     st.metric("Applications", f"{int(school['Applied']):,}")
@@ -779,62 +924,15 @@ def main():
                     st.metric("Enrolled", f"{int(school['Enrolled']):,}")
             
             # Comparison chart
-            st.markdown('<div class="section-header">📊 Visual Comparison</div>', unsafe_allow_html=True)
-            
-            # Create comparison bar chart
-            comparison_metrics = ['Applied', 'Admitted', 'Enrolled']
-            fig = go.Figure()
-            
-            colors = ['#4299e1', '#48bb78', '#ed8936']
-            
-            for i, school in enumerate(compare_data):
-                fig.add_trace(go.Bar(
-                    name=school['School'][:20] + '...' if len(school['School']) > 20 else school['School'],
-                    x=comparison_metrics,
-                    y=[school['Applied'], school['Admitted'], school['Enrolled']],
-                    marker_color=colors[i],
-                    text=[f"{int(v):,}" for v in [school['Applied'], school['Admitted'], school['Enrolled']]],
-                    textposition='outside'
-                ))
-            
-            fig.update_layout(
-                barmode='group',
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#a0aec0'),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
-                yaxis=dict(gridcolor='#2d3748'),
-                height=400,
-                margin=dict(l=40, r=40, t=60, b=40)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Admit rate comparison
-            fig2 = go.Figure()
+            emit_html('<div class="section-header">📊 Visual Comparison</div>')
             
-            school_names = [s['School'][:15] + '...' if len(s['School']) > 15 else s['School'] for s in compare_data]
-            admit_rates = [s['Admit_Rate_%'] for s in compare_data]
+            show_chart(fig)
             
-            fig2.add_trace(go.Bar(
-                x=school_names,
-                y=admit_rates,
-                marker_color=[get_rate_badge_color(r) for r in admit_rates],
-                text=[f"{r:.1f}%" for r in admit_rates],
-                textposition='outside'
-            ))
-            
-            fig2.update_layout(
-                title=dict(text="Admit Rate Comparison", font=dict(size=14, color='#fff')),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#a0aec0'),
-                yaxis=dict(title="Admit Rate (%)", gridcolor='#2d3748', range=[0, max(admit_rates) * 1.2]),
-                height=350,
-                margin=dict(l=40, r=40, t=60, b=80)
-            )
+            show_chart(fig2)
             
-            st.plotly_chart(fig2, use_container_width=True)
+            with st.expander("⬇️ Export"):
+                render_export_controls("compare", lambda: split_frame(pd.DataFrame(compare_data)), dataset_version,
+                                       (compare_uc, tuple(selected_schools)), "uc_comparison")
         
         elif len(selected_schools) == 1:
             st.info("Please select at least 2 schools to compare.")
@@ -843,22 +941,46 @@ def main():
     
     # ===== TAB 4: ANALYTICS =====
     with tab4:
-        st.markdown('<div class="section-header">📈 Analytics & Visualizations</div>', unsafe_allow_html=True)
+        emit_html('<div class="section-header">📈 Analytics & Visualizations</div>')
         
         # Analytics filter
+        keep_valid("analytics_uc", ["All UC", "UC Berkeley", "UCLA", "UCSD"])
         analytics_uc = st.selectbox(
             "Filter by UC Campus",
             options=["All UC", "UC Berkeley", "UCLA", "UCSD"],
             key="analytics_uc"
         )
         
-        if analytics_uc == "All UC":
-            analytics_df = df.copy()
-        else:
-            analytics_df = df[df['College'] == analytics_uc].copy()
+        if not streaming:
+            analytics_df = df if analytics_uc == "All UC" else df[df['College'] == analytics_uc]
+        
+        # Tables and figures for this campus (shared across sessions); the
+        # builder may run in the background, so Streamlit state is read here
+        county_geometry = load_county_geometry()
         
-        # Remove duplicates for overall analytics (keep best rate per school)
-        analytics_unique = analytics_df.loc[analytics_df.groupby('School')['Admit_Rate_%'].idxmax()]
+        def build_analytics():
+            prebuilt = snapshot.prebuilt('analytics') if snapshot is not None else None
+            figure_specs = snapshot.prebuilt('analytics_figures') if snapshot is not None else None
+            if streaming:
+                analytics = stream_agg.analytics(analytics_uc)
+            elif prebuilt is not None and analytics_uc in prebuilt:
+                analytics = prebuilt[analytics_uc]
+            else:
+                analytics = compute_analytics(analytics_df)
+            figures = None
+            if figure_specs is not None and analytics_uc in figure_specs:
+                figures = figures_from_specs(figure_specs[analytics_uc])
+            campus_sketch = sketches.get(ALL_ROWS if analytics_uc == "All UC" else analytics_uc)
+            return build_analytics_view(analytics_uc, analytics, campus_sketch, county_geometry, figures)
+        
+        analytics_key = (dataset_version, view_signature('analytics', analytics_uc=analytics_uc))
+        analytics_view = cached_view("Analytics", analytics_key, build_analytics, lineage(analytics_key))
+        analytics = analytics_view['analytics']
+        rate_summary = analytics_view['rate_summary']
+        
+        # Trends and deltas follow the campus shown, which is the previous
+        # selection's while a stale view is served
+        trend_key = ALL_ROWS if analytics_view['campus'] == "All UC" else analytics_view['campus']
         
         # Row 1: Top 10 schools chart and distribution
         col1, col2 = st.columns(2)
@@ -866,54 +988,13 @@ def main():
         with col1:
             st.markdown("### 🏆 Top 10 Schools by Admit Rate")
             
-            top_10 = analytics_df.nlargest(10, 'Admit_Rate_%')
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    y=[s[:20] + '...' if len(s) > 20 else s for s in top_10['School']],
-                    x=top_10['Admit_Rate_%'],
-                    orientation='h',
-                    marker_color=[get_rate_badge_color(r) for r in top_10['Admit_Rate_%']],
-                    text=[f"{r:.1f}%" for r in top_10['Admit_Rate_%']],
-                    textposition='outside'
-                )
-            ])
-            
-            fig.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#a0aec0'),
-                xaxis=dict(title="Admit Rate (%)", gridcolor='#2d3748'),
-                yaxis=dict(autorange="reversed"),
-                height=400,
-                margin=dict(l=150, r=60, t=20, b=40)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(analytics_view['top_chart'])
         
         with col2:
             st.markdown("### 📊 Admit Rate Distribution")
             
-            fig = go.Figure(data=[
-                go.Histogram(
-                    x=analytics_df['Admit_Rate_%'],
-                    nbinsx=20,
-                    marker_color='#4299e1',
-                    opacity=0.8
-                )
-            ])
-            
-            fig.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#a0aec0'),
-                xaxis=dict(title="Admit Rate (%)", gridcolor='#2d3748'),
-                yaxis=dict(title="Number of Schools", gridcolor='#2d3748'),
-                height=400,
-                margin=dict(l=60, r=40, t=20, b=40)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            # Pre-binned counts (same bins in memory and in streaming mode)
+            show_chart(analytics_view['distribution_chart'])
         
         # Row 2: Public vs Private and By City
         col1, col2 = st.columns(2)
@@ -921,30 +1002,9 @@ def main():
         with col1:
             st.markdown("### 🏫 Public vs Private Schools")
             
-            type_stats = analytics_unique.groupby('Private_Public').agg({
-                'School': 'count',
-                'Admit_Rate_%': 'mean',
-                'Applied': 'sum'
-            }).reset_index()
-            
-            fig = go.Figure(data=[
-                go.Pie(
-                    labels=type_stats['Private_Public'],
-                    values=type_stats['School'],
-                    hole=0.4,
-                    marker_colors=['#48bb78', '#ed8936']
-                )
-            ])
-            
-            fig.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#a0aec0'),
-                height=350,
-                margin=dict(l=20, r=20, t=20, b=20)
-            )
+            type_stats = analytics['type_stats']
             
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(analytics_view['type_chart'])
             
             # Stats below
             for _, row in type_stats.iterrows():
@@ -957,91 +1017,194 @@ def main():
         with col2:
             st.markdown("### 🌆 Top Cities by Average Admit Rate")
             
-            city_stats = analytics_unique.groupby('City').agg({
-                'Admit_Rate_%': 'mean',
-                'School': 'count'
-            }).reset_index()
-            
-            city_stats = city_stats[city_stats['School'] >= 2]  # At least 2 schools
-            city_stats = city_stats.nlargest(10, 'Admit_Rate_%')
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=city_stats['City'],
-                    y=city_stats['Admit_Rate_%'],
-                    marker_color='#9f7aea',
-                    text=[f"{r:.1f}%" for r in city_stats['Admit_Rate_%']],
-                    textposition='outside'
-                )
-            ])
-            
-            fig.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#a0aec0'),
-                xaxis=dict(tickangle=-45),
-                yaxis=dict(title="Avg Admit Rate (%)", gridcolor='#2d3748'),
-                height=350,
-                margin=dict(l=60, r=40, t=20, b=100)
-            )
+            if not deferred_section("City chart", analytics_key):
+                show_chart(analytics_view['city_chart'])
+        
+        # County map (geometry is fetched by the browser, only values are sent)
+        if len(analytics['county_stats']) > 0:
+            emit_html('<div class="section-header">🗺️ By County</div>')
             
-            st.plotly_chart(fig, use_container_width=True)
+            if not deferred_section("County map", analytics_key):
+                keep_valid("county_metric", list(COUNTY_METRICS))
+                county_metric = st.radio("Show", list(COUNTY_METRICS), horizontal=True, key="county_metric")
+                show_chart(analytics_view['county_figures'][county_metric])
+                if not analytics_view['county_is_map']:
+                    st.caption("County boundaries are not bundled; run `python geo.py --source <counties.geojson>` to enable the map.")
         
         # Row 3: Demographic comparison across all schools
-        st.markdown('<div class="section-header">👥 Overall Demographic Admit Rates</div>', unsafe_allow_html=True)
-        
-        # Calculate average demographic rates
-        demo_cols = {
-            'Asian': 'Asian_Admit_Rate_%',
-            'Hispanic/Latinx': 'Hispanic_Latinx_Admit_Rate_%',
-            'White': 'White_Admit_Rate_%',
-            'African American': 'African_American_Admit_Rate_%',
-            'International': 'International_Admit_Rate_%'
-        }
-        
-        demo_avgs = {}
-        for demo_name, col_name in demo_cols.items():
-            if col_name in analytics_df.columns:
-                non_zero = analytics_df[analytics_df[col_name] > 0][col_name]
-                if len(non_zero) > 0:
-                    demo_avgs[demo_name] = non_zero.mean()
-        
-        if demo_avgs:
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=list(demo_avgs.keys()),
-                    y=list(demo_avgs.values()),
-                    marker_color=['#4299e1', '#48bb78', '#ed8936', '#9f7aea', '#f56565'],
-                    text=[f"{v:.1f}%" for v in demo_avgs.values()],
-                    textposition='outside'
-                )
-            ])
+        emit_html('<div class="section-header">👥 Overall Demographic Admit Rates</div>')
+        
+        # Average demographic rates (schools with data)
+        if analytics_view['demo_chart'] is not None and not deferred_section("Demographic averages", analytics_key):
+            show_chart(analytics_view['demo_chart'])
+        
+        # Multi-year trend for the selected campus (deferred as a whole, deltas included)
+        trends = pd.DataFrame()
+        if years and not deferred_section("Multi-year trends", analytics_key):
+            trends = load_year_trends(year_signatures)
+        campus_trend = trends[trends['College'] == trend_key] if len(trends) > 0 else trends
+        baseline_trend = campus_trend[campus_trend['Year'] == baseline_year] if len(campus_trend) > 0 else campus_trend
+        
+        if selected_year is None and len(campus_trend) > 0:
+            # Extend the history with the current export's running totals
+            current_totals = snapshot.aggregates() if snapshot is not None else stream_agg.aggregates()
+            current_totals = current_totals[current_totals['College'] == trend_key]
+            campus_trend = pd.concat([campus_trend, current_totals.assign(Year="Current")], ignore_index=True)
+        
+        # Deltas compare the shown year's totals with the baseline's, both from
+        # the same per-campus aggregates (system-wide rows for "All UC")
+        current_year = "Current" if selected_year is None else selected_year
+        current_trend = campus_trend[campus_trend['Year'] == current_year] if len(campus_trend) > 0 else campus_trend
+        current_stats = current_trend.iloc[0] if len(current_trend) > 0 else None
+        
+        if len(campus_trend) >= 2:
+            emit_html('<div class="section-header">📈 Multi-Year Trends</div>')
             
-            fig.update_layout(
-                title=dict(text="Average Admit Rate by Demographics (Schools with Data)", font=dict(size=14, color='#fff')),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#a0aec0'),
-                yaxis=dict(title="Average Admit Rate (%)", gridcolor='#2d3748'),
-                height=400,
-                margin=dict(l=60, r=40, t=60, b=60)
-            )
+            col1, col2, col3 = st.columns(3)
             
-            st.plotly_chart(fig, use_container_width=True)
+            with col1:
+                show_chart(create_trend_sparkline(campus_trend['Year'], campus_trend['Avg_Admit_Rate'], "Avg Admit Rate"))
+            with col2:
+                show_chart(create_trend_sparkline(campus_trend['Year'], campus_trend['Applied'], "Total Applications", '#48bb78', ''))
+            with col3:
+                show_chart(create_trend_sparkline(campus_trend['Year'], campus_trend['Schools'], "Schools Reporting", '#9f7aea', ''))
         
         # Summary statistics
-        st.markdown('<div class="section-header">📋 Summary Statistics</div>', unsafe_allow_html=True)
+        emit_html('<div class="section-header">📋 Summary Statistics</div>')
+        
+        baseline_stats = baseline_trend.iloc[0] if len(baseline_trend) > 0 else None
+        
+        def trend_delta(column, suffix=""):
+            if current_stats is None or baseline_stats is None:
+                return None
+            return format_delta(current_stats[column], baseline_stats[column], suffix)
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Schools", len(analytics_unique))
+            st.metric("Total Schools", analytics['total_schools'], delta=trend_delta('Schools'))
         with col2:
-            st.metric("Avg Admit Rate", f"{analytics_df['Admit_Rate_%'].mean():.1f}%")
+            st.metric("Avg Admit Rate", f"{analytics['avg_rate']:.1f}%", delta=trend_delta('Avg_Admit_Rate', " pts"))
         with col3:
-            st.metric("Highest Rate", f"{analytics_df['Admit_Rate_%'].max():.1f}%")
+            st.metric("Highest Rate", f"{analytics['max_rate']:.1f}%")
         with col4:
-            st.metric("Lowest Rate", f"{analytics_df['Admit_Rate_%'].min():.1f}%")
+            st.metric("Lowest Rate", f"{analytics['min_rate']:.1f}%")
+        
+        # Percentiles and distinct counts from the sketches
+        if rate_summary is not None and rate_summary['median'] is not None:
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("Median Admit Rate", f"{rate_summary['median']:.1f}%")
+            with col2:
+                st.metric("Interquartile Range", f"{rate_summary['p25']:.1f}% – {rate_summary['p75']:.1f}%",
+                          help=f"Middle 50% of schools; spread {rate_summary['p75'] - rate_summary['p25']:.1f} pts")
+            with col3:
+                st.metric("Cities", f"~{rate_summary['cities']:,}", help="Approximate distinct count (HyperLogLog)")
+        
+        # Export of the rows behind this campus filter
+        with st.expander("⬇️ Export"):
+            if streaming:
+                college_filter = None if analytics_uc == "All UC" else analytics_uc
+                make_frames = lambda: filter_chunks(iter_chunks(data_path), college=college_filter)
+            else:
+                make_frames = lambda: split_frame(analytics_df)
+            render_export_controls("analytics", make_frames, dataset_version, (analytics_uc,), "uc_analytics",
+                                   api_export({'scope': "filtered", 'college': analytics_uc}), out_of_core=streaming)
+        
+        # What ingest validation found in the whole export
+        if streaming:
+            quality = stream_agg.quality
+        elif snapshot is not None:
+            quality = snapshot.quality
+        else:
+            quality = year_quality(selected_year)
+        if quality is not None:
+            render_quality_report(quality)
+    
+    # ===== TAB 5: PIVOT =====
+    with tab5:
+        emit_html('<div class="section-header">🧮 Pivot Explorer</div>')
+        
+        if streaming:
+            st.info("Pivots need the full table, which is not held in memory for very large exports. "
+                    "Build a bundle with `python build.py` to enable them.")
+        else:
+            if snapshot is not None:
+                engine = snapshot.derived('pivot', PivotEngine)
+            else:
+                engine = load_year_pivot(selected_year, dict(year_signatures)[selected_year])
+            
+            dimensions = list(DIMENSIONS)
+            # Start from the shared-link defaults, so a default view adds nothing to the URL
+            for key in ("pivot_rows", "pivot_columns", "pivot_measure"):
+                if key not in st.session_state:
+                    default = VIEW_PARAMS[key][1]
+                    st.session_state[key] = list(default) if isinstance(default, list) else default
+            keep_valid("pivot_rows", dimensions, multi=True)
+            keep_valid("pivot_measure", list(MEASURES))
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                pivot_rows = st.multiselect("Rows", options=dimensions, max_selections=3, key="pivot_rows")
+            
+            column_options = [d for d in dimensions if d not in pivot_rows]
+            keep_valid("pivot_columns", column_options, multi=True)
+            
+            with col2:
+                pivot_columns = st.multiselect("Columns", options=column_options, max_selections=2, key="pivot_columns")
+            
+            with col3:
+                pivot_measure = st.selectbox("Measure", options=list(MEASURES), key="pivot_measure")
+            
+            # Without a Campus dimension, keep one campus so "All UC" totals are not added to campus rows
+            filters = {}
+            pivot_campus = None
+            if "Campus" not in pivot_rows + pivot_columns:
+                campuses = engine.labels("Campus")
+                keep_valid("pivot_campus", campuses)
+                pivot_campus = st.selectbox("Campus", options=campuses, key="pivot_campus",
+                                            help='"All UC" rows are the system-wide totals reported next to each campus')
+                filters["Campus"] = pivot_campus
+            
+            if not pivot_rows:
+                st.info("Pick at least one row dimension.")
+            else:
+                pivot_key = (dataset_version, view_signature(
+                    'pivot', pivot_rows=pivot_rows, pivot_columns=pivot_columns,
+                    pivot_measure=pivot_measure, pivot_campus=pivot_campus))
+                table = cached_view("Pivot", pivot_key,
+                                    lambda: engine.pivot(pivot_rows, pivot_columns, pivot_measure, filters),
+                                    lineage(pivot_key))
+                
+                is_rate = pivot_measure.endswith("(%)")
+                st.caption(f"{len(table):,} rows × {len(table.columns):,} columns"
+                           + (" · pooled rates (total admitted / total applied)" if is_rate else ""))
+                show_table(table.round(1 if is_rate else 0).reset_index(), "Pivot", pivot_key,
+                           use_container_width=True, hide_index=True)
+                
+                with st.expander("⬇️ Export"):
+                    if view_is_stale("Pivot"):
+                        st.caption("Available once the results are up to date.")
+                    else:
+                        render_export_controls("pivot", lambda: split_frame(table.reset_index()), dataset_version,
+                                               pivot_key[1], "uc_pivot")
+    
+    # Keep the URL in step with the view so it can be shared
+    sync_view()
+    
+    # Memory accounting and budgets
+    ledger.charge(current_session_id(), "Session state", estimate_bytes(st.session_state.to_dict()))
+    enforce_memory_budget(snapshot, dataset_id)
+    
+    # Record the rerun; tell the user what was degraded
+    budget.finish()
+    if budget.degraded:
+        degraded_notice.info("⏱️ The server is busy, so this page shows the latest cached results and "
+                             "loads some sections on request.")
+    if st.query_params.get("debug") == "1":
+        render_debug_panel()
 
 
 if __name__ == "__main__":
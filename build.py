@@ -0,0 +1,48 @@
+"""
+Build prebuilt artifact bundles ahead of deployment
+
+Ingests each dataset's CSV once and writes its bundle (see bundle.py), so
+replicas memory-map the result at startup instead of deriving indexes,
+aggregates, leaderboards and figures on the request path.
+
+    python build.py                        # every dataset in the manifest
+    python build.py --dataset uc-freshman  # one dataset
+    python build.py --data export.csv --out bundle/
+"""
+
+import argparse
+import os
+import time
+
+from bundle import write_bundle
+from datasets import MANIFEST_PATH, read_manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build prebuilt artifact bundles for instant dashboard startup")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help="Dataset manifest (default: data/datasets.json)")
+    parser.add_argument("--dataset", action="append", help="Only build this dataset id (repeatable)")
+    parser.add_argument("--data", default=None, help="Build a single CSV instead of the manifest (needs --out)")
+    parser.add_argument("--out", default=None, help="Bundle directory for --data")
+    args = parser.parse_args()
+
+    if args.data:
+        if not args.out:
+            parser.error("--data needs --out")
+        targets = [(os.path.basename(args.data), args.data, args.out)]
+    else:
+        specs, _ = read_manifest(args.manifest)
+        unknown = set(args.dataset or []) - {spec['id'] for spec in specs}
+        if unknown:
+            parser.error(f"Unknown dataset(s): {', '.join(sorted(unknown))}")
+        targets = [(spec['id'], spec['path'], spec['bundle']) for spec in specs
+                   if not args.dataset or spec['id'] in args.dataset]
+
+    for name, path, out_dir in targets:
+        start = time.time()
+        meta = write_bundle(path, out_dir)
+        print(f"{name}: {meta['rows']:,} rows, version {meta['version']} -> {out_dir} ({time.time() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
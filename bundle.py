@@ -0,0 +1,201 @@
+"""
+Prebuilt artifact bundles for instant startup
+
+A bundle holds everything the dashboard would otherwise derive from a
+dataset's CSV on startup or on the first request:
+
+    bundle.json         format, dataset version, source signature, running
+                        totals, option catalogs, ingest QualityReport
+    frame/              typed, dictionary-encoded columns (memory-mapped)
+    hashes.npy          per-row content hashes for the (School, College) index
+    sketches.npz        per-campus rate and distinct-count sketches
+    leaderboards.npz    top rows for every Rankings filter combination
+    analytics.json      Analytics tables for "All UC" and each campus
+    figures.json        Analytics figures, pre-serialised as Plotly JSON
+
+Bundles are written by ``python build.py`` ahead of deployment. At startup a
+bundle whose dataset version matches the CSV is loaded into a snapshot with
+all of the above pre-filled; a missing or stale bundle is ignored and the CSV
+is ingested as before. Live reloads work the same from either starting point.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from components import create_analytics_figures
+from data_store import (
+    ALL_ROWS, HISTOGRAM_EDGES, Snapshot, build_campus_analytics, build_catalogs,
+    build_leaderboards, content_version, load_export, read_partition,
+    source_signature, write_partition
+)
+from ingest import QualityReport
+from sketches import build_sketches, sketches_from_arrays, sketches_to_arrays
+
+
+# Bumped when the bundle layout or its contents change
+BUNDLE_FORMAT = 3
+BUNDLE_META = "bundle.json"
+FRAME_DIRNAME = "frame"
+
+
+def _to_json(value):
+    """JSON-ready copy of nested tables (frames are stored in 'split' orientation)"""
+    if isinstance(value, pd.DataFrame):
+        return {'__frame__': json.loads(value.to_json(orient="split", index=False, double_precision=15))}
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+def _from_json(value):
+    """Inverse of ``_to_json()``"""
+    if isinstance(value, dict):
+        if '__frame__' in value:
+            frame = value['__frame__']
+            return pd.DataFrame(frame['data'], columns=frame['columns'])
+        return {k: _from_json(v) for k, v in value.items()}
+    return value
+
+
+def figures_from_specs(specs):
+    """Plotly figures from pre-serialised specs, with their payload size memoised"""
+    figures = {}
+    for name, spec in specs.items():
+        if spec is None:
+            figures[name] = None
+            continue
+        fig = go.Figure(spec['figure'])
+        fig._payload_bytes = spec['bytes']
+        figures[name] = fig
+    return figures
+
+
+# ===== WRITE =====
+
+def write_bundle(path, out_dir):
+    """Ingest ``path`` and write its bundle to ``out_dir``; returns the bundle meta
+
+    Written to a temporary directory and moved into place, so a running app
+    never sees a partial bundle.
+    """
+    signature = source_signature(path)
+    version = content_version(path)
+    df, report = load_export(path)
+    snapshot = Snapshot.build(df, version, os.path.getmtime(path), report)
+    df = snapshot.df
+
+    tmp_dir = out_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    write_partition(df, os.path.join(tmp_dir, FRAME_DIRNAME), signature, report)
+    np.save(os.path.join(tmp_dir, "hashes.npy"), snapshot.hashes.to_numpy())
+
+    sketches = build_sketches(df)
+    np.savez(os.path.join(tmp_dir, "sketches.npz"), **sketches_to_arrays(sketches))
+
+    leaderboards = build_leaderboards(df)
+    keys = list(leaderboards)
+    np.savez(os.path.join(tmp_dir, "leaderboards.npz"),
+             **{f"k{i}": np.asarray(leaderboards[key], dtype=np.int64) for i, key in enumerate(keys)})
+
+    analytics = build_campus_analytics(df)
+    with open(os.path.join(tmp_dir, "analytics.json"), "w") as f:
+        json.dump(_to_json(analytics), f, separators=(",", ":"))
+
+    figures = {}
+    for campus, tables in analytics.items():
+        sketch = sketches.get(ALL_ROWS if campus == "All UC" else campus)
+        rate_counts = sketch.rates.histogram(HISTOGRAM_EDGES) if sketch is not None else []
+        figures[campus] = {}
+        for name, fig in create_analytics_figures(tables, rate_counts, HISTOGRAM_EDGES).items():
+            spec = fig.to_json() if fig is not None else None
+            figures[campus][name] = None if spec is None else {'figure': json.loads(spec), 'bytes': len(spec.encode("utf-8"))}
+    with open(os.path.join(tmp_dir, "figures.json"), "w") as f:
+        json.dump(figures, f, separators=(",", ":"))
+
+    meta = {
+        'format': BUNDLE_FORMAT,
+        'version': version,
+        'source': {'file': os.path.basename(path), 'signature': signature},
+        'rows': len(df),
+        'totals': _to_json(snapshot.totals),
+        'school_counts': _to_json(snapshot.school_counts),
+        'catalogs': build_catalogs(df),
+        'leaderboards': [list(key) for key in keys],
+        'quality': report.to_dict(),
+    }
+    with open(os.path.join(tmp_dir, BUNDLE_META), "w") as f:
+        json.dump(_to_json(meta), f)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return meta
+
+
+# ===== LOAD =====
+
+def read_bundle_meta(bundle_dir):
+    """A bundle's meta, or None when there is no readable bundle"""
+    try:
+        with open(os.path.join(bundle_dir, BUNDLE_META)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('format') == BUNDLE_FORMAT else None
+
+
+def bundle_is_current(meta, path):
+    """Whether a bundle was built from the current content of ``path``
+
+    An unchanged size and mtime is trusted; otherwise (e.g. the file was
+    copied during deployment) the content hash decides.
+    """
+    if meta['source']['signature'] == source_signature(path):
+        return True
+    return meta['version'] == content_version(path)
+
+
+def load_bundle(bundle_dir, path):
+    """Snapshot of ``path`` restored from its bundle, or None when missing or stale"""
+    meta = read_bundle_meta(bundle_dir)
+    if meta is None or not bundle_is_current(meta, path):
+        return None
+
+    frame_dir = os.path.join(bundle_dir, FRAME_DIRNAME)
+    with open(os.path.join(frame_dir, "meta.json")) as f:
+        df = read_partition(frame_dir, json.load(f))
+
+    with np.load(os.path.join(bundle_dir, "sketches.npz")) as arrays:
+        sketches = sketches_from_arrays(dict(arrays))
+    with np.load(os.path.join(bundle_dir, "leaderboards.npz")) as arrays:
+        leaderboards = {tuple(key): arrays[f"k{i}"] for i, key in enumerate(meta['leaderboards'])}
+    with open(os.path.join(bundle_dir, "analytics.json")) as f:
+        analytics = _from_json(json.load(f))
+    with open(os.path.join(bundle_dir, "figures.json")) as f:
+        figure_specs = json.load(f)
+
+    derived = {
+        'sketches': sketches,
+        'catalogs': meta['catalogs'],
+        'leaderboards': leaderboards,
+        'analytics': analytics,
+        'analytics_figures': figure_specs,
+    }
+    return Snapshot.restore(
+        df, meta['version'], os.path.getmtime(path),
+        np.load(os.path.join(bundle_dir, "hashes.npy"), mmap_mode='r'),
+        meta['totals'], meta['school_counts'],
+        QualityReport.from_dict(meta['quality']), derived,
+    )
@@ -0,0 +1,494 @@
+"""
+Rendering helpers shared by the dashboard and the static site export
+HTML snippets, stylesheet and Plotly figure builders (no Streamlit calls)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from geo import choose_level, county_codes, geometry_url
+
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STYLESHEET_PATH = os.path.join(STATIC_DIR, "style.css")
+
+# Custom CSS for mobile-friendly, modern design (served as a static file by
+# the app; inlined only where static serving is unavailable)
+with open(STYLESHEET_PATH, encoding="utf-8") as _f:
+    STYLESHEET = _f.read()
+
+APP_CSS = f"<style>{STYLESHEET}</style>"
+
+
+def get_rate_color(rate):
+    """Return color class based on admit rate"""
+    if rate >= 70:
+        return "high"
+    elif rate >= 40:
+        return "medium"
+    else:
+        return "low"
+
+
+def get_rate_badge_color(rate):
+    """Return badge color hex based on admit rate"""
+    if rate >= 70:
+        return "#48bb78"
+    elif rate >= 40:
+        return "#ecc94b"
+    else:
+        return "#fc8181"
+
+
+def render_school_card(school, idx, show_details=False):
+    """Render a school card with all information"""
+    rate_class = get_rate_color(school['Admit_Rate_%'])
+    type_class = "public" if school['Private_Public'] == "Public" else "private"
+    
+    card_html = (
+        f'<div class="school-card"><div class="card-top"><div>'
+        f'<div class="school-name">#{idx} {school["School"]}</div>'
+        f'<div class="school-city">📍 {school["City"]}, {school["County"]} County</div></div>'
+        f'<div class="card-badges"><span class="badge badge-{type_class}">{school["Private_Public"]}</span>'
+        f'<span class="badge badge-rate-{rate_class}">{school["Admit_Rate_%"]:.1f}%</span></div></div>'
+        f'<div class="school-stats">'
+        f'<div class="stat-item"><span class="stat-label">Applied:</span><span class="stat-value">{int(school["Applied"]):,}</span></div>'
+        f'<div class="stat-item"><span class="stat-label">Admitted:</span><span class="stat-value">{int(school["Admitted"]):,}</span></div>'
+        f'<div class="stat-item"><span class="stat-label">Enrolled:</span><span class="stat-value">{int(school["Enrolled"]):,}</span></div>'
+        f'<div class="stat-item"><span class="stat-label">UC Campus:</span><span class="stat-value">{school["College"]}</span></div></div>'
+        f'<div class="progress-container"><div class="progress-bar progress-{rate_class}" '
+        f'style="width:{min(school["Admit_Rate_%"], 100):.1f}%"></div></div></div>'
+    )
+    return card_html
+
+
+def render_metric_card(value, label, icon=""):
+    """Render a metric card"""
+    return f'<div class="metric-card"><div class="metric-value">{icon} {value}</div><div class="metric-label">{label}</div></div>'
+
+
+# Display name -> column prefix for the charted demographic groups
+DEMOGRAPHIC_GROUPS = {
+    'Asian': 'Asian',
+    'Hispanic/Latinx': 'Hispanic_Latinx',
+    'White': 'White',
+    'African American': 'African_American',
+    'International': 'International',
+}
+
+
+def has_group_data(school, group):
+    """Whether a school has usable counts for a group (ingest's has-data mask)"""
+    return bool(school.get(f'{group}_Has_Data', school.get(f'{group}_Applied', 0) > 0))
+
+
+def create_demographic_chart(school):
+    """Create a demographic breakdown chart for a school"""
+    # Groups without usable counts are left out
+    demographics = {
+        name: school.get(f'{group}_Admit_Rate_%', 0)
+        for name, group in DEMOGRAPHIC_GROUPS.items() if has_group_data(school, group)
+    }
+    
+    if not demographics:
+        return None
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=list(demographics.keys()),
+            y=list(demographics.values()),
+            marker_color=['#4299e1', '#48bb78', '#ed8936', '#9f7aea', '#f56565'],
+            text=[f'{v:.1f}%' for v in demographics.values()],
+            textposition='outside'
+        )
+    ])
+    
+    fig.update_layout(
+        title=dict(text="Admission Rate by Demographics", font=dict(size=14, color='#fff')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        yaxis=dict(
+            title="Admit Rate (%)",
+            gridcolor='#2d3748',
+            range=[0, max(max(demographics.values()) * 1.2, 1)]
+        ),
+        xaxis=dict(title="", tickangle=-45),
+        height=350,
+        margin=dict(l=40, r=40, t=60, b=80)
+    )
+
+    return fig
+
+
+def create_demographic_applications_chart(school):
+    """Create a chart showing applications by demographics"""
+    # Groups without usable counts are left out
+    demographics = {
+        name: school.get(f'{group}_Applied', 0)
+        for name, group in DEMOGRAPHIC_GROUPS.items() if has_group_data(school, group)
+    }
+    
+    if not demographics:
+        return None
+    
+    fig = go.Figure(data=[
+        go.Pie(
+            labels=list(demographics.keys()),
+            values=list(demographics.values()),
+            hole=0.4,
+            marker_colors=['#4299e1', '#48bb78', '#ed8936', '#9f7aea', '#f56565']
+        )
+    ])
+    
+    fig.update_layout(
+        title=dict(text="Applications by Demographics", font=dict(size=14, color='#fff')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        height=350,
+        margin=dict(l=20, r=20, t=60, b=20),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2)
+    )
+
+    return fig
+
+
+def create_demographic_table(school):
+    """Build the detailed demographics table (groups with applicants only)"""
+    demo_data = {
+        'Demographic': ['Asian', 'Hispanic/Latinx', 'White', 'African American', 'International', 'Pacific Islander', 'American Indian'],
+        'Applied': [
+            int(school.get('Asian_Applied', 0)),
+            int(school.get('Hispanic_Latinx_Applied', 0)),
+            int(school.get('White_Applied', 0)),
+            int(school.get('African_American_Applied', 0)),
+            int(school.get('International_Applied', 0)),
+            int(school.get('Pacific_Islander_Applied', 0)),
+            int(school.get('American_Indian_Applied', 0))
+        ],
+        'Admitted': [
+            int(school.get('Asian_Admitted', 0)),
+            int(school.get('Hispanic_Latinx_Admitted', 0)),
+            int(school.get('White_Admitted', 0)),
+            int(school.get('African_American_Admitted', 0)),
+            int(school.get('International_Admitted', 0)),
+            int(school.get('Pacific_Islander_Admitted', 0)),
+            int(school.get('American_Indian_Admitted', 0))
+        ],
+        'Admit Rate (%)': [
+            school.get('Asian_Admit_Rate_%', 0),
+            school.get('Hispanic_Latinx_Admit_Rate_%', 0),
+            school.get('White_Admit_Rate_%', 0),
+            school.get('African_American_Admit_Rate_%', 0),
+            school.get('International_Admit_Rate_%', 0),
+            school.get('Pacific_Islander_Admit_Rate_%', 0),
+            school.get('American_Indian_Admit_Rate_%', 0)
+        ]
+    }
+
+    demo_df = pd.DataFrame(demo_data)
+    groups = [DEMOGRAPHIC_GROUPS.get(name, name.replace(' ', '_')) for name in demo_data['Demographic']]
+    return demo_df[[has_group_data(school, group) for group in groups]]  # Only show demographics with data
+
+
+def create_trend_sparkline(years, values, label, color='#4299e1', suffix='%'):
+    """Create a compact line chart of a metric across admissions years"""
+    fig = go.Figure(data=[
+        go.Scatter(
+            x=[str(y) for y in years],
+            y=list(values),
+            mode='lines+markers',
+            line=dict(color=color, width=2),
+            marker=dict(size=5),
+            hovertemplate=f'%{{x}}: %{{y:,.1f}}{suffix}<extra></extra>'
+        )
+    ])
+
+    fig.update_layout(
+        title=dict(text=label, font=dict(size=12, color='#fff')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0', size=10),
+        xaxis=dict(showgrid=False, type='category'),
+        yaxis=dict(gridcolor='#2d3748'),
+        height=160,
+        margin=dict(l=30, r=10, t=30, b=20),
+        showlegend=False
+    )
+
+    return fig
+
+
+def create_top_schools_chart(top_10):
+    """Create a horizontal bar chart of the top schools by admit rate"""
+    fig = go.Figure(data=[
+        go.Bar(
+            y=[s[:20] + '...' if len(s) > 20 else s for s in top_10['School']],
+            x=top_10['Admit_Rate_%'],
+            orientation='h',
+            marker_color=[get_rate_badge_color(r) for r in top_10['Admit_Rate_%']],
+            text=[f"{r:.1f}%" for r in top_10['Admit_Rate_%']],
+            textposition='outside'
+        )
+    ])
+
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        xaxis=dict(title="Admit Rate (%)", gridcolor='#2d3748'),
+        yaxis=dict(autorange="reversed"),
+        height=400,
+        margin=dict(l=150, r=60, t=20, b=40)
+    )
+
+    return fig
+
+
+def create_rate_distribution_chart(counts, edges):
+    """Create the admit rate distribution chart from pre-binned counts"""
+    bin_width = edges[1] - edges[0]
+    fig = go.Figure(data=[
+        go.Bar(
+            x=np.asarray(edges[:-1]) + bin_width / 2,
+            y=counts,
+            width=bin_width,
+            marker_color='#4299e1',
+            opacity=0.8
+        )
+    ])
+
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        bargap=0,
+        xaxis=dict(title="Admit Rate (%)", gridcolor='#2d3748'),
+        yaxis=dict(title="Number of Schools", gridcolor='#2d3748'),
+        height=400,
+        margin=dict(l=60, r=40, t=20, b=40)
+    )
+
+    return fig
+
+
+def create_school_type_chart(type_stats):
+    """Create a donut chart of schools by type (Public/Private)"""
+    fig = go.Figure(data=[
+        go.Pie(
+            labels=type_stats['Private_Public'],
+            values=type_stats['School'],
+            hole=0.4,
+            marker_colors=['#48bb78', '#ed8936']
+        )
+    ])
+
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        height=350,
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+
+    return fig
+
+
+def create_city_chart(city_stats):
+    """Create a bar chart of the top cities by average admit rate"""
+    fig = go.Figure(data=[
+        go.Bar(
+            x=city_stats['City'],
+            y=city_stats['Admit_Rate_%'],
+            marker_color='#9f7aea',
+            text=[f"{r:.1f}%" for r in city_stats['Admit_Rate_%']],
+            textposition='outside'
+        )
+    ])
+
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        xaxis=dict(tickangle=-45),
+        yaxis=dict(title="Avg Admit Rate (%)", gridcolor='#2d3748'),
+        height=350,
+        margin=dict(l=60, r=40, t=20, b=100)
+    )
+
+    return fig
+
+
+def create_demographic_averages_chart(demo_avgs):
+    """Create a bar chart of average admit rates by demographic group"""
+    fig = go.Figure(data=[
+        go.Bar(
+            x=list(demo_avgs.keys()),
+            y=list(demo_avgs.values()),
+            marker_color=['#4299e1', '#48bb78', '#ed8936', '#9f7aea', '#f56565'],
+            text=[f"{v:.1f}%" for v in demo_avgs.values()],
+            textposition='outside'
+        )
+    ])
+
+    fig.update_layout(
+        title=dict(text="Average Admit Rate by Demographics (Schools with Data)", font=dict(size=14, color='#fff')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        yaxis=dict(title="Average Admit Rate (%)", gridcolor='#2d3748'),
+        height=400,
+        margin=dict(l=60, r=40, t=60, b=60)
+    )
+
+    return fig
+
+
+def create_analytics_figures(analytics, rate_counts, edges):
+    """Figures of the Analytics tab for one campus (everything but the county section)"""
+    return {
+        'top_chart': create_top_schools_chart(analytics['top_10']),
+        'distribution_chart': create_rate_distribution_chart(rate_counts, edges),
+        'type_chart': create_school_type_chart(analytics['type_stats']),
+        'city_chart': create_city_chart(analytics['city_stats']),
+        'demo_chart': create_demographic_averages_chart(analytics['demo_avgs']) if analytics['demo_avgs'] else None,
+    }
+
+
+def create_comparison_chart(compare_data):
+    """Create a grouped bar chart of Applied/Admitted/Enrolled for compared schools"""
+    comparison_metrics = ['Applied', 'Admitted', 'Enrolled']
+    fig = go.Figure()
+
+    colors = ['#4299e1', '#48bb78', '#ed8936']
+
+    for i, school in enumerate(compare_data):
+        fig.add_trace(go.Bar(
+            name=school['School'][:20] + '...' if len(school['School']) > 20 else school['School'],
+            x=comparison_metrics,
+            y=[school['Applied'], school['Admitted'], school['Enrolled']],
+            marker_color=colors[i],
+            text=[f"{int(v):,}" for v in [school['Applied'], school['Admitted'], school['Enrolled']]],
+            textposition='outside'
+        ))
+
+    fig.update_layout(
+        barmode='group',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        yaxis=dict(gridcolor='#2d3748'),
+        height=400,
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+
+    return fig
+
+
+def create_comparison_rate_chart(compare_data):
+    """Create a bar chart of admit rates for compared schools"""
+    fig = go.Figure()
+
+    school_names = [s['School'][:15] + '...' if len(s['School']) > 15 else s['School'] for s in compare_data]
+    admit_rates = [s['Admit_Rate_%'] for s in compare_data]
+
+    fig.add_trace(go.Bar(
+        x=school_names,
+        y=admit_rates,
+        marker_color=[get_rate_badge_color(r) for r in admit_rates],
+        text=[f"{r:.1f}%" for r in admit_rates],
+        textposition='outside'
+    ))
+
+    fig.update_layout(
+        title=dict(text="Admit Rate Comparison", font=dict(size=14, color='#fff')),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        yaxis=dict(title="Admit Rate (%)", gridcolor='#2d3748', range=[0, max(admit_rates) * 1.2]),
+        height=350,
+        margin=dict(l=40, r=40, t=60, b=80)
+    )
+
+    return fig
+
+
+# County map metrics: label -> (column, colour scale, hover format)
+COUNTY_METRICS = {
+    "Admit Rate": ('Pooled_Admit_Rate', 'RdYlGn', '.1f', '%'),
+    "Applicants": ('Applied', 'Blues', ',.0f', ''),
+}
+
+
+def create_county_map(county_stats, geojson_url, metric):
+    """Create a county choropleth that references bundled geometry by URL
+
+    Only the per-county values travel with the figure; the browser fetches
+    (and caches) the GeoJSON itself.
+    """
+    value_col, colorscale, fmt, suffix = COUNTY_METRICS[metric]
+    stats = county_stats.dropna(subset=['FIPS'])
+
+    fig = go.Figure(go.Choropleth(
+        geojson=geojson_url,
+        featureidkey='id',
+        locations=stats['FIPS'],
+        z=stats[value_col],
+        text=stats['County'],
+        customdata=stats[['Schools', 'Applied']].to_numpy(),
+        colorscale=colorscale,
+        marker_line_color='#1a202c',
+        colorbar=dict(title=dict(text=metric, font=dict(color='#a0aec0')), tickfont=dict(color='#a0aec0'), ticksuffix=suffix),
+        hovertemplate=f"<b>%{{text}} County</b><br>{metric}: %{{z:{fmt}}}{suffix}<br>"
+                      "Schools: %{customdata[0]}<br>Applicants: %{customdata[1]:,}<extra></extra>"
+    ))
+
+    fig.update_geos(fitbounds='locations', visible=False, bgcolor='rgba(0,0,0,0)')
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        height=420,
+        margin=dict(l=0, r=0, t=10, b=0)
+    )
+
+    return fig
+
+
+def create_county_chart(county_stats, metric):
+    """Create a bar chart of a county metric (used when no geometry is bundled)"""
+    value_col, _, fmt, suffix = COUNTY_METRICS[metric]
+    stats = county_stats.sort_values(value_col, ascending=True)
+
+    fig = go.Figure(go.Bar(
+        x=stats[value_col],
+        y=stats['County'],
+        orientation='h',
+        marker_color='#4299e1',
+        text=[f"{v:{fmt}}{suffix}" for v in stats[value_col]],
+        textposition='outside'
+    ))
+
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a0aec0'),
+        xaxis=dict(title=metric, gridcolor='#2d3748'),
+        height=max(200, 40 * len(stats) + 80),
+        margin=dict(l=120, r=60, t=20, b=40)
+    )
+
+    return fig
+
+
+def build_county_figures(county_stats, manifest):
+    """One county figure per metric: choropleths by URL, or bar charts without geometry"""
+    county_stats = county_stats.assign(FIPS=county_codes(county_stats['County']))
+    if manifest is None or county_stats['FIPS'].notna().sum() == 0:
+        return {metric: create_county_chart(county_stats, metric) for metric in COUNTY_METRICS}, False
+    url = geometry_url(manifest, choose_level(manifest, county_stats['FIPS'].dropna()))
+    return {metric: create_county_map(county_stats, url, metric) for metric in COUNTY_METRICS}, True
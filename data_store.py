@@ -0,0 +1,783 @@
+"""
+Data loading and storage for the UC Schools dashboard
+
+The dashboard serves the current snapshot CSV plus, optionally, a directory of
+yearly exports. Each yearly export is converted once into a columnar partition
+(one .npy file per column) that is memory-mapped on load, so only the years and
+columns a view actually touches are paged in.
+"""
+
+import csv
+import functools
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ingest import GROUPS, QualityReport, has_data_col, ingest
+
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FILENAME = "UC_Schools_Admission_Rankings.csv"
+
+# Candidate locations for the current snapshot, tried in order
+DATA_PATHS = [
+    os.path.join(BASE_DIR, "data", DATA_FILENAME),
+    os.path.join("data", DATA_FILENAME),
+    os.path.join("..", "data", DATA_FILENAME),
+]
+
+# Directory of yearly exports, e.g. data/years/UC_Schools_Admission_Rankings_2023.csv
+YEARS_DIR = os.environ.get("UC_YEARS_DIR", os.path.join(BASE_DIR, "data", "years"))
+PARTITIONS_DIRNAME = ".partitions"
+# Bumped when ingest changes what a partition holds
+PARTITION_FORMAT = 4
+YEAR_PATTERN = re.compile(r"(?<!\d)((?:19|20)\d{2})(?!\d)")
+
+KEY_COLS = ['School', 'College']
+
+# Columns every export must have
+REQUIRED_COLS = KEY_COLS + ['Applied', 'Admitted', 'Enrolled', 'Admit_Rate_%']
+
+# College label of the "All UC" entry in per-campus tables. Analytics and
+# leaderboards count every row under it (like the "All UC" filter); trend
+# totals and rate sketches hold the system-wide figures (see system_entry())
+ALL_ROWS = '*'
+
+# College value of the UC-wide rows an export reports next to campus rows
+SYSTEM_COLLEGE = "All UC"
+
+NUMERIC_COLS = ['Applied', 'Admitted', 'Enrolled', 'Admit_Rate_%'] + [
+    f'{group}_{measure}' for group in GROUPS for measure in ('Applied', 'Admitted', 'Enrolled', 'Admit_Rate_%')
+]
+
+
+def find_data_file():
+    """Return the path of the current snapshot CSV"""
+    for path in DATA_PATHS:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"Could not find {DATA_FILENAME} in any of: {', '.join(DATA_PATHS)}")
+
+
+SEPARATORS = (",", "\t")  # Ties go to the first
+
+
+def sniff_separator(path):
+    """Detect whether an export is tab- or comma-separated from its header
+
+    The header is split with each candidate and the one yielding more
+    columns wins, so separators inside quoted column names do not count.
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        header = f.readline()
+    widths = {sep: len(next(csv.reader([header], delimiter=sep), [])) for sep in SEPARATORS}
+    return max(SEPARATORS, key=lambda sep: widths[sep])
+
+
+def prepare_frame(df):
+    """Clean column names and coerce numeric columns"""
+    # Clean column names
+    df.columns = df.columns.str.strip()
+
+    # Ensure numeric columns are properly typed
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    return df
+
+
+def load_export(path):
+    """Read, validate and enrich one admissions export: (frame, QualityReport)
+
+    Raises ValueError when required columns are missing (e.g. a truncated header).
+    """
+    df = prepare_frame(pd.read_csv(path, sep=sniff_separator(path)))
+    missing = [col for col in REQUIRED_COLS if col not in df.columns]
+    if missing:
+        raise ValueError(f"{os.path.basename(path)} is missing column(s): {', '.join(missing)}")
+    return ingest(df)
+
+
+def read_export(path):
+    """Read and preprocess one admissions export"""
+    return load_export(path)[0]
+
+
+def source_signature(path):
+    """Cheap change signature for a source file (size, mtime)"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+# ===== QUERIES =====
+
+# Demographic groups shown in the Analytics tab, display name -> rate column
+DEMOGRAPHIC_RATE_COLS = {
+    'Asian': 'Asian_Admit_Rate_%',
+    'Hispanic/Latinx': 'Hispanic_Latinx_Admit_Rate_%',
+    'White': 'White_Admit_Rate_%',
+    'African American': 'African_American_Admit_Rate_%',
+    'International': 'International_Admit_Rate_%'
+}
+
+# Fixed admit-rate histogram bins (0-100% in 5 point steps)
+HISTOGRAM_EDGES = np.linspace(0, 100, 21)
+
+RANKINGS_LIMIT = 50
+
+
+def filter_rankings(df, college="All UC", school_type="All", city="All Cities", limit=RANKINGS_LIMIT):
+    """Top schools by admit rate for the Rankings filters"""
+    mask = pd.Series(True, index=df.index)
+
+    if college != "All UC":
+        mask &= df['College'] == college
+
+    if school_type != "All":
+        mask &= df['Private_Public'] == school_type
+
+    if city != "All Cities":
+        mask &= df['City'] == city
+
+    # Sort by admit rate and get the top rows (stable, so ties keep file order
+    # and match the prebuilt leaderboards)
+    return df[mask].sort_values('Admit_Rate_%', ascending=False, kind='stable').head(limit)
+
+
+# Rankings filter columns and their "any" values
+RANKING_FILTERS = (('College', "All UC"), ('Private_Public', "All"), ('City', "All Cities"))
+
+
+def build_leaderboards(df, limit=RANKINGS_LIMIT):
+    """Row positions of the top schools for every Rankings filter combination
+
+    Keys are (college, type, city) with the filters' "any" values as
+    wildcards, matching ``filter_rankings()``; combinations without rows are
+    absent.
+    """
+    ranked = df.reset_index(drop=True).sort_values('Admit_Rate_%', ascending=False, kind='stable')
+    leaderboards = {}
+    for used in itertools.product((False, True), repeat=len(RANKING_FILTERS)):
+        cols = [col for (col, _), use in zip(RANKING_FILTERS, used) if use]
+        if not cols:
+            leaderboards[tuple(any_value for _, any_value in RANKING_FILTERS)] = ranked.index[:limit].to_numpy()
+            continue
+        for values, positions in ranked.groupby(cols, sort=False).indices.items():
+            values = iter(values if isinstance(values, tuple) else (values,))
+            key = tuple(next(values) if use else any_value for (_, any_value), use in zip(RANKING_FILTERS, used))
+            if any(use and value == any_value for value, (_, any_value), use in zip(key, RANKING_FILTERS, used)):
+                # A stored value equal to the "any" option (e.g. College "All UC")
+                # is filtered as the wildcard
+                continue
+            leaderboards[key] = ranked.index.to_numpy()[positions[:limit]]
+    return leaderboards
+
+
+def build_catalogs(df):
+    """Sorted option lists for the filter and selection widgets"""
+    schools = {college: sorted(names.unique().tolist()) for college, names in df.groupby('College')['School']}
+    schools["All UC"] = sorted(df['School'].unique().tolist())
+    return {
+        'campuses': df['College'].unique().tolist(),
+        'cities': sorted(df['City'].unique().tolist()),
+        'schools': schools,
+    }
+
+
+def build_campus_analytics(df):
+    """``compute_analytics()`` for "All UC" and each campus"""
+    analytics = {college: compute_analytics(campus_df) for college, campus_df in df.groupby('College')}
+    analytics["All UC"] = compute_analytics(df)
+    return analytics
+
+
+def compute_analytics(analytics_df):
+    """Aggregate tables behind the Analytics tab for one campus filter
+
+    Returns plain tables (no figures) so the same rendering code can be fed by
+    an in-memory frame or by the streaming aggregates. The rate distribution
+    comes from the per-campus sketches instead (see sketches.py).
+    """
+    # Remove duplicates for overall analytics (keep best rate per school)
+    analytics_unique = analytics_df.loc[analytics_df.groupby('School')['Admit_Rate_%'].idxmax()]
+
+    type_stats = analytics_unique.groupby('Private_Public').agg({
+        'School': 'count',
+        'Admit_Rate_%': 'mean',
+        'Applied': 'sum'
+    }).reset_index()
+
+    city_stats = analytics_unique.groupby('City').agg({
+        'Admit_Rate_%': 'mean',
+        'School': 'count'
+    }).reset_index()
+    city_stats = city_stats[city_stats['School'] >= 2]  # At least 2 schools
+    city_stats = city_stats.nlargest(10, 'Admit_Rate_%')
+
+    county_stats = analytics_unique.groupby('County').agg(
+        Schools=('School', 'count'), Applied=('Applied', 'sum'),
+        Admitted=('Admitted', 'sum'), **{'Admit_Rate_%': ('Admit_Rate_%', 'mean')}
+    ).reset_index()
+    county_stats['Pooled_Admit_Rate'] = (county_stats['Admitted'] / county_stats['Applied'].where(county_stats['Applied'] > 0) * 100).fillna(0.0)
+
+    # Average demographic rates over schools with data
+    demo_avgs = {}
+    for demo_name, col_name in DEMOGRAPHIC_RATE_COLS.items():
+        if col_name in analytics_df.columns:
+            with_data = analytics_df.loc[analytics_df[has_data_col(col_name)], col_name]
+            if len(with_data) > 0:
+                demo_avgs[demo_name] = with_data.mean()
+
+    rates = analytics_df['Admit_Rate_%']
+    return {
+        'top_10': analytics_df.nlargest(10, 'Admit_Rate_%')[['School', 'Admit_Rate_%']],
+        'type_stats': type_stats,
+        'city_stats': city_stats,
+        'county_stats': county_stats,
+        'demo_avgs': demo_avgs,
+        'total_schools': len(analytics_unique),
+        'avg_rate': rates.mean() if len(rates) > 0 else 0.0,
+        'max_rate': rates.max() if len(rates) > 0 else 0.0,
+        'min_rate': rates.min() if len(rates) > 0 else 0.0,
+    }
+
+
+# ===== YEARLY PARTITIONS =====
+
+def list_year_files():
+    """Map admissions year -> export path for every file in YEARS_DIR"""
+    if not os.path.isdir(YEARS_DIR):
+        return {}
+
+    files = {}
+    for name in sorted(os.listdir(YEARS_DIR)):
+        if not name.lower().endswith((".csv", ".tsv", ".txt")):
+            continue
+        match = YEAR_PATTERN.search(name)
+        if match:
+            files[int(match.group(1))] = os.path.join(YEARS_DIR, name)
+    return files
+
+
+def available_years():
+    """Sorted list of admissions years with a yearly export"""
+    return sorted(list_year_files())
+
+
+def partition_dir(year):
+    return os.path.join(YEARS_DIR, PARTITIONS_DIRNAME, str(year))
+
+
+def _read_meta(part_dir):
+    try:
+        with open(os.path.join(part_dir, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_partition(df, part_dir, signature=None, quality=None):
+    """Write a frame as a columnar partition (one .npy per column)
+
+    Text columns are dictionary-encoded as int32 codes plus a category list in
+    meta.json; numeric columns are stored as-is. The partition is written to a
+    temporary directory and moved into place so readers never see a partial one.
+    """
+    tmp_dir = part_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        filename = f"c{i:03d}.npy"
+        if pd.api.types.is_numeric_dtype(df[col]):
+            np.save(os.path.join(tmp_dir, filename), df[col].to_numpy())
+            columns.append({"name": col, "file": filename, "kind": "num"})
+        else:
+            codes, uniques = pd.factorize(df[col])
+            np.save(os.path.join(tmp_dir, filename), codes.astype(np.int32))
+            columns.append({"name": col, "file": filename, "kind": "text",
+                            "categories": [str(u) for u in uniques]})
+
+    meta = {"signature": signature, "format": PARTITION_FORMAT, "rows": len(df), "columns": columns,
+            "quality": quality.to_dict() if quality is not None else None}
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(part_dir, ignore_errors=True)
+    os.replace(tmp_dir, part_dir)
+    return meta
+
+
+# Parsed partition meta by partition directory: (source signature, meta)
+_partition_metas = {}
+_partition_lock = threading.Lock()
+
+
+def ensure_partition(year):
+    """Build the partition for a year if it is missing or out of date
+
+    The parsed meta is kept per source signature, so repeated lookups only
+    stat the export instead of re-reading meta.json.
+    """
+    path = list_year_files()[year]
+    part_dir = partition_dir(year)
+    signature = source_signature(path)
+
+    cached = _partition_metas.get(part_dir)
+    if cached is not None and cached[0] == signature:
+        return part_dir, cached[1]
+
+    with _partition_lock:
+        meta = _read_meta(part_dir)
+        if meta is None or meta.get("signature") != signature or meta.get("format") != PARTITION_FORMAT:
+            os.makedirs(os.path.dirname(part_dir), exist_ok=True)
+            df, report = load_export(path)
+            meta = write_partition(df, part_dir, signature, report)
+        _partition_metas[part_dir] = (signature, meta)
+    return part_dir, meta
+
+
+def _category_code(meta, name, value):
+    """Dictionary code of ``value`` in a text column, or None when absent
+
+    The value -> code lookup is built once per parsed meta.
+    """
+    col = _column_meta(meta, name)
+    if 'lookup' not in col:
+        col['lookup'] = {category: code for code, category in enumerate(col["categories"])}
+    return col['lookup'].get(value)
+
+
+def year_quality(year):
+    """Ingest QualityReport for one admissions year"""
+    _, meta = ensure_partition(year)
+    return QualityReport.from_dict(meta.get("quality") or {})
+
+
+def partition_signature(year):
+    """Signature of a year's source export, used as a cache key"""
+    return tuple(source_signature(list_year_files()[year]))
+
+
+def _column_meta(meta, name):
+    for col in meta["columns"]:
+        if col["name"] == name:
+            return col
+    raise KeyError(name)
+
+
+def _load_column(part_dir, col):
+    values = np.load(os.path.join(part_dir, col["file"]), mmap_mode='r')
+    if col["kind"] == "num":
+        return values
+    # Code -1 (missing) indexes the trailing None
+    categories = np.array(col["categories"] + [None], dtype=object)
+    return categories[values]
+
+
+def read_partition(part_dir, meta, columns=None):
+    """Load a partition as a DataFrame backed by memory-mapped arrays"""
+    names = columns or [col["name"] for col in meta["columns"]]
+    data = {name: _load_column(part_dir, _column_meta(meta, name)) for name in names}
+    return pd.DataFrame(data, columns=names, copy=False)
+
+
+def load_partition(year, columns=None):
+    """Load one admissions year, optionally restricted to some columns"""
+    part_dir, meta = ensure_partition(year)
+    return read_partition(part_dir, meta, columns)
+
+
+# ===== CROSS-YEAR AGGREGATES =====
+
+def system_rows(df):
+    """Rows behind system-wide totals: the export's "All UC" rows, else every row
+
+    Exports report each school's UC-wide figures as "All UC" rows next to its
+    campus rows, so adding both would count every applicant twice.
+    """
+    system = df['College'] == SYSTEM_COLLEGE
+    return df[system] if system.any() else df
+
+
+def system_entry(entries, merge):
+    """ALL_ROWS entry of a per-campus map: its "All UC" entry, else every campus merged
+
+    The rule of ``system_rows()`` for mergeable summaries, so it still holds
+    after chunks or versions are merged.
+    """
+    if SYSTEM_COLLEGE in entries:
+        return entries[SYSTEM_COLLEGE]
+    campuses = [entry for college, entry in entries.items() if college != ALL_ROWS]
+    return functools.reduce(merge, campuses) if campuses else None
+
+
+def campus_aggregates(totals, distinct_schools):
+    """Per-campus running totals in the shape of ``year_aggregates()``
+
+    ``totals`` maps College to Rows, Applied, Admitted, Enrolled and
+    Rate_Sum; ``distinct_schools`` counts the schools of the ALL_ROWS row
+    when it sums every campus.
+    """
+    totals = {college: values for college, values in totals.items() if college != ALL_ROWS and values['Rows'] > 0}
+    system = system_entry(totals, lambda a, b: {name: a[name] + b[name] for name in a})
+    rows = []
+    for college, values in [*totals.items(), *([(ALL_ROWS, system)] if system is not None else [])]:
+        if college == ALL_ROWS and SYSTEM_COLLEGE not in totals:
+            schools = distinct_schools
+        else:
+            schools = values['Rows']
+        rows.append({
+            'College': college,
+            'Schools': int(schools),
+            'Applied': values['Applied'],
+            'Admitted': values['Admitted'],
+            'Enrolled': values['Enrolled'],
+            'Avg_Admit_Rate': values['Rate_Sum'] / values['Rows'],
+            'Pooled_Admit_Rate': values['Admitted'] / values['Applied'] * 100 if values['Applied'] > 0 else 0.0,
+        })
+    return pd.DataFrame(rows, columns=['College', 'Schools', 'Applied', 'Admitted', 'Enrolled',
+                                       'Avg_Admit_Rate', 'Pooled_Admit_Rate'])
+
+
+def _compute_year_aggregates(df):
+    # One row per campus plus an ALL_ROWS row with the system-wide totals
+    system = system_rows(df)
+    keys = pd.concat([df['College'], pd.Series(ALL_ROWS, index=system.index)], ignore_index=True)
+    stacked = pd.concat([df, system], ignore_index=True)
+    grouped = stacked.groupby(keys.rename('College'))
+    agg = pd.DataFrame({
+        'Schools': grouped['School'].nunique(),
+        'Applied': grouped['Applied'].sum(),
+        'Admitted': grouped['Admitted'].sum(),
+        'Enrolled': grouped['Enrolled'].sum(),
+        'Avg_Admit_Rate': grouped['Admit_Rate_%'].mean(),
+    }).reset_index()
+    agg['Pooled_Admit_Rate'] = (agg['Admitted'] / agg['Applied'].replace(0, np.nan) * 100).fillna(0)
+    return agg
+
+
+def year_aggregates(year):
+    """Per-campus totals for one year, computed once per partition
+
+    The result is stored next to the partition, so adding or changing one
+    yearly export only recomputes that year's aggregates.
+    """
+    part_dir, meta = ensure_partition(year)
+    agg_path = os.path.join(part_dir, "aggregates.json")
+
+    try:
+        with open(agg_path) as f:
+            return pd.DataFrame(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+    df = read_partition(part_dir, meta, ['School', 'College', 'Applied', 'Admitted', 'Enrolled', 'Admit_Rate_%'])
+    agg = _compute_year_aggregates(df)
+    with open(agg_path, "w") as f:
+        json.dump(agg.to_dict(orient="list"), f)
+    return agg
+
+
+def year_trends(years=None):
+    """Per-campus aggregates for every year, one row per (Year, College)"""
+    frames = []
+    for year in years or available_years():
+        agg = year_aggregates(year)
+        agg.insert(0, 'Year', year)
+        frames.append(agg)
+    if not frames:
+        return pd.DataFrame(columns=['Year', 'College', 'Schools', 'Applied', 'Admitted',
+                                     'Enrolled', 'Avg_Admit_Rate', 'Pooled_Admit_Rate'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def school_history(school, college, years=None):
+    """Admission figures for one (School, College) across all years
+
+    Lookups compare dictionary codes against the memory-mapped key columns,
+    so no year is materialised as a full frame.
+    """
+    value_cols = ['Applied', 'Admitted', 'Enrolled', 'Admit_Rate_%']
+    rows = []
+    for year in years or available_years():
+        part_dir, meta = ensure_partition(year)
+        try:
+            school_code = _category_code(meta, 'School', school)
+            college_code = _category_code(meta, 'College', college)
+        except KeyError:
+            continue
+        if school_code is None or college_code is None:
+            continue
+        school_meta = _column_meta(meta, 'School')
+        college_meta = _column_meta(meta, 'College')
+
+        school_codes = np.load(os.path.join(part_dir, school_meta["file"]), mmap_mode='r')
+        college_codes = np.load(os.path.join(part_dir, college_meta["file"]), mmap_mode='r')
+        matches = np.flatnonzero((school_codes == school_code) & (college_codes == college_code))
+        if len(matches) == 0:
+            continue
+
+        row = {'Year': year}
+        for col in value_cols:
+            row[col] = float(_load_column(part_dir, _column_meta(meta, col))[matches[0]])
+        rows.append(row)
+
+    return pd.DataFrame(rows, columns=['Year'] + value_cols)
+
+
+# ===== LIVE SNAPSHOT =====
+
+FIGURE_CACHE_SIZE = 512
+RELOAD_INTERVAL = float(os.environ.get("UC_RELOAD_INTERVAL", "2.0"))
+
+
+def content_version(path):
+    """Content hash of a data file, used as the dataset version"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def _row_keys(df):
+    return pd.MultiIndex.from_frame(df[KEY_COLS])
+
+
+def _row_hashes(df):
+    """Per-row content hash indexed by (School, College)"""
+    return pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy(), index=_row_keys(df))
+
+
+class Snapshot:
+    """One immutable version of the current dataset
+
+    Holds the frame together with everything derived from it: a
+    (School, College) -> row label index, per-campus running totals and a cache
+    of per-school figures. ``apply()`` produces the next version by touching
+    only the rows whose content changed; unaffected index entries, totals and
+    figures are carried over. Sessions pin a snapshot for a whole rerun, so a
+    reload never changes data underneath a page that is being rendered.
+    """
+
+    def __init__(self, df, version, modified, index, hashes, totals, school_counts, figures, quality=None,
+                 derived=None):
+        self.df = df
+        self.version = version
+        self.modified = modified
+        self.quality = quality
+        self.index = index
+        self.hashes = hashes
+        self.totals = totals
+        self.school_counts = school_counts
+        self.figures = figures
+        self._figures_lock = threading.Lock()
+        self._derived = dict(derived or {})
+
+    @classmethod
+    def build(cls, df, version, modified, quality=None):
+        """Build a snapshot from scratch"""
+        df = df.reset_index(drop=True)
+        hashes = _row_hashes(df)
+        index = dict(zip(hashes.index, df.index))
+        totals, school_counts = {}, {}
+        _accumulate(totals, school_counts, df, 1)
+        return cls(df, version, modified, index, hashes, totals, school_counts, {}, quality)
+
+    @classmethod
+    def restore(cls, df, version, modified, hashes, totals, school_counts, quality=None, derived=None):
+        """Rebuild a snapshot from stored parts (see bundle.py) without recomputing them
+
+        ``hashes`` are the per-row content hashes in row order; ``derived``
+        pre-fills values that ``derived()`` would otherwise compute.
+        """
+        hashes = pd.Series(np.asarray(hashes), index=_row_keys(df))
+        index = dict(zip(hashes.index, df.index))
+        return cls(df, version, modified, index, hashes, totals, school_counts, {}, quality, derived)
+
+    def apply(self, new_df, version, modified, quality=None):
+        """Return the next snapshot for ``new_df`` plus the set of changed keys"""
+        if (self.hashes.index.has_duplicates or new_df.duplicated(KEY_COLS).any()
+                or list(new_df.columns) != list(self.df.columns)):
+            # Keys are ambiguous or the schema changed: no safe diff
+            return Snapshot.build(new_df, version, modified, quality), None
+
+        new_hashes = _row_hashes(new_df)
+        common = self.hashes.index.intersection(new_hashes.index)
+        changed = common[self.hashes.loc[common].to_numpy() != new_hashes.loc[common].to_numpy()]
+        removed = self.hashes.index.difference(new_hashes.index)
+        added = new_hashes.index.difference(self.hashes.index)
+
+        new_positions = pd.Series(np.arange(len(new_df)), index=new_hashes.index)
+        stale_labels = [self.index[key] for key in changed.append(removed)]
+
+        totals = {college: dict(values) for college, values in self.totals.items()}
+        school_counts = dict(self.school_counts)
+        _accumulate(totals, school_counts, self.df.loc[stale_labels], -1)
+
+        # Changed rows keep their row label; added rows get fresh labels.
+        # The result is a new frame, older snapshots keep their own.
+        changed_rows = new_df.iloc[new_positions.loc[changed].to_numpy()]
+        changed_rows.index = pd.Index([self.index[key] for key in changed])
+        added_rows = new_df.iloc[new_positions.loc[added].to_numpy()]
+        start = self.df.index.max() + 1 if len(self.df) > 0 else 0
+        added_rows.index = pd.RangeIndex(start, start + len(added_rows))
+        df = pd.concat([self.df.drop(index=stale_labels), changed_rows, added_rows])
+
+        index = dict(self.index)
+        for key in removed:
+            del index[key]
+        index.update(zip(added, added_rows.index))
+
+        affected = set(changed) | set(added)
+        _accumulate(totals, school_counts, pd.concat([changed_rows, added_rows]), 1)
+
+        hashes = pd.concat([self.hashes.drop(removed.append(changed)), new_hashes.loc[changed.append(added)]])
+        affected |= set(removed)
+        figures = {key: fig for key, fig in self.figures.items() if key[:2] not in affected}
+        return Snapshot(df, version, modified, index, hashes, totals, school_counts, figures, quality), affected
+
+    def row(self, school, college):
+        """Return the row for (school, college), or None"""
+        label = self.index.get((school, college))
+        return None if label is None else self.df.loc[label]
+
+    def figure(self, school, college, kind, builder):
+        """Return a cached per-school figure, building it on first use"""
+        key = (school, college, kind)
+        fig = self.figures.get(key)
+        if fig is None:
+            fig = builder()
+            with self._figures_lock:
+                if len(self.figures) >= FIGURE_CACHE_SIZE:
+                    self.figures.pop(next(iter(self.figures)))
+                self.figures[key] = fig
+        return fig
+
+    def clear_figures(self):
+        """Drop every cached figure (e.g. under memory pressure)"""
+        with self._figures_lock:
+            self.figures = {}
+
+    def derived(self, name, builder):
+        """Compute-once value derived from this version (e.g. sketches)"""
+        if name not in self._derived:
+            self._derived[name] = builder(self.df)
+        return self._derived[name]
+
+    def prebuilt(self, name):
+        """A derived value if it already exists (e.g. loaded from a bundle), else None"""
+        return self._derived.get(name)
+
+    def aggregates(self):
+        """Per-campus totals in the same shape as ``year_aggregates()``"""
+        return campus_aggregates(self.totals, len(self.school_counts))
+
+
+def _accumulate(totals, school_counts, rows, sign):
+    """Add (sign=1) or remove (sign=-1) rows from running per-campus totals"""
+    if len(rows) == 0:
+        return
+
+    grouped = rows.groupby('College').agg(
+        Rows=('School', 'size'), Applied=('Applied', 'sum'), Admitted=('Admitted', 'sum'),
+        Enrolled=('Enrolled', 'sum'), Rate_Sum=('Admit_Rate_%', 'sum'))
+
+    for college, values in grouped.iterrows():
+        current = totals.setdefault(college, dict.fromkeys(grouped.columns, 0))
+        for name, value in values.items():
+            current[name] += sign * value
+
+    for school, count in rows['School'].value_counts().items():
+        remaining = school_counts.get(school, 0) + sign * count
+        if remaining > 0:
+            school_counts[school] = remaining
+        else:
+            school_counts.pop(school, None)
+
+
+class LiveDataset:
+    """Hot-reloading holder for the current snapshot CSV
+
+    A background thread polls the file's size and mtime; when they change it
+    hashes the content and, if the content differs, diffs it against the
+    current snapshot and swaps in the next version atomically.
+    """
+
+    def __init__(self, path, interval=RELOAD_INTERVAL, snapshot=None):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._signature = source_signature(path)
+        if snapshot is None:
+            df, report = load_export(path)
+            snapshot = Snapshot.build(df, content_version(path), os.path.getmtime(path), report)
+        self._current = snapshot
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_changes = None
+        self.last_error = None
+
+    @property
+    def current(self):
+        return self._current
+
+    def refresh(self):
+        """Reload the file if it changed; return True when a new version is live
+
+        Any failure to read or apply the file (e.g. it is half written) keeps
+        the last good snapshot; the file is tried again on the next poll.
+        """
+        with self._lock:
+            signature = None
+            try:
+                signature = source_signature(self.path)
+                if signature == self._signature:
+                    return False
+                version = content_version(self.path)
+                if version == self._current.version:
+                    self._signature = signature
+                    return False
+                new_df, report = load_export(self.path)
+                snapshot, changes = self._current.apply(new_df, version, os.path.getmtime(self.path), report)
+            except Exception as e:
+                # Log once per file version, not on every poll
+                if self.last_error is None or self.last_error[0] != signature:
+                    logger.warning("Keeping version %s of %s: reload failed (%s: %s)",
+                                   self._current.version, self.path, type(e).__name__, e)
+                self.last_error = (signature, e)
+                return False
+
+            self._current = snapshot
+            self._signature = signature
+            self.last_changes = changes
+            self.last_error = None
+            return True
+
+    def start(self):
+        """Start polling in a daemon thread (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="uc-data-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling (e.g. when the dataset is evicted)"""
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
@@ -0,0 +1,257 @@
+"""
+Registry of the datasets one deployment serves
+
+Datasets (admission cycles, freshman vs. transfer, other university systems)
+are listed in a manifest, data/datasets.json by default:
+
+    {
+        "default": "uc-freshman",
+        "datasets": [
+            {"id": "uc-freshman", "name": "UC Freshman Admissions",
+             "path": "UC_Schools_Admission_Rankings.csv", "years": true},
+            {"id": "uc-transfer", "name": "UC Transfer Admissions",
+             "path": "transfer/UC_Transfer_Admissions.csv"}
+        ]
+    }
+
+Relative paths are resolved against the manifest's directory. ``years``
+marks the dataset the yearly exports in UC_YEARS_DIR belong to. ``bundle``
+(default: .bundles/<id> next to the manifest) is where ``python build.py``
+writes the dataset's prebuilt artifacts. Without a manifest the registry
+serves the single snapshot found by ``find_data_file()``.
+
+A dataset is loaded on first request and then shared by every session and
+request: one hot-reloading snapshot (with its key index, totals and derived
+sketches, restored from the prebuilt bundle when it is current), or one set
+of streaming aggregates for very large files without a bundle. When the
+loaded datasets exceed the memory budget, the least recently used ones are
+dropped and reloaded on their next request.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from bundle import load_bundle
+from data_store import BASE_DIR, LiveDataset, content_version, find_data_file, source_signature
+from memory import GLOBAL_BUDGET_BYTES, estimate_bytes
+from streaming import build_aggregates, streaming_enabled
+
+
+MANIFEST_PATH = os.environ.get("UC_DATASETS", os.path.join(BASE_DIR, "data", "datasets.json"))
+DEFAULT_DATASET_ID = "default"
+BUNDLES_DIRNAME = ".bundles"
+
+
+def default_bundle_dir(data_path, dataset_id):
+    return os.path.join(os.path.dirname(os.path.abspath(data_path)), BUNDLES_DIRNAME, dataset_id)
+
+
+def read_manifest(path=MANIFEST_PATH):
+    """Dataset specs and the default id from a manifest: ([spec, ...], default id)
+
+    Without a manifest file, the single snapshot found by ``find_data_file()``.
+    """
+    if not os.path.exists(path):
+        data_path = find_data_file()
+        spec = {'id': DEFAULT_DATASET_ID, 'name': "UC Admissions", 'path': data_path, 'years': True,
+                'bundle': default_bundle_dir(data_path, DEFAULT_DATASET_ID)}
+        return [spec], DEFAULT_DATASET_ID
+
+    with open(path) as f:
+        manifest = json.load(f)
+    root = os.path.dirname(os.path.abspath(path))
+    specs = []
+    for entry in manifest.get('datasets', []):
+        if 'id' not in entry or 'path' not in entry:
+            raise ValueError(f"Dataset entries in {path} need an 'id' and a 'path'")
+        specs.append({
+            'id': str(entry['id']),
+            'name': entry.get('name', entry['id']),
+            'path': os.path.join(root, entry['path']),
+            'years': bool(entry.get('years', False)),
+            'bundle': os.path.join(root, entry.get('bundle', os.path.join(BUNDLES_DIRNAME, str(entry['id'])))),
+        })
+    if not specs:
+        raise ValueError(f"No datasets listed in {path}")
+
+    ids = [spec['id'] for spec in specs]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Duplicate dataset ids in {path}")
+    default = manifest.get('default', ids[0])
+    if default not in ids:
+        raise ValueError(f"Default dataset {default!r} is not listed in {path}")
+    return specs, default
+
+
+def snapshot_usage(snapshot):
+    """(bytes, entries) held by a snapshot: its frame plus cached figures"""
+    nbytes = snapshot.derived('nbytes', estimate_bytes)
+    figures = list(snapshot.figures.values())
+    if figures:
+        # Figures are similar in size, so measure a sample and extrapolate
+        sample = figures[:8]
+        nbytes += sum(estimate_bytes(fig) for fig in sample) * len(figures) // len(sample)
+    return nbytes, len(figures)
+
+
+class LoadedDataset:
+    """One dataset held in memory, shared by every session and request
+
+    Served from a hot-reloading ``LiveDataset``, started from the prebuilt
+    bundle when it matches the file. Files above the streaming threshold
+    without a current bundle are served from running aggregates instead,
+    rebuilt when the file changes.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.path = spec['path']
+        snapshot = load_bundle(spec['bundle'], self.path) if spec.get('bundle') else None
+        self.bundled = snapshot is not None
+        self.streaming = not self.bundled and streaming_enabled(self.path)
+        self.live = None if self.streaming else LiveDataset(self.path, snapshot=snapshot).start()
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def aggregates(self, stale_ok=False):
+        """Streaming aggregates for the file's current version: (signature, version, aggregates, bytes)
+
+        With ``stale_ok``, aggregates of a changed file are rebuilt in the
+        background and the previous ones are returned meanwhile.
+        """
+        signature = tuple(source_signature(self.path))
+        stream = self._stream
+        if stream is not None and stream[0] == signature:
+            return stream
+        if stream is not None and stale_ok:
+            if self._lock.acquire(blocking=False):
+                threading.Thread(target=self._rebuild_locked, args=(signature,), daemon=True).start()
+            return stream
+        with self._lock:
+            return self._rebuild(signature)
+
+    def _rebuild(self, signature):
+        stream = self._stream
+        if stream is None or stream[0] != signature:
+            agg = build_aggregates(self.path)
+            stream = self._stream = (signature, content_version(self.path), agg, estimate_bytes(vars(agg)))
+        return stream
+
+    def _rebuild_locked(self, signature):
+        """Background rebuild; the caller acquired the lock"""
+        try:
+            self._rebuild(signature)
+        finally:
+            self._lock.release()
+
+    def pin(self):
+        """Pin the data for one request: (version, modified, snapshot, aggregates)"""
+        if not self.streaming:
+            snapshot = self.live.current
+            return snapshot.version, snapshot.modified, snapshot, None
+        signature, version, agg, _ = self.aggregates()
+        return version, signature[1] / 1e9, None, agg
+
+    def usage(self):
+        """(bytes, entries) held by this dataset"""
+        if not self.streaming:
+            return snapshot_usage(self.live.current)
+        stream = self._stream
+        return (stream[3], 1) if stream is not None else (0, 0)
+
+    def close(self):
+        if self.live is not None:
+            self.live.stop()
+
+
+class DatasetRegistry:
+    """Lazily loaded datasets, evicted least recently used first
+
+    Concurrent first requests for the same dataset load it once. After each
+    load, other datasets are evicted while the total exceeds ``budget``; the
+    dataset just requested is always kept.
+    """
+
+    def __init__(self, specs, default, budget=GLOBAL_BUDGET_BYTES):
+        self.specs = OrderedDict((spec['id'], spec) for spec in specs)
+        self.default = default
+        self.budget = budget
+        self._loaded = OrderedDict()
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_manifest(cls, path=MANIFEST_PATH, budget=GLOBAL_BUDGET_BYTES):
+        specs, default = read_manifest(path)
+        return cls(specs, default, budget)
+
+    @classmethod
+    def single(cls, path, budget=GLOBAL_BUDGET_BYTES):
+        """Registry serving one file as the default dataset"""
+        spec = {'id': DEFAULT_DATASET_ID, 'name': os.path.basename(path), 'path': path, 'years': True,
+                'bundle': default_bundle_dir(path, DEFAULT_DATASET_ID)}
+        return cls([spec], DEFAULT_DATASET_ID, budget)
+
+    def ids(self):
+        return list(self.specs)
+
+    def name(self, dataset_id):
+        return self.specs[dataset_id]['name']
+
+    def get(self, dataset_id=None):
+        """The loaded dataset for ``dataset_id`` (default dataset when None)
+
+        Raises KeyError for ids not in the manifest.
+        """
+        dataset_id = self.default if dataset_id is None else dataset_id
+        spec = self.specs[dataset_id]
+        with self._lock:
+            dataset = self._loaded.get(dataset_id)
+            if dataset is not None:
+                self._loaded.move_to_end(dataset_id)
+                return dataset
+            load_lock = self._load_locks.setdefault(dataset_id, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                dataset = self._loaded.get(dataset_id)
+            if dataset is None:
+                dataset = LoadedDataset(spec)
+                with self._lock:
+                    self._loaded[dataset_id] = dataset
+                    self.loads += 1
+        self.shrink(self.bytes() - self.budget, keep=dataset_id)
+        return dataset
+
+    def loaded(self):
+        """Ids of the datasets in memory, least recently used first"""
+        with self._lock:
+            return list(self._loaded)
+
+    def bytes(self):
+        return self.usage()[0]
+
+    def usage(self):
+        """(bytes, entries) over every loaded dataset"""
+        with self._lock:
+            datasets = list(self._loaded.values())
+        sizes = [dataset.usage()[0] for dataset in datasets]
+        return sum(sizes), len(datasets)
+
+    def shrink(self, nbytes, keep=None):
+        """Evict least recently used datasets (except ``keep``) until ``nbytes`` are freed"""
+        freed = 0
+        while freed < nbytes:
+            with self._lock:
+                victim = next((dataset_id for dataset_id in self._loaded if dataset_id != keep), None)
+                if victim is None:
+                    break
+                dataset = self._loaded.pop(victim)
+                self.evictions += 1
+            freed += dataset.usage()[0]
+            dataset.close()
+        return freed
@@ -0,0 +1,289 @@
+"""
+Static site export for the UC Schools dashboard
+Pre-renders every school detail view plus per-campus Rankings and Analytics pages
+
+Pages are rendered in parallel across a process pool with the same card and
+chart helpers as the app. Every page references one shared copy of plotly.js,
+and a manifest of content hashes lets re-runs regenerate only the pages whose
+underlying rows changed.
+
+Run with:  python export_site.py --out site
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from components import (
+    STYLESHEET, create_city_chart, create_demographic_applications_chart,
+    create_demographic_averages_chart, create_demographic_chart,
+    create_demographic_table, create_rate_distribution_chart,
+    create_school_type_chart, create_top_schools_chart, render_metric_card,
+    render_school_card
+)
+from data_store import HISTOGRAM_EDGES, compute_analytics, filter_rankings, find_data_file, read_export
+from sketches import CampusSketch
+
+
+# Bump when page templates change, so every page is regenerated
+TEMPLATE_VERSION = "2"
+
+CAMPUS_OPTIONS = ["All UC", "UC Berkeley", "UCLA", "UCSD"]
+MANIFEST_NAME = "manifest.json"
+
+
+def slugify(text):
+    """Filesystem/URL-safe page name"""
+    slug = re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-")
+    return slug or "page"
+
+
+def school_page_path(school, college):
+    return f"schools/{slugify(college)}/{slugify(school)}.html"
+
+
+def campus_page_path(college, page):
+    return f"campus/{slugify(college)}/{page}.html"
+
+
+def content_hash(df):
+    """Stable hash of a frame's rows (plus the template version)"""
+    digest = hashlib.sha1(TEMPLATE_VERSION.encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# ===== PAGE TEMPLATES =====
+
+def _page(title, body, depth):
+    """Wrap page content with the shared stylesheet and plotly.js"""
+    root = "../" * depth
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)} | UC Schools Admission Rankings</title>
+<link rel="stylesheet" href="{root}assets/style.css">
+<script src="{root}assets/plotly.min.js"></script>
+</head>
+<body class="main"><div class="block-container">
+<div class="main-header">
+    <h1>🎓 UC Schools Admission Rankings</h1>
+    <p><a href="{root}index.html" style="color: #bee3f8;">All campuses</a></p>
+</div>
+{body}
+</div></body>
+</html>
+"""
+
+
+def _figure(fig):
+    if fig is None:
+        return ""
+    return fig.to_html(full_html=False, include_plotlyjs=False, config={'responsive': True})
+
+
+def _section(title):
+    return f'<div class="section-header">{title}</div>'
+
+
+def render_school_page(school):
+    """Static version of the School Details tab for one row"""
+    metrics = "".join(render_metric_card(value, label) for value, label in [
+        (f"{school['Admit_Rate_%']:.1f}%", "Admit Rate"),
+        (f"{int(school['Applied']):,}", "Applied"),
+        (f"{int(school['Admitted']):,}", "Admitted"),
+        (f"{int(school['Enrolled']):,}", "Enrolled"),
+    ])
+
+    demo_df = create_demographic_table(school)
+    table = (demo_df.to_html(index=False, float_format=lambda v: f"{v:.1f}", border=0)
+             if len(demo_df) > 0 else "<p>No detailed demographic data available for this school.</p>")
+
+    body = f"""
+    <div class="detail-section">
+        <h2 class="detail-name">{html.escape(school['School'])}</h2>
+        <p class="detail-meta">
+            📍 {html.escape(school['City'])}, {html.escape(school['County'])} County |
+            🎓 {school['Private_Public']} School |
+            🏛️ {school['College']}
+        </p>
+    </div>
+    <div class="metric-grid">{metrics}</div>
+    {_section("👥 Demographic Breakdown")}
+    {_figure(create_demographic_chart(school))}
+    {_figure(create_demographic_applications_chart(school))}
+    {_section("📋 Detailed Demographics")}
+    {table}
+    """
+    return _page(school['School'], body, depth=2)
+
+
+def render_rankings_page(df, college):
+    """Static version of the Rankings tab for one campus"""
+    top = filter_rankings(df, college)
+    cards = []
+    for idx, (_, school) in enumerate(top.iterrows(), 1):
+        link = "../../" + school_page_path(school['School'], school['College'])
+        cards.append(f'<a href="{link}" style="text-decoration: none;">{render_school_card(school, idx)}</a>')
+
+    body = f"""
+    {_section(f"🏆 Top Schools by Admit Rate · {html.escape(college)}")}
+    <p><a href="analytics.html">📈 Analytics for {html.escape(college)}</a></p>
+    {"".join(cards) or "<p>No schools for this campus.</p>"}
+    """
+    return _page(f"{college} Rankings", body, depth=2)
+
+
+def render_analytics_page(df, college):
+    """Static version of the Analytics tab for one campus"""
+    analytics = compute_analytics(df)
+    counts = CampusSketch().add(df).rates.histogram(HISTOGRAM_EDGES)
+
+    body = f"""
+    {_section(f"📈 Analytics & Visualizations · {html.escape(college)}")}
+    <p><a href="rankings.html">📊 Rankings for {html.escape(college)}</a></p>
+    <h3>🏆 Top 10 Schools by Admit Rate</h3>
+    {_figure(create_top_schools_chart(analytics['top_10']))}
+    <h3>📊 Admit Rate Distribution</h3>
+    {_figure(create_rate_distribution_chart(counts, HISTOGRAM_EDGES))}
+    <h3>🏫 Public vs Private Schools</h3>
+    {_figure(create_school_type_chart(analytics['type_stats']))}
+    <h3>🌆 Top Cities by Average Admit Rate</h3>
+    {_figure(create_city_chart(analytics['city_stats']))}
+    {_section("👥 Overall Demographic Admit Rates")}
+    {_figure(create_demographic_averages_chart(analytics['demo_avgs'])) if analytics['demo_avgs'] else ""}
+    {_section("📋 Summary Statistics")}
+    <div class="metric-grid">
+        {render_metric_card(analytics['total_schools'], "Total Schools")}
+        {render_metric_card(f"{analytics['avg_rate']:.1f}%", "Avg Admit Rate")}
+        {render_metric_card(f"{analytics['max_rate']:.1f}%", "Highest Rate")}
+        {render_metric_card(f"{analytics['min_rate']:.1f}%", "Lowest Rate")}
+    </div>
+    """
+    return _page(f"{college} Analytics", body, depth=2)
+
+
+def render_index(campuses):
+    links = "".join(
+        f'<li><a href="{campus_page_path(c, "rankings")}">{html.escape(c)} rankings</a> · '
+        f'<a href="{campus_page_path(c, "analytics")}">analytics</a></li>'
+        for c in campuses
+    )
+    return _page("Campuses", f'{_section("🏛️ Campuses")}<ul>{links}</ul>', depth=0)
+
+
+# ===== BUILD =====
+
+def _render_task(task):
+    """Worker entry point: render one page and write it to disk"""
+    out_dir, path, kind, data, college = task
+    if kind == "school":
+        page = render_school_page(data.iloc[0])
+    elif kind == "rankings":
+        page = render_rankings_page(data, college)
+    else:
+        page = render_analytics_page(data, college)
+
+    full_path = os.path.join(out_dir, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return path
+
+
+def plan_pages(df):
+    """Every page to build: path -> (kind, rows, campus)"""
+    pages = {}
+    for college in CAMPUS_OPTIONS:
+        campus_df = df if college == "All UC" else df[df['College'] == college]
+        pages[campus_page_path(college, "rankings")] = ("rankings", campus_df, college)
+        pages[campus_page_path(college, "analytics")] = ("analytics", campus_df, college)
+
+    for i in range(len(df)):
+        row = df.iloc[[i]]
+        pages[school_page_path(row['School'].iloc[0], row['College'].iloc[0])] = ("school", row, None)
+    return pages
+
+
+def write_assets(out_dir):
+    """Shared stylesheet and a single copy of plotly.js"""
+    assets = os.path.join(out_dir, "assets")
+    os.makedirs(assets, exist_ok=True)
+
+    plotly_path = os.path.join(assets, "plotly.min.js")
+    if not os.path.exists(plotly_path):
+        with open(plotly_path, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+
+    with open(os.path.join(assets, "style.css"), "w", encoding="utf-8") as f:
+        f.write(STYLESHEET)
+
+
+def build_site(df, out_dir, workers=None, force=False):
+    """Render the site, skipping pages whose content hash is unchanged
+
+    Returns (rendered, skipped, removed) page counts.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    write_assets(out_dir)
+
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    pages = plan_pages(df)
+    hashes = {path: content_hash(rows) for path, (_, rows, _) in pages.items()}
+
+    todo = [
+        (out_dir, path, kind, rows, college)
+        for path, (kind, rows, college) in pages.items()
+        if force or manifest.get(path) != hashes[path] or not os.path.exists(os.path.join(out_dir, path))
+    ]
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_render_task, todo, chunksize=max(1, len(todo) // (4 * (workers or os.cpu_count() or 1)))))
+
+    # Drop pages for rows that no longer exist
+    removed = [path for path in manifest if path not in pages]
+    for path in removed:
+        try:
+            os.remove(os.path.join(out_dir, path))
+        except OSError:
+            pass
+
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(render_index(CAMPUS_OPTIONS))
+    with open(manifest_path, "w") as f:
+        json.dump(hashes, f, indent=0, sort_keys=True)
+
+    return len(todo), len(pages) - len(todo), len(removed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render the dashboard as a static HTML site")
+    parser.add_argument("--out", default="site", help="Output directory (default: site)")
+    parser.add_argument("--data", default=None, help="Path to the snapshot CSV (default: auto-detect)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Regenerate every page")
+    args = parser.parse_args()
+
+    df = read_export(args.data or find_data_file())
+    rendered, skipped, removed = build_site(df, args.out, args.workers, args.force)
+    print(f"Rendered {rendered} pages, {skipped} unchanged, {removed} removed -> {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Streaming bulk export of dashboard results (CSV, Parquet, XLSX)
+
+Encoders take an iterable of DataFrame chunks and yield encoded byte chunks,
+so a large export is never built as one in-memory bytes object. Encoded
+exports are cached per (dataset version, filter signature, format) in a
+byte-budgeted LRU, so popular slices are served again without re-encoding.
+"""
+
+import importlib.util
+import io
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+
+import pandas as pd
+
+
+EXPORT_CHUNK_ROWS = 20000
+EXPORT_CACHE_BYTES = int(float(os.environ.get("UC_EXPORT_CACHE_MB", "64")) * 1024 * 1024)
+
+# Characters kept in export filenames; anything else becomes "_"
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+# Exports larger than this share of the cache budget are streamed but not kept
+MAX_CACHED_SHARE = 0.25
+
+
+def _has_module(name):
+    return importlib.util.find_spec(name) is not None
+
+
+# Format -> (label, file extension, MIME type); Parquet/XLSX need optional packages
+FORMATS = {
+    'csv': ("CSV", "csv", "text/csv"),
+    'parquet': ("Parquet", "parquet", "application/vnd.apache.parquet"),
+    'xlsx': ("Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def available_formats():
+    """Formats whose encoder dependencies are installed"""
+    formats = ['csv']
+    if _has_module("pyarrow"):
+        formats.append('parquet')
+    if _has_module("openpyxl"):
+        formats.append('xlsx')
+    return formats
+
+
+def split_frame(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield row slices of an in-memory frame (views, not copies)"""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+    if len(df) == 0:
+        yield df
+
+
+# ===== ENCODERS =====
+
+def iter_csv(frames):
+    """Encode frames as one CSV, chunk by chunk"""
+    header = True
+    for frame in frames:
+        yield frame.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+class _DrainableBuffer(io.RawIOBase):
+    """Write-only sink whose contents can be taken out between writes"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_parquet(frames):
+    """Encode frames as Parquet, one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _DrainableBuffer()
+    writer = None
+    for frame in frames:
+        if writer is None:
+            # Chunks infer their own dtypes (e.g. a count column with gaps is
+            # float), so every chunk is converted to the first one's schema;
+            # columns that were all-missing there are typed as strings
+            schema = pa.Table.from_pandas(frame, preserve_index=False).schema
+            for i, field in enumerate(schema):
+                if pa.types.is_null(field.type):
+                    schema = schema.set(i, field.with_type(pa.large_string()))
+            writer = pq.ParquetWriter(sink, schema)
+        writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+        data = sink.drain()
+        if data:
+            yield data
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def iter_xlsx(frames, read_size=1 << 20):
+    """Encode frames as XLSX
+
+    XLSX is a zip archive that cannot be emitted incrementally, so rows are
+    written in openpyxl's write-only mode to a spooled temporary file, which
+    is then read back in chunks.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Export")
+    header = True
+    for frame in frames:
+        if header:
+            sheet.append(list(frame.columns))
+            header = False
+        for row in frame.itertuples(index=False):
+            sheet.append([None if pd.isna(v) else v for v in row])
+
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as f:
+        workbook.save(f)
+        f.seek(0)
+        for block in iter(lambda: f.read(read_size), b""):
+            yield block
+
+
+ENCODERS = {'csv': iter_csv, 'parquet': iter_parquet, 'xlsx': iter_xlsx}
+
+
+def encode(frames, fmt):
+    """Yield encoded byte chunks for an iterable of frames"""
+    if fmt not in available_formats():
+        raise ValueError(f"Export format {fmt!r} is not available")
+    return ENCODERS[fmt](frames)
+
+
+# ===== CACHE =====
+
+class ChunkedReader(io.RawIOBase):
+    """Read-only file object over a list of byte chunks (no concatenation)"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._index = 0
+        self._offset = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return sum(len(c) for c in self._chunks[:self._index]) + self._offset
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.tell()
+        elif whence == io.SEEK_END:
+            offset += sum(len(c) for c in self._chunks)
+        self._index, self._offset = 0, max(offset, 0)
+        while self._index < len(self._chunks) and self._offset >= len(self._chunks[self._index]):
+            self._offset -= len(self._chunks[self._index])
+            self._index += 1
+        return self.tell()
+
+    def readinto(self, buffer):
+        view = memoryview(buffer)
+        written = 0
+        while written < len(view) and self._index < len(self._chunks):
+            chunk = self._chunks[self._index]
+            n = min(len(view) - written, len(chunk) - self._offset)
+            view[written:written + n] = chunk[self._offset:self._offset + n]
+            written += n
+            self._offset += n
+            if self._offset == len(chunk):
+                self._index += 1
+                self._offset = 0
+        return written
+
+
+class ExportCache:
+    """Byte-budgeted LRU of encoded exports, stored as chunk lists"""
+
+    def __init__(self, max_bytes=EXPORT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, chunks):
+        size = sum(len(c) for c in chunks)
+        if size > self.max_bytes * MAX_CACHED_SHARE:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = chunks
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= sum(len(c) for c in evicted)
+
+    def shrink(self, nbytes):
+        """Evict least recently used exports until ``nbytes`` are freed"""
+        freed = 0
+        with self._lock:
+            while freed < nbytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                size = sum(len(c) for c in evicted)
+                self.bytes -= size
+                freed += size
+        return freed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stream(self, key, make_frames, fmt):
+        """Yield an export's chunks, from the cache or freshly encoded
+
+        Freshly encoded chunks are yielded as they are produced and cached
+        once the export completes (if it fits the budget).
+        """
+        cached = self.get(key)
+        if cached is not None:
+            yield from cached
+            return
+
+        chunks = []
+        size = 0
+        for chunk in encode(make_frames(), fmt):
+            yield chunk
+            size += len(chunk)
+            if chunks is not None:
+                chunks.append(chunk)
+                if size > self.max_bytes * MAX_CACHED_SHARE:
+                    chunks = None
+        if chunks is not None:
+            self.put(key, chunks)
+
+    def chunks(self, key, make_frames, fmt):
+        """Encoded chunks for an export, as a list (cached when it fits)"""
+        return list(self.stream(key, make_frames, fmt))
+
+
+def export_filename(stem, fmt):
+    """File name for an export, safe in HTTP headers and on disk"""
+    return f"{_UNSAFE_FILENAME.sub('_', stem).strip('_') or 'export'}.{FORMATS[fmt][1]}"
+
+
+def content_disposition(filename):
+    """Content-Disposition header value for a download (RFC 6266)"""
+    fallback = _UNSAFE_FILENAME.sub("_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
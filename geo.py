@@ -0,0 +1,195 @@
+"""
+County geometry for the dashboard map
+
+California county boundaries are bundled under static/geo as GeoJSON,
+simplified ahead of time at several levels of detail, with each feature's id
+set to its county FIPS code. The app joins counties to codes once at load
+time and charts reference the geometry by URL, so the browser fetches and
+caches the polygons once and a rerun only sends per-county values.
+
+Build the bundle from a county boundary file (e.g. the Census cartographic
+boundary counties converted to GeoJSON):
+
+    python geo.py --source cb_2023_us_county_500k.geojson
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+
+GEO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "geo")
+GEO_URL = "app/static/geo"
+MANIFEST_NAME = "manifest.json"
+STATE_FIPS = "06"
+
+# Level -> (Douglas-Peucker tolerance in degrees, coordinate decimals)
+SIMPLIFY_LEVELS = {
+    'coarse': (0.02, 3),
+    'medium': (0.005, 4),
+    'fine': (0.001, 5),
+}
+
+# Widest extent (degrees) each level is used for; wider views use 'coarse'
+LEVEL_SPANS = [('fine', 1.5), ('medium', 5.0)]
+
+# California county -> county FIPS code
+CA_COUNTY_FIPS = {
+    name: f"{STATE_FIPS}{2 * i + 1:03d}" for i, name in enumerate([
+        "Alameda", "Alpine", "Amador", "Butte", "Calaveras", "Colusa", "Contra Costa",
+        "Del Norte", "El Dorado", "Fresno", "Glenn", "Humboldt", "Imperial", "Inyo",
+        "Kern", "Kings", "Lake", "Lassen", "Los Angeles", "Madera", "Marin", "Mariposa",
+        "Mendocino", "Merced", "Modoc", "Mono", "Monterey", "Napa", "Nevada", "Orange",
+        "Placer", "Plumas", "Riverside", "Sacramento", "San Benito", "San Bernardino",
+        "San Diego", "San Francisco", "San Joaquin", "San Luis Obispo", "San Mateo",
+        "Santa Barbara", "Santa Clara", "Santa Cruz", "Shasta", "Sierra", "Siskiyou",
+        "Solano", "Sonoma", "Stanislaus", "Sutter", "Tehama", "Trinity", "Tulare",
+        "Tuolumne", "Ventura", "Yolo", "Yuba",
+    ])
+}
+
+
+def county_codes(counties):
+    """FIPS codes for a Series of county names (NaN where unknown)"""
+    names = counties.astype(str).str.strip().str.replace(r"\s+County$", "", regex=True)
+    return names.map(CA_COUNTY_FIPS)
+
+
+# ===== SIMPLIFICATION =====
+
+def simplify_ring(points, tolerance):
+    """Douglas-Peucker simplification of one closed ring (N x 2 array)"""
+    n = len(points)
+    if n <= 4:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        rel = points[start + 1:end] - points[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(segment[0] * rel[:, 1] - segment[1] * rel[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return points[keep]
+
+
+def _simplify_polygon(rings, tolerance, decimals):
+    """Simplified rings of one polygon; None when the exterior collapses"""
+    out = []
+    for i, ring in enumerate(rings):
+        simplified = np.round(simplify_ring(np.asarray(ring, dtype=float), tolerance), decimals)
+        if len(simplified) < 4:
+            if i == 0:
+                return None
+            continue
+        out.append(simplified.tolist())
+    return out
+
+
+def simplify_geometry(geometry, tolerance, decimals):
+    """Simplify a Polygon/MultiPolygon, keeping at least its largest part"""
+    polygons = geometry['coordinates'] if geometry['type'] == "MultiPolygon" else [geometry['coordinates']]
+    simplified = [p for p in (_simplify_polygon(rings, tolerance, decimals) for rings in polygons) if p]
+    if not simplified:
+        largest = max(polygons, key=lambda rings: len(rings[0]))
+        simplified = [[np.round(np.asarray(ring, dtype=float), decimals).tolist() for ring in largest]]
+    if len(simplified) == 1:
+        return {'type': "Polygon", 'coordinates': simplified[0]}
+    return {'type': "MultiPolygon", 'coordinates': simplified}
+
+
+def _bounds(geometry):
+    polygons = geometry['coordinates'] if geometry['type'] == "MultiPolygon" else [geometry['coordinates']]
+    points = np.concatenate([np.asarray(p[0], dtype=float) for p in polygons])
+    return [float(v) for v in (*points.min(axis=0), *points.max(axis=0))]
+
+
+# ===== BUNDLE =====
+
+def build_geometry(source, out_dir=GEO_DIR, levels=SIMPLIFY_LEVELS):
+    """Write one simplified GeoJSON per level plus a manifest of county bounds"""
+    with open(source, encoding="utf-8") as f:
+        features = json.load(f)['features']
+
+    names = {code: name for name, code in CA_COUNTY_FIPS.items()}
+    counties = []
+    for feature in features:
+        props = feature.get('properties') or {}
+        code = str(props.get('GEOID') or f"{props.get('STATEFP', '')}{props.get('COUNTYFP', '')}")
+        if code in names and feature.get('geometry'):
+            counties.append((code, feature['geometry']))
+
+    if not counties:
+        raise ValueError(f"No California counties found in {source}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {'levels': {}, 'bounds': {}}
+    for level, (tolerance, decimals) in levels.items():
+        collection = {'type': "FeatureCollection", 'features': [
+            {'type': "Feature", 'id': code, 'properties': {'name': names[code]},
+             'geometry': simplify_geometry(geometry, tolerance, decimals)}
+            for code, geometry in counties
+        ]}
+        filename = f"ca_counties_{level}.geojson"
+        with open(os.path.join(out_dir, filename), "w", encoding="utf-8") as f:
+            json.dump(collection, f, separators=(",", ":"))
+        manifest['levels'][level] = {'file': filename, 'bytes': os.path.getsize(os.path.join(out_dir, filename))}
+
+    manifest['bounds'] = {code: _bounds(geometry) for code, geometry in counties}
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
+
+
+def load_manifest(geo_dir=GEO_DIR):
+    """The bundle's manifest, or None when no geometry is bundled"""
+    try:
+        with open(os.path.join(geo_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def choose_level(manifest, codes):
+    """Coarsest level that still looks right for the extent of ``codes``"""
+    bounds = [manifest['bounds'][c] for c in codes if c in manifest['bounds']]
+    if bounds:
+        b = np.array(bounds)
+        span = max(b[:, 2].max() - b[:, 0].min(), b[:, 3].max() - b[:, 1].min())
+        for level, max_span in LEVEL_SPANS:
+            if span <= max_span and level in manifest['levels']:
+                return level
+    return 'coarse' if 'coarse' in manifest['levels'] else next(iter(manifest['levels']))
+
+
+def geometry_url(manifest, level):
+    return f"{GEO_URL}/{manifest['levels'][level]['file']}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle simplified California county geometry for the map")
+    parser.add_argument("--source", required=True, help="County boundaries as GeoJSON (GEOID or STATEFP/COUNTYFP properties)")
+    parser.add_argument("--out", default=GEO_DIR, help="Output directory (default: static/geo)")
+    args = parser.parse_args()
+
+    manifest = build_geometry(args.source, args.out)
+    sizes = ", ".join(f"{level} {info['bytes'] / 1024:.0f} KB" for level, info in manifest['levels'].items())
+    print(f"Bundled {len(manifest['bounds'])} counties: {sizes} -> {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
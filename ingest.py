@@ -0,0 +1,214 @@
+"""
+Ingest-time validation and derived columns for admissions exports
+
+Every export goes through ``ingest()`` once, right after parsing. In one
+vectorised pass over all rows and demographic groups it:
+
+- recomputes admit rates from the counts instead of trusting shipped rates,
+- quarantines rows whose totals are inconsistent (admitted > applied,
+  enrolled > admitted, negative counts),
+- masks inconsistent demographic cells: the row stays, the group is treated
+  as having no data,
+- adds derived columns: yield, applicant share per group and per-group
+  has-data masks.
+
+Render paths read the masks and derived columns instead of recomputing or
+re-filtering, and the report travels with the dataset version.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+GROUPS = ['African_American', 'American_Indian', 'Hispanic_Latinx', 'Pacific_Islander',
+          'Asian', 'White', 'Domestic_Unknown', 'International']
+
+# Shipped rates are rounded to 0.01; larger differences count as corrections
+RATE_TOLERANCE = 0.05
+
+# Flagged rows kept in the report for inspection
+SAMPLE_ROWS = 1000
+
+# Quality_Flags bits
+FLAG_ADMITTED_GT_APPLIED = 1
+FLAG_ENROLLED_GT_ADMITTED = 2
+FLAG_NEGATIVE_COUNT = 4
+FLAG_GROUP_MASKED = 8
+FLAG_RATE_CORRECTED = 16
+QUARANTINE_FLAGS = FLAG_ADMITTED_GT_APPLIED | FLAG_ENROLLED_GT_ADMITTED | FLAG_NEGATIVE_COUNT
+
+FLAG_LABELS = {
+    FLAG_ADMITTED_GT_APPLIED: "Admitted > Applied",
+    FLAG_ENROLLED_GT_ADMITTED: "Enrolled > Admitted",
+    FLAG_NEGATIVE_COUNT: "Negative count",
+    FLAG_GROUP_MASKED: "Inconsistent group counts",
+    FLAG_RATE_CORRECTED: "Shipped rate corrected",
+}
+
+
+def has_data_col(rate_col):
+    """Has-data mask column for a group rate column"""
+    return rate_col.replace('_Admit_Rate_%', '_Has_Data')
+
+
+def _rate(numerator, denominator):
+    """Percentage, 0 where the denominator is not positive"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1) * 100, 0.0)
+
+
+def _column(df, name):
+    return df[name].to_numpy(dtype=float) if name in df.columns else None
+
+
+def describe_flags(flags):
+    """Human-readable issue list for each flag value"""
+    flags = np.asarray(flags)
+    labels = np.full(len(flags), "", dtype=object)
+    for bit, label in FLAG_LABELS.items():
+        hit = (flags & bit) != 0
+        labels[hit] = np.where(labels[hit] == "", label, labels[hit] + "; " + label)
+    return labels
+
+
+class QualityReport:
+    """What ingest found in one export, mergeable across chunks"""
+
+    def __init__(self):
+        self.rows = 0
+        self.quarantined = 0
+        self.flagged = 0
+        self.flag_counts = {label: 0 for label in FLAG_LABELS.values()}
+        self.masked_cells = {}
+        self.samples = pd.DataFrame(columns=['School', 'College', 'Issues', 'Quarantined'])
+
+    def add(self, df, flags, quarantine, masked):
+        self.rows += len(df)
+        self.quarantined += int(quarantine.sum())
+        self.flagged += int((flags != 0).sum())
+        for bit, label in FLAG_LABELS.items():
+            self.flag_counts[label] += int(((flags & bit) != 0).sum())
+        for group, count in masked.items():
+            self.masked_cells[group] = self.masked_cells.get(group, 0) + int(count)
+
+        room = SAMPLE_ROWS - len(self.samples)
+        flagged = np.flatnonzero(flags)[:max(room, 0)]
+        if len(flagged) > 0:
+            sample = pd.DataFrame({
+                'School': df['School'].to_numpy()[flagged] if 'School' in df.columns else None,
+                'College': df['College'].to_numpy()[flagged] if 'College' in df.columns else None,
+                'Issues': describe_flags(flags[flagged]),
+                'Quarantined': quarantine[flagged],
+            })
+            self.samples = sample if len(self.samples) == 0 else pd.concat([self.samples, sample], ignore_index=True)
+        return self
+
+    def merge(self, other):
+        """Fold another report (e.g. the next chunk's) into this one"""
+        self.rows += other.rows
+        self.quarantined += other.quarantined
+        self.flagged += other.flagged
+        for label, count in other.flag_counts.items():
+            self.flag_counts[label] = self.flag_counts.get(label, 0) + count
+        for group, count in other.masked_cells.items():
+            self.masked_cells[group] = self.masked_cells.get(group, 0) + count
+        if len(other.samples) > 0 and len(self.samples) < SAMPLE_ROWS:
+            extra = other.samples.head(SAMPLE_ROWS - len(self.samples))
+            self.samples = extra if len(self.samples) == 0 else pd.concat([self.samples, extra], ignore_index=True)
+        return self
+
+    def summary(self):
+        """Counts only (JSON-ready)"""
+        return {
+            'rows': self.rows,
+            'quarantined': self.quarantined,
+            'flagged': self.flagged,
+            'issues': {label: count for label, count in self.flag_counts.items() if count},
+            'masked_cells': {group: count for group, count in self.masked_cells.items() if count},
+        }
+
+    def to_dict(self):
+        return {**self.summary(), 'samples': self.samples.to_dict(orient="records")}
+
+    @classmethod
+    def from_dict(cls, data):
+        report = cls()
+        report.rows = data.get('rows', 0)
+        report.quarantined = data.get('quarantined', 0)
+        report.flagged = data.get('flagged', 0)
+        report.flag_counts.update(data.get('issues', {}))
+        report.masked_cells = dict(data.get('masked_cells', {}))
+        if data.get('samples'):
+            report.samples = pd.DataFrame(data['samples'])
+        return report
+
+
+def ingest(df):
+    """Validate a prepared frame and add derived columns
+
+    Returns (frame without quarantined rows, QualityReport). Columns that are
+    absent (e.g. a chunk read with ``usecols``) are simply skipped.
+    """
+    n = len(df)
+    flags = np.zeros(n, dtype=np.int16)
+    derived = {}
+
+    applied = _column(df, 'Applied')
+    admitted = _column(df, 'Admitted')
+    enrolled = _column(df, 'Enrolled')
+
+    if applied is not None and admitted is not None:
+        flags |= np.where(admitted > applied, FLAG_ADMITTED_GT_APPLIED, 0).astype(np.int16)
+        negative = (applied < 0) | (admitted < 0)
+        if enrolled is not None:
+            flags |= np.where(enrolled > admitted, FLAG_ENROLLED_GT_ADMITTED, 0).astype(np.int16)
+            negative |= enrolled < 0
+            derived['Yield_%'] = _rate(enrolled, admitted)
+        flags |= np.where(negative, FLAG_NEGATIVE_COUNT, 0).astype(np.int16)
+
+        rate = _rate(admitted, applied)
+        shipped = _column(df, 'Admit_Rate_%')
+        if shipped is not None:
+            flags |= np.where(np.abs(rate - shipped) > RATE_TOLERANCE, FLAG_RATE_CORRECTED, 0).astype(np.int16)
+        derived['Admit_Rate_%'] = rate
+
+    # All groups at once as (rows x groups) matrices
+    groups = [g for g in GROUPS if f'{g}_Applied' in df.columns and f'{g}_Admitted' in df.columns]
+    masked = {}
+    if groups:
+        zeros = np.zeros(n)
+        g_applied = np.column_stack([df[f'{g}_Applied'].to_numpy(dtype=float) for g in groups])
+        g_admitted = np.column_stack([df[f'{g}_Admitted'].to_numpy(dtype=float) for g in groups])
+        g_enrolled = np.column_stack([_column(df, f'{g}_Enrolled') if f'{g}_Enrolled' in df.columns else zeros
+                                      for g in groups])
+
+        bad = ((g_admitted > g_applied) | (g_enrolled > g_admitted)
+               | (g_applied < 0) | (g_admitted < 0) | (g_enrolled < 0))
+        has_data = (g_applied > 0) & ~bad
+        g_rate = np.where(has_data, _rate(g_admitted, g_applied), 0.0)
+
+        shipped = [f'{g}_Admit_Rate_%' for g in groups]
+        present = [j for j, col in enumerate(shipped) if col in df.columns]
+        if present:
+            g_shipped = np.column_stack([df[shipped[j]].to_numpy(dtype=float) for j in present])
+            corrected = ((np.abs(g_rate[:, present] - g_shipped) > RATE_TOLERANCE) & ~bad[:, present]).any(axis=1)
+            flags |= np.where(corrected, FLAG_RATE_CORRECTED, 0).astype(np.int16)
+        flags |= np.where(bad.any(axis=1), FLAG_GROUP_MASKED, 0).astype(np.int16)
+
+        share = (np.where(has_data, _rate(g_applied, applied[:, None]), 0.0)
+                 if applied is not None else None)
+        for j, g in enumerate(groups):
+            derived[f'{g}_Admit_Rate_%'] = g_rate[:, j]
+            if share is not None:
+                derived[f'{g}_Share_%'] = share[:, j]
+            derived[f'{g}_Has_Data'] = has_data[:, j]
+        masked = dict(zip(groups, bad.sum(axis=0)))
+
+    derived['Quality_Flags'] = flags
+    enriched = df.assign(**derived)
+
+    quarantine = (flags & QUARANTINE_FLAGS) != 0
+    report = QualityReport().add(enriched, flags, quarantine, masked)
+    if quarantine.any():
+        enriched = enriched[~quarantine]
+    return enriched, report
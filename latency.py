@@ -0,0 +1,136 @@
+"""
+Per-rerun latency budget and graceful degradation for the dashboard
+
+Every rerun of ``main()`` has a time budget. When the host is overloaded all
+reruns slow down together, so the monitor tracks recent rerun times across
+sessions. A rerun is at risk when recent reruns have been running over the
+budget, or when the rerun itself has used most of its budget. While at risk,
+the dashboard degrades instead of showing spinners:
+
+- views are served from their last good result while the fresh one is
+  computed in the background (stale-while-revalidate); after a filter change
+  that is the result of the previous selection, labelled as such,
+- non-essential sections are replaced by "load more" placeholders,
+- the rankings list starts with a shorter page.
+
+Every degraded rerun is recorded with what it skipped, so the debug panel
+shows when degradation kicked in and why.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+LATENCY_BUDGET_MS = float(os.environ.get("UC_LATENCY_BUDGET_MS", "1500"))
+
+# Share of its budget after which the rerun in progress is at risk
+RISK_FRACTION = 0.6
+
+# Overload starts when the median recent rerun exceeds the budget and ends
+# once it is back under this share of it
+RECOVER_FRACTION = 0.5
+
+# Reruns the median is taken over, and reruns kept for percentiles
+RECENT_RERUNS = 8
+HISTORY_SIZE = 200
+
+DEGRADED_PAGE_SIZE = 10
+
+# Degradation events kept for the debug panel
+EVENT_LOG_SIZE = 50
+
+
+class RerunBudget:
+    """Time budget of one rerun and what it degraded"""
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self.started = time.perf_counter()
+        self.overloaded = monitor.overloaded()
+        self.deferred = []
+        self.stale = []
+        self.page_capped = False
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def at_risk(self):
+        return self.overloaded or self.elapsed() > self.monitor.budget * RISK_FRACTION
+
+    def defer(self, section):
+        if section not in self.deferred:
+            self.deferred.append(section)
+
+    def serve_stale(self, view):
+        if view not in self.stale:
+            self.stale.append(view)
+
+    def cap_page(self, shown):
+        """Rankings page size for this rerun"""
+        if not self.at_risk() or shown <= DEGRADED_PAGE_SIZE:
+            return shown
+        self.page_capped = True
+        return DEGRADED_PAGE_SIZE
+
+    @property
+    def degraded(self):
+        return bool(self.deferred or self.stale or self.page_capped)
+
+    def finish(self):
+        self.monitor.record(self)
+
+
+class LatencyMonitor:
+    """Rerun times and degradation events across all sessions"""
+
+    def __init__(self, budget_ms=LATENCY_BUDGET_MS):
+        self.budget = budget_ms / 1000
+        self.reruns = 0
+        self.degraded = 0
+        self.events = deque(maxlen=EVENT_LOG_SIZE)
+        self._times = deque(maxlen=HISTORY_SIZE)
+        self._overloaded = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Budget for a rerun starting now"""
+        return RerunBudget(self)
+
+    def overloaded(self):
+        """Whether recent reruns run over budget (with hysteresis, so degrading does not flap)"""
+        with self._lock:
+            recent = list(self._times)[-RECENT_RERUNS:]
+            if len(recent) < RECENT_RERUNS // 2:
+                return self._overloaded
+            median = float(np.median(recent))
+            if median > self.budget:
+                self._overloaded = True
+            elif median < self.budget * RECOVER_FRACTION:
+                self._overloaded = False
+            return self._overloaded
+
+    def record(self, rerun):
+        elapsed = rerun.elapsed()
+        with self._lock:
+            self.reruns += 1
+            self._times.append(elapsed)
+            if rerun.degraded:
+                self.degraded += 1
+                self.events.append({
+                    'time': time.time(),
+                    'elapsed': elapsed,
+                    'reason': "overloaded" if rerun.overloaded else "slow rerun",
+                    'deferred': list(rerun.deferred),
+                    'stale': list(rerun.stale),
+                    'page_capped': rerun.page_capped,
+                })
+
+    def percentile(self, q):
+        """Rerun time percentile in seconds, or None before the first rerun"""
+        with self._lock:
+            times = list(self._times)
+        return float(np.percentile(times, q)) if times else None
@@ -0,0 +1,164 @@
+"""
+Memory accounting and budgets for the dashboard
+
+Attributes retained bytes to each shared cache and to each session (the
+results it built or pinned on its last rerun), so the debug panel can show
+what a session costs. Two budgets are enforced: a per-session budget, above
+which a session's results are used once but not kept in the shared caches,
+and a global budget, above which cached intermediates are evicted.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from plotly.basedatatypes import BaseFigure
+
+
+MB = 1024 * 1024
+SESSION_BUDGET_BYTES = int(float(os.environ.get("UC_SESSION_MEMORY_MB", "32")) * MB)
+GLOBAL_BUDGET_BYTES = int(float(os.environ.get("UC_MEMORY_BUDGET_MB", "512")) * MB)
+
+# Sessions not seen for this long are dropped from the ledger
+SESSION_TTL = 30 * 60
+
+
+def enable_copy_on_write():
+    """Turn on pandas copy-on-write, so filters and slices share data until written
+
+    Already the only mode in pandas 3; on pandas 2.x it is opt-in. Set
+    UC_COPY_ON_WRITE=0 to keep the legacy behaviour.
+    """
+    if os.environ.get("UC_COPY_ON_WRITE", "1") == "0":
+        return False
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    pd.options.mode.copy_on_write = True
+    return True
+
+
+def estimate_bytes(obj, _seen=None):
+    """Approximate retained size of an object (frames, arrays, figures, containers)
+
+    Objects reachable more than once are counted once. Memory-mapped arrays
+    count as their full size even though pages are shared with the OS cache.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, BaseFigure):
+        return estimate_bytes(obj.to_plotly_json(), _seen)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_bytes(k, _seen) + estimate_bytes(v, _seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(item, _seen) for item in obj)
+    return sys.getsizeof(obj)
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} GB"
+
+
+class MemoryLedger:
+    """Bytes held per session and per shared cache
+
+    Caches are registered with a ``measure`` callable returning
+    ``(bytes, entries)`` and are measured on demand. Sessions are charged for
+    what they use during a rerun; ``begin()`` resets a session's charges at
+    the start of its next rerun.
+    """
+
+    def __init__(self, session_budget=SESSION_BUDGET_BYTES, global_budget=GLOBAL_BUDGET_BYTES):
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self._caches = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.rejections = 0
+
+    # ----- Caches -----
+
+    def register_cache(self, name, measure):
+        with self._lock:
+            self._caches[name] = measure
+
+    def cache_usage(self):
+        """{cache name: (bytes, entries)}"""
+        with self._lock:
+            caches = dict(self._caches)
+        return {name: measure() for name, measure in caches.items()}
+
+    def total_bytes(self):
+        return sum(nbytes for nbytes, _ in self.cache_usage().values())
+
+    # ----- Sessions -----
+
+    def begin(self, session_id):
+        """Start a rerun: clear the session's charges and drop idle sessions"""
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = {'seen': now, 'items': {}}
+            for sid in [sid for sid, s in self._sessions.items() if now - s['seen'] > SESSION_TTL]:
+                del self._sessions[sid]
+
+    def charge(self, session_id, name, nbytes):
+        with self._lock:
+            session = self._sessions.setdefault(session_id, {'seen': time.time(), 'items': {}})
+            session['items'][name] = nbytes
+
+    def session_bytes(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return sum(session['items'].values()) if session else 0
+
+    def session_items(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return dict(session['items']) if session else {}
+
+    def session_usage(self):
+        """{session id: bytes} for every live session"""
+        with self._lock:
+            return {sid: sum(s['items'].values()) for sid, s in self._sessions.items()}
+
+    def admits(self, session_id, nbytes):
+        """Whether a new result of ``nbytes`` may be kept for this session"""
+        if self.session_bytes(session_id) + nbytes <= self.session_budget:
+            return True
+        with self._lock:
+            self.rejections += 1
+        return False
+
+    def enforce(self, evictors):
+        """Run ``evictors`` in order until the global budget is met
+
+        Each evictor takes the number of bytes to free and returns the number
+        of bytes it actually released.
+        """
+        over = self.total_bytes() - self.global_budget
+        for evict in evictors:
+            if over <= 0:
+                break
+            freed = evict(over)
+            if freed:
+                with self._lock:
+                    self.evictions += 1
+            over -= freed
+        return max(over, 0)
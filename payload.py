@@ -0,0 +1,77 @@
+"""
+Per-rerun payload accounting for the dashboard
+
+Every rerun sends the page's HTML snippets and chart specs to the browser.
+The meter adds up those bytes by category so the debug panel can show what
+an interaction costs on the wire, and lets the page cut its variable-length
+parts (the rankings list and the tables) short once a byte budget is spent.
+"""
+
+import os
+import re
+
+
+PAYLOAD_BUDGET_BYTES = int(float(os.environ.get("UC_PAYLOAD_BUDGET_KB", "96")) * 1024)
+
+_WHITESPACE = re.compile(r"\s*\n\s*")
+
+
+def compact_html(html):
+    """Collapse the indentation and line breaks of an HTML snippet"""
+    return _WHITESPACE.sub(" ", html.strip())
+
+
+def frame_bytes(frame):
+    """Approximate serialised size of a table (its values and index)"""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def figure_bytes(fig):
+    """Serialised size of a Plotly figure, memoised on the figure itself
+
+    Cached figures are shared across reruns and sessions, so each one is only
+    serialised once for measuring.
+    """
+    size = getattr(fig, '_payload_bytes', None)
+    if size is None:
+        size = len(fig.to_json().encode("utf-8"))
+        fig._payload_bytes = size
+    return size
+
+
+class PayloadMeter:
+    """Bytes sent to the browser during one rerun, by category"""
+
+    def __init__(self, budget=PAYLOAD_BUDGET_BYTES):
+        self.budget = budget
+        self.parts = {}
+
+    def add(self, category, nbytes):
+        self.parts[category] = self.parts.get(category, 0) + nbytes
+
+    @property
+    def total(self):
+        return sum(self.parts.values())
+
+    @property
+    def remaining(self):
+        return self.budget - self.total
+
+    def fit(self, sizes, minimum=1):
+        """How many leading items of ``sizes`` fit in the remaining budget
+
+        Never less than ``minimum`` (or the number of items, if fewer).
+        """
+        remaining = self.remaining
+        count = 0
+        for size in sizes:
+            if size > remaining:
+                break
+            remaining -= size
+            count += 1
+        return max(count, min(minimum, len(sizes)))
+
+    def fit_rows(self, row_size, rows, minimum=1):
+        """How many rows of ``row_size`` bytes fit in the remaining budget"""
+        count = int(self.remaining // row_size) if row_size > 0 else rows
+        return min(rows, max(count, minimum))
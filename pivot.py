@@ -0,0 +1,199 @@
+"""
+Ad-hoc pivots over categorical codes
+
+Each dimension column is factorised once per dataset version into integer
+codes. A pivot combines the chosen dimensions' codes into one mixed-radix
+cell key per row and sums every measure with ``np.bincount`` over those keys,
+so any rows x columns breakdown costs a few vectorised passes instead of a
+pandas groupby. Rates are pooled (sum of numerators over sum of
+denominators); demographic measures skip group cells that ingest masked.
+"""
+
+import threading
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from ingest import GROUPS
+
+
+# Display name -> column
+DIMENSIONS = {
+    "Campus": 'College',
+    "School Type": 'Private_Public',
+    "County": 'County',
+    "City": 'City',
+}
+
+GROUP_LABELS = {group: "Hispanic/Latinx" if group == 'Hispanic_Latinx' else group.replace('_', ' ')
+                for group in GROUPS}
+
+# Above this many possible cells, keys are compacted with np.unique first
+DENSE_CELL_LIMIT = 4_000_000
+
+MISSING_LABEL = "(missing)"
+
+
+def _column(df, name):
+    return df[name].to_numpy(dtype=float)
+
+
+def _rows(df):
+    return np.ones(len(df))
+
+
+def _group_column(df, name, group):
+    """A group's counts, zero where ingest found no usable data"""
+    return np.where(df[f'{group}_Has_Data'].to_numpy(), _column(df, name), 0.0)
+
+
+def _group_base(df, group):
+    """Total applicants of the rows whose group counts are usable (or zero)"""
+    usable = df[f'{group}_Has_Data'].to_numpy() | (_column(df, f'{group}_Applied') == 0)
+    return np.where(usable, _column(df, 'Applied'), 0.0)
+
+
+def _measures():
+    """Measure name -> (numerator builder, denominator builder or None, scale)"""
+    measures = {
+        "Schools": (_rows, None, 1),
+        "Applied": (partial(_column, name='Applied'), None, 1),
+        "Admitted": (partial(_column, name='Admitted'), None, 1),
+        "Enrolled": (partial(_column, name='Enrolled'), None, 1),
+        "Admit Rate (%)": (partial(_column, name='Admitted'), partial(_column, name='Applied'), 100),
+        "Yield (%)": (partial(_column, name='Enrolled'), partial(_column, name='Admitted'), 100),
+    }
+    for group, label in GROUP_LABELS.items():
+        applied = partial(_group_column, name=f'{group}_Applied', group=group)
+        admitted = partial(_group_column, name=f'{group}_Admitted', group=group)
+        measures[f"{label} Applied"] = (applied, None, 1)
+        measures[f"{label} Admitted"] = (admitted, None, 1)
+        measures[f"{label} Admit Rate (%)"] = (admitted, applied, 100)
+        measures[f"{label} Share of Applicants (%)"] = (applied, partial(_group_base, group=group), 100)
+    return measures
+
+
+MEASURES = _measures()
+
+
+def _label_index(labels, names):
+    """Row or column labels for decoded cell keys (one array per dimension)"""
+    if not names:
+        return None
+    if len(names) == 1:
+        return pd.Index(labels[0], name=names[0])
+    return pd.MultiIndex.from_arrays(labels, names=names)
+
+
+class PivotEngine:
+    """Pivots over one frame, with codes and measure arrays built on first use"""
+
+    def __init__(self, df):
+        self.df = df
+        self._codes = {}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def codes(self, dimension):
+        """(int64 codes, sorted labels) for a dimension; missing values get their own label"""
+        if dimension not in self._codes:
+            codes, labels = pd.factorize(self.df[DIMENSIONS[dimension]], sort=True)
+            labels = np.asarray(labels, dtype=object)
+            if (codes < 0).any():
+                codes = np.where(codes < 0, len(labels), codes)
+                labels = np.append(labels, MISSING_LABEL)
+            with self._lock:
+                self._codes[dimension] = (codes.astype(np.int64), labels)
+        return self._codes[dimension]
+
+    def labels(self, dimension):
+        return self.codes(dimension)[1].tolist()
+
+    def values(self, measure):
+        """(numerator, denominator or None, scale) arrays for a measure"""
+        if measure not in self._values:
+            numerator, denominator, scale = MEASURES[measure]
+            arrays = (numerator(self.df), denominator(self.df) if denominator is not None else None, scale)
+            with self._lock:
+                self._values[measure] = arrays
+        return self._values[measure]
+
+    def pivot(self, rows, columns=(), measure="Applied", filters=None):
+        """Breakdown of ``measure`` by the ``rows`` x ``columns`` dimensions
+
+        ``filters`` maps dimensions to the single label to keep. Returns a
+        frame indexed by the row dimensions with one column per combination
+        of column labels (or one column named after the measure); cells
+        without rows are NaN.
+        """
+        rows, columns = list(rows), list(columns)
+        dims = rows + columns
+        if not rows:
+            raise ValueError("Pick at least one row dimension")
+        if len(set(dims)) != len(dims):
+            raise ValueError("A dimension can only be used once")
+
+        numerator, denominator, scale = self.values(measure)
+        keep = None
+        for dimension, label in (filters or {}).items():
+            codes, labels = self.codes(dimension)
+            matches = np.flatnonzero(labels == label)
+            hit = codes == matches[0] if len(matches) else np.zeros(len(codes), dtype=bool)
+            keep = hit if keep is None else keep & hit
+
+        # Mixed-radix cell key over every chosen dimension
+        sizes = [len(self.codes(dim)[1]) for dim in dims]
+        key = np.zeros(len(self.df), dtype=np.int64)
+        for dim, size in zip(dims, sizes):
+            key = key * size + self.codes(dim)[0]
+        if keep is not None:
+            key, numerator = key[keep], numerator[keep]
+            denominator = denominator[keep] if denominator is not None else None
+
+        cells = int(np.prod(sizes))
+        if cells == 0:
+            return pd.DataFrame(index=_label_index([[] for _ in rows], rows), columns=[] if columns else [measure])
+        if cells > DENSE_CELL_LIMIT:
+            cell_keys, bins = np.unique(key, return_inverse=True)
+            n_bins = len(cell_keys)
+        else:
+            cell_keys, bins, n_bins = None, key, cells
+
+        counts = np.bincount(bins, minlength=n_bins)
+        totals = np.bincount(bins, weights=numerator, minlength=n_bins)
+        present = np.flatnonzero(counts)
+        if denominator is not None:
+            bases = np.bincount(bins, weights=denominator, minlength=n_bins)[present]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.where(bases > 0, totals[present] / bases * scale, np.nan)
+        else:
+            values = totals[present] * scale
+        keys = cell_keys[present] if cell_keys is not None else present
+
+        # Split cell keys into row and column keys, then into per-dimension codes
+        col_size = int(np.prod(sizes[len(rows):]))
+        row_keys, col_keys = np.divmod(keys, col_size)
+        row_ids, row_pos = np.unique(row_keys, return_inverse=True)
+        if columns:
+            col_ids, col_pos = np.unique(col_keys, return_inverse=True)
+        else:
+            col_ids, col_pos = np.zeros(1, dtype=np.int64), np.zeros(len(keys), dtype=np.int64)
+        matrix = np.full((len(row_ids), len(col_ids)), np.nan)
+        matrix[row_pos, col_pos] = values
+
+        index = _label_index(self._decode(row_ids, rows, sizes[:len(rows)]), rows)
+        if columns:
+            col_labels = self._decode(col_ids, columns, sizes[len(rows):])
+            header = [" · ".join(str(label) for label in combo) for combo in zip(*col_labels)]
+        else:
+            header = [measure]
+        return pd.DataFrame(matrix, index=index, columns=header)
+
+    def _decode(self, keys, dims, sizes):
+        """Per-dimension labels of mixed-radix keys"""
+        labels = []
+        for dim, size in zip(reversed(dims), reversed(sizes)):
+            keys, codes = np.divmod(keys, size)
+            labels.append(self.codes(dim)[1][codes])
+        return labels[::-1]
@@ -0,0 +1,211 @@
+"""
+Mergeable summary sketches for admit-rate distributions and distinct counts
+
+Sketches are built once per data partition and campus, then merged. Queries
+(percentiles, histograms, distinct counts) cost the same regardless of how
+many rows went in, and appending data only means merging one more sketch.
+"""
+
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from data_store import ALL_ROWS, ensure_partition, read_partition, system_entry
+
+
+# Admit rates are bounded to 0-100%, so a fixed-resolution histogram is an
+# exact-to-resolution quantile sketch (no t-digest/KLL compression needed)
+RATE_RESOLUTION = 0.1
+RATE_BINS = int(round(100 / RATE_RESOLUTION)) + 1
+
+HLL_PRECISION = 12
+
+
+class RateSketch:
+    """Fixed-bin histogram of admit rates with quantile queries
+
+    Values are clipped to 0-100 and rounded to RATE_RESOLUTION, so quantiles
+    are accurate to half a bin (0.05 percentage points).
+    """
+
+    def __init__(self, counts=None, total=0.0):
+        self.counts = np.zeros(RATE_BINS, dtype=np.int64) if counts is None else counts
+        self.total = total
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def add(self, values):
+        """Add an array of rates"""
+        values = np.clip(np.asarray(values, dtype=float), 0, 100)
+        values = values[~np.isnan(values)]
+        idx = np.rint(values / RATE_RESOLUTION).astype(np.int64)
+        self.counts += np.bincount(idx, minlength=RATE_BINS)
+        self.total += float(values.sum())
+        return self
+
+    def merge(self, other):
+        """Return a new sketch covering both inputs"""
+        return RateSketch(self.counts + other.counts, self.total + other.total)
+
+    def quantile(self, q):
+        """Nearest-rank quantile, or None for an empty sketch"""
+        n = self.count
+        if n == 0:
+            return None
+        rank = max(int(np.ceil(q * n)), 1)
+        idx = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return idx * RATE_RESOLUTION
+
+    def mean(self):
+        n = self.count
+        return self.total / n if n else None
+
+    def histogram(self, edges):
+        """Re-bin onto coarser edges, e.g. for the distribution chart"""
+        centers = np.arange(RATE_BINS) * RATE_RESOLUTION
+        return np.histogram(centers, bins=edges, weights=self.counts)[0].astype(np.int64)
+
+
+def _bit_length(values):
+    """Vectorised int.bit_length() for uint64 arrays"""
+    values = values.copy()
+    length = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        over = values >= (np.uint64(1) << np.uint64(shift))
+        length[over] += shift
+        values[over] >>= np.uint64(shift)
+    return length + (values > 0)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter (about 1.6% standard error at p=12)"""
+
+    def __init__(self, registers=None, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add(self, values):
+        """Add an array of hashable values"""
+        values = pd.Series(values).dropna()
+        if len(values) == 0:
+            return self
+        hashes = pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+        tail_bits = 64 - self.precision
+        idx = (hashes >> np.uint64(tail_bits)).astype(np.int64)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        rank = (tail_bits - _bit_length(tail) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+        return self
+
+    def merge(self, other):
+        """Return a new counter covering both inputs"""
+        return HyperLogLog(np.maximum(self.registers, other.registers), self.precision)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Small-range correction (linear counting)
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class CampusSketch:
+    """Admit-rate distribution plus a distinct city count
+
+    Distinct schools are not sketched: every mode already keeps exact
+    school lists for the selectors.
+    """
+
+    def __init__(self, rates=None, cities=None):
+        self.rates = rates or RateSketch()
+        self.cities = cities or HyperLogLog()
+
+    def add(self, df):
+        self.rates.add(df['Admit_Rate_%'].to_numpy())
+        self.cities.add(df['City'])
+        return self
+
+    def merge(self, other):
+        return CampusSketch(self.rates.merge(other.rates), self.cities.merge(other.cities))
+
+    def summary(self):
+        """Percentiles and distinct counts, as shown in the Analytics tab"""
+        return {
+            'median': self.rates.quantile(0.5),
+            'p25': self.rates.quantile(0.25),
+            'p75': self.rates.quantile(0.75),
+            'cities': self.cities.estimate(),
+        }
+
+
+def build_sketches(df):
+    """One CampusSketch per College plus ALL_ROWS for the system-wide rows"""
+    sketches = {college: CampusSketch().add(rows) for college, rows in df.groupby('College')}
+    return _with_system(sketches)
+
+
+def merge_sketches(left, right):
+    """Merge two per-campus sketch maps"""
+    merged = dict(left)
+    for college, sketch in right.items():
+        if college != ALL_ROWS:
+            merged[college] = merged[college].merge(sketch) if college in merged else sketch
+    return _with_system(merged)
+
+
+def _with_system(sketches):
+    sketches = {college: sketch for college, sketch in sketches.items() if college != ALL_ROWS}
+    system = system_entry(sketches, CampusSketch.merge)
+    if system is not None:
+        sketches[ALL_ROWS] = system
+    return sketches
+
+
+def sketches_to_arrays(sketches):
+    """Flatten a sketch map into named arrays (for np.savez)"""
+    arrays = {}
+    for college, sketch in sketches.items():
+        arrays[f"{college}|rates"] = sketch.rates.counts
+        arrays[f"{college}|total"] = np.array([sketch.rates.total])
+        arrays[f"{college}|cities"] = sketch.cities.registers
+    return arrays
+
+
+def sketches_from_arrays(arrays):
+    """Inverse of ``sketches_to_arrays()``"""
+    colleges = {name.rsplit("|", 1)[0] for name in arrays}
+    return {
+        college: CampusSketch(
+            RateSketch(np.array(arrays[f"{college}|rates"]), float(arrays[f"{college}|total"][0])),
+            HyperLogLog(np.array(arrays[f"{college}|cities"])),
+        )
+        for college in colleges
+    }
+
+
+def year_sketches(year):
+    """Per-campus sketches for one yearly partition, built once and stored with it"""
+    part_dir, meta = ensure_partition(year)
+    path = os.path.join(part_dir, "sketches.npz")
+
+    try:
+        with np.load(path) as arrays:
+            return sketches_from_arrays(dict(arrays))
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        # Missing or unreadable (e.g. truncated): rebuilt below
+        pass
+
+    sketches = build_sketches(read_partition(part_dir, meta, ['School', 'City', 'College', 'Admit_Rate_%']))
+    # Written aside and moved into place so readers never see a partial file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **sketches_to_arrays(sketches))
+    os.replace(tmp_path, path)
+    return sketches
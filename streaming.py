@@ -0,0 +1,356 @@
+"""
+Out-of-core streaming aggregation for very large exports
+
+In streaming mode the CSV is never materialised as a whole. It is read in
+chunks through a small generator pipeline and folded into running aggregates
+(sums, counts, per-group rates, top-K leaderboards, rate sketches) that feed
+the Rankings and Analytics tabs. Rows needed by the detail views are read
+on demand from row positions recorded during the pass.
+"""
+
+import heapq
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import (
+    ALL_ROWS, DEMOGRAPHIC_RATE_COLS, RANKINGS_LIMIT, campus_aggregates, prepare_frame, sniff_separator
+)
+from ingest import QualityReport, has_data_col, ingest
+from sketches import build_sketches, merge_sketches
+
+
+CHUNK_ROWS = int(os.environ.get("UC_CHUNK_ROWS", "50000"))
+
+# Files larger than this are served in streaming mode automatically
+STREAMING_THRESHOLD_BYTES = int(float(os.environ.get("UC_STREAMING_THRESHOLD_MB", "512")) * 1024 * 1024)
+
+# Every this many data rows, the row index records a byte offset to seek to
+ROW_INDEX_STRIDE = 1024
+ROW_INDEX_BLOCK_BYTES = 16 * 1024 * 1024
+
+# Columns kept for leaderboard entries (enough to render a school card)
+CARD_COLS = ['School', 'City', 'County', 'Private_Public', 'College',
+             'Applied', 'Admitted', 'Enrolled', 'Admit_Rate_%']
+
+# Wildcards used in leaderboard keys, matching the Rankings filter options
+ANY_COLLEGE, ANY_TYPE, ANY_CITY = "All UC", "All", "All Cities"
+
+
+def streaming_enabled(path):
+    """Whether a data file should be served in streaming mode"""
+    flag = os.environ.get("UC_STREAMING", "auto").lower()
+    if flag in ("1", "true", "yes", "on"):
+        return True
+    if flag in ("0", "false", "no", "off"):
+        return False
+    return os.path.getsize(path) >= STREAMING_THRESHOLD_BYTES
+
+
+# ===== PIPELINE STAGES =====
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS, usecols=None, quality=None):
+    """Yield preprocessed, validated chunks of an export
+
+    Each chunk's QualityReport is merged into ``quality`` when one is given.
+    """
+    reader = pd.read_csv(path, sep=sniff_separator(path), chunksize=chunk_rows, usecols=usecols)
+    for chunk in reader:
+        chunk, report = ingest(prepare_frame(chunk))
+        if quality is not None:
+            quality.merge(report)
+        yield chunk
+
+
+def filter_chunks(chunks, school=None, college=None, school_type=None, city=None):
+    """Keep only rows matching every given filter (None means any)"""
+    for chunk in chunks:
+        mask = pd.Series(True, index=chunk.index)
+        if school is not None:
+            mask &= chunk['School'] == school
+        if college is not None:
+            mask &= chunk['College'] == college
+        if school_type is not None:
+            mask &= chunk['Private_Public'] == school_type
+        if city is not None:
+            mask &= chunk['City'] == city
+        if mask.any():
+            yield chunk[mask]
+
+
+def find_rows(path, school, college=None):
+    """Materialise the rows for one school by re-scanning the file"""
+    matches = list(filter_chunks(iter_chunks(path), school, college))
+    if not matches:
+        return pd.DataFrame()
+    return pd.concat(matches, ignore_index=True)
+
+
+def row_offsets(path, stride=ROW_INDEX_STRIDE):
+    """Byte offsets of data rows 0, stride, 2 * stride, ... (one pass over the raw bytes)"""
+    offsets = []
+    line = 1  # Line number that starts after the next newline (line 0 is the header)
+    position = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(ROW_INDEX_BLOCK_BYTES)
+            if not block:
+                break
+            ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+            lines = line + np.arange(len(ends))
+            offsets.extend((position + ends + 1)[(lines - 1) % stride == 0].tolist())
+            line += len(ends)
+            position += len(block)
+    return np.asarray(offsets, dtype=np.int64)
+
+
+def read_rows(path, rows, offsets, stride=ROW_INDEX_STRIDE):
+    """Preprocessed, validated data rows by number, seeking to the nearest offset
+
+    Assumes one row per line; callers check the rows they get back.
+    """
+    sep = sniff_separator(path)
+    header = pd.read_csv(path, sep=sep, nrows=0).columns
+    frames = []
+    with open(path, "rb") as f:
+        for row in sorted(rows):
+            block, skip = divmod(row, stride)
+            if block >= len(offsets):
+                return None
+            f.seek(offsets[block])
+            frame = pd.read_csv(f, sep=sep, header=None, names=header, nrows=skip + 1)
+            if len(frame) <= skip:
+                return None
+            frames.append(frame.iloc[[skip]])
+    return ingest(prepare_frame(pd.concat(frames, ignore_index=True)))[0]
+
+
+# ===== RUNNING AGGREGATES =====
+
+def _add_frame(total, part):
+    """Element-wise add of two aggregate frames with possibly different groups"""
+    if total is None:
+        return part
+    return total.add(part, fill_value=0)
+
+
+class StreamingAggregates:
+    """Running aggregates over an export, built one chunk at a time
+
+    Every table is keyed by College with an extra ALL_ROWS entry for the
+    "All UC" filter, so a campus switch is a lookup rather than a scan. Unlike
+    the in-memory path, "All UC" breakdowns count rows per campus instead of
+    de-duplicating schools, since that would need every school in memory.
+    """
+
+    def __init__(self, top_k=RANKINGS_LIMIT):
+        self.top_k = top_k
+        self.rows = 0
+        self.campus = None
+        self.extremes = None
+        self.types = None
+        self.cities = None
+        self.counties = None
+        self.demographics = None
+        self.quality = QualityReport()
+        self.sketches = {}
+        self.leaderboards = {}
+        self.schools = {}
+        self.city_names = set()
+        self.path = None
+        self.positions = {}
+        self.offsets = None
+        self.stride = ROW_INDEX_STRIDE
+        self._seq = 0
+
+    def consume(self, chunks):
+        """Fold every chunk from a pipeline into the aggregates"""
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def update(self, chunk):
+        """Fold one chunk into the aggregates"""
+        if len(chunk) == 0:
+            return
+
+        self.rows += len(chunk)
+        stacked = pd.concat([chunk, chunk.assign(College=ALL_ROWS)], ignore_index=True)
+
+        self.campus = _add_frame(self.campus, stacked.groupby('College').agg(
+            Rows=('School', 'size'), Applied=('Applied', 'sum'), Admitted=('Admitted', 'sum'),
+            Enrolled=('Enrolled', 'sum'), Rate_Sum=('Admit_Rate_%', 'sum')))
+        self._update_extremes(stacked)
+
+        self.types = _add_frame(self.types, stacked.groupby(['College', 'Private_Public']).agg(
+            Rows=('School', 'size'), Rate_Sum=('Admit_Rate_%', 'sum'), Applied=('Applied', 'sum')))
+        self.cities = _add_frame(self.cities, stacked.groupby(['College', 'City']).agg(
+            Rows=('School', 'size'), Rate_Sum=('Admit_Rate_%', 'sum')))
+        self.counties = _add_frame(self.counties, stacked.groupby(['College', 'County']).agg(
+            Rows=('School', 'size'), Rate_Sum=('Admit_Rate_%', 'sum'),
+            Applied=('Applied', 'sum'), Admitted=('Admitted', 'sum')))
+
+        # Demographic rates over rows with data (non-zero rate)
+        demo = {}
+        for demo_name, col_name in DEMOGRAPHIC_RATE_COLS.items():
+            if col_name in stacked.columns:
+                rates = stacked[col_name].where(stacked[has_data_col(col_name)])
+                demo[(demo_name, 'Rows')] = rates.notna().groupby(stacked['College']).sum()
+                demo[(demo_name, 'Rate_Sum')] = rates.groupby(stacked['College']).sum()
+        if demo:
+            self.demographics = _add_frame(self.demographics, pd.DataFrame(demo))
+
+        # Distribution and distinct-count sketches merge chunk by chunk
+        self.sketches = merge_sketches(self.sketches, build_sketches(chunk))
+
+        for college, names in stacked.groupby('College')['School']:
+            self.schools.setdefault(college, set()).update(names.unique())
+        self.city_names.update(chunk['City'].dropna().unique())
+
+        # Data row number of each (School, College), for reading it back without a scan
+        for school, college, row in zip(chunk['School'], chunk['College'], chunk.index):
+            self.positions.setdefault(school, {})[college] = row
+
+        self._update_leaderboards(chunk)
+
+    def _update_extremes(self, stacked):
+        extremes = stacked.groupby('College')['Admit_Rate_%'].agg(['min', 'max'])
+        if self.extremes is not None:
+            extremes = pd.concat([self.extremes, extremes]).groupby(level=0).agg({'min': 'min', 'max': 'max'})
+        self.extremes = extremes
+
+    def _update_leaderboards(self, chunk):
+        """Merge the chunk's per-filter top-K candidates into bounded heaps"""
+        ordered = chunk[CARD_COLS].sort_values('Admit_Rate_%', ascending=False, kind='stable')
+        key_options = {
+            'College': [('College', None), (None, ANY_COLLEGE)],
+            'Private_Public': [('Private_Public', None), (None, ANY_TYPE)],
+            'City': [('City', None), (None, ANY_CITY)],
+        }
+
+        for college_col, college_any in key_options['College']:
+            for type_col, type_any in key_options['Private_Public']:
+                for city_col, city_any in key_options['City']:
+                    group_cols = [c for c in (college_col, type_col, city_col) if c]
+                    # Rows whose campus is literally "All UC" are covered by the wildcard key
+                    source = ordered[ordered['College'] != ANY_COLLEGE] if college_col else ordered
+                    candidates = source.groupby(group_cols).head(self.top_k) if group_cols else source.head(self.top_k)
+
+                    for record in candidates.to_dict('records'):
+                        key = (record['College'] if college_col else college_any,
+                               record['Private_Public'] if type_col else type_any,
+                               record['City'] if city_col else city_any)
+                        heap = self.leaderboards.setdefault(key, [])
+                        self._seq += 1
+                        entry = (record['Admit_Rate_%'], -self._seq, record)
+                        if len(heap) < self.top_k:
+                            heapq.heappush(heap, entry)
+                        elif entry[:2] > heap[0][:2]:
+                            heapq.heapreplace(heap, entry)
+
+    # ----- Queries -----
+
+    def campuses(self):
+        """Campus names seen in the data"""
+        return [c for c in self.schools if c != ALL_ROWS]
+
+    def school_names(self, college=None):
+        """Sorted school names, optionally for one campus"""
+        return sorted(self.schools.get(ALL_ROWS if college in (None, ANY_COLLEGE) else college, ()))
+
+    def school_rows(self, school, college=None):
+        """Rows for one school, read from their recorded positions
+
+        Falls back to a scan when the rows found there are not the school's
+        (e.g. quoted line breaks shift the line-based offsets).
+        """
+        wanted = {row: campus for campus, row in self.positions.get(school, {}).items()
+                  if college is None or campus == college}
+        if not wanted:
+            return pd.DataFrame()
+        found = read_rows(self.path, wanted, self.offsets, self.stride) if self.offsets is not None else None
+        if (found is None or len(found) != len(wanted) or not (found['School'] == school).all()
+                or list(found['College']) != [wanted[row] for row in sorted(wanted)]):
+            return find_rows(self.path, school, college)
+        return found.reset_index(drop=True)
+
+    def leaderboard(self, college=ANY_COLLEGE, school_type=ANY_TYPE, city=ANY_CITY):
+        """Top schools by admit rate for a Rankings filter combination"""
+        heap = self.leaderboards.get((college, school_type, city), [])
+        records = [record for _, _, record in sorted(heap, key=lambda e: e[:2], reverse=True)]
+        return pd.DataFrame(records, columns=CARD_COLS)
+
+    def aggregates(self):
+        """Per-campus totals in the same shape as ``year_aggregates()``"""
+        totals = self.campus.to_dict(orient='index') if self.campus is not None else {}
+        return campus_aggregates(totals, len(self.schools.get(ALL_ROWS, ())))
+
+    def analytics(self, college=ANY_COLLEGE):
+        """Same tables as ``compute_analytics()``, from the running aggregates"""
+        key = ALL_ROWS if college == ANY_COLLEGE else college
+        campus = self.campus.loc[key] if self.campus is not None and key in self.campus.index else None
+        extremes = self.extremes.loc[key] if campus is not None else None
+
+        leaders = self.leaderboard(college)
+
+        type_stats = pd.DataFrame(columns=['Private_Public', 'School', 'Admit_Rate_%', 'Applied'])
+        if self.types is not None and key in self.types.index.get_level_values(0):
+            t = self.types.loc[key]
+            type_stats = pd.DataFrame({
+                'Private_Public': t.index,
+                'School': t['Rows'].to_numpy(),
+                'Admit_Rate_%': (t['Rate_Sum'] / t['Rows']).to_numpy(),
+                'Applied': t['Applied'].to_numpy(),
+            })
+
+        city_stats = pd.DataFrame(columns=['City', 'Admit_Rate_%', 'School'])
+        if self.cities is not None and key in self.cities.index.get_level_values(0):
+            c = self.cities.loc[key]
+            city_stats = pd.DataFrame({
+                'City': c.index,
+                'Admit_Rate_%': (c['Rate_Sum'] / c['Rows']).to_numpy(),
+                'School': c['Rows'].to_numpy(),
+            })
+            city_stats = city_stats[city_stats['School'] >= 2].nlargest(10, 'Admit_Rate_%')
+
+        county_stats = pd.DataFrame(columns=['County', 'Schools', 'Applied', 'Admitted', 'Admit_Rate_%', 'Pooled_Admit_Rate'])
+        if self.counties is not None and key in self.counties.index.get_level_values(0):
+            c = self.counties.loc[key]
+            county_stats = pd.DataFrame({
+                'County': c.index,
+                'Schools': c['Rows'].to_numpy(),
+                'Applied': c['Applied'].to_numpy(),
+                'Admitted': c['Admitted'].to_numpy(),
+                'Admit_Rate_%': (c['Rate_Sum'] / c['Rows']).to_numpy(),
+                'Pooled_Admit_Rate': (c['Admitted'] / c['Applied'].where(c['Applied'] > 0) * 100).fillna(0.0).to_numpy(),
+            })
+
+        demo_avgs = {}
+        if self.demographics is not None and key in self.demographics.index:
+            demo = self.demographics.loc[key]
+            for demo_name in DEMOGRAPHIC_RATE_COLS:
+                if (demo_name, 'Rows') in demo.index and demo[(demo_name, 'Rows')] > 0:
+                    demo_avgs[demo_name] = demo[(demo_name, 'Rate_Sum')] / demo[(demo_name, 'Rows')]
+
+        rows = campus['Rows'] if campus is not None else 0
+        return {
+            'top_10': leaders.head(10)[['School', 'Admit_Rate_%']],
+            'type_stats': type_stats,
+            'city_stats': city_stats,
+            'county_stats': county_stats,
+            'demo_avgs': demo_avgs,
+            'total_schools': len(self.schools.get(key, ())),
+            'avg_rate': campus['Rate_Sum'] / rows if rows else 0.0,
+            'max_rate': extremes['max'] if rows else 0.0,
+            'min_rate': extremes['min'] if rows else 0.0,
+        }
+
+
+def build_aggregates(path, chunk_rows=CHUNK_ROWS):
+    """Stream an export through the pipeline into running aggregates"""
+    aggregates = StreamingAggregates()
+    aggregates.consume(iter_chunks(path, chunk_rows, quality=aggregates.quality))
+    aggregates.path = path
+    aggregates.offsets = row_offsets(path, aggregates.stride)
+    return aggregates
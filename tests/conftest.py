@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA_PATH = os.path.join(ROOT, "data", "UC_Schools_Admission_Rankings.csv")
+
+
+@pytest.fixture(scope="session")
+def data_path():
+    return DATA_PATH
+
+
+@pytest.fixture(scope="session")
+def export_df():
+    """The bundled snapshot, read and ingested"""
+    from data_store import load_export
+    return load_export(DATA_PATH)[0]
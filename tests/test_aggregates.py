@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from data_store import ALL_ROWS, SYSTEM_COLLEGE, Snapshot, _compute_year_aggregates
+from sketches import CampusSketch, build_sketches
+from streaming import build_aggregates
+
+
+def system_totals(rows):
+    return {
+        'Schools': rows['School'].nunique(),
+        'Applied': rows['Applied'].sum(),
+        'Admitted': rows['Admitted'].sum(),
+        'Avg_Admit_Rate': rows['Admit_Rate_%'].mean(),
+        'Pooled_Admit_Rate': rows['Admitted'].sum() / rows['Applied'].sum() * 100,
+    }
+
+
+def all_rows_entry(agg):
+    row = agg[agg['College'] == ALL_ROWS]
+    assert len(row) == 1
+    return row.iloc[0]
+
+
+def assert_totals(entry, expected):
+    for name, value in expected.items():
+        assert entry[name] == pytest.approx(value), name
+
+
+@pytest.fixture
+def campus_only(export_df):
+    return export_df[export_df['College'] != SYSTEM_COLLEGE]
+
+
+def test_year_aggregate_uses_the_all_uc_rows(export_df):
+    expected = system_totals(export_df[export_df['College'] == SYSTEM_COLLEGE])
+    assert_totals(all_rows_entry(_compute_year_aggregates(export_df)), expected)
+
+
+def test_snapshot_and_streaming_aggregates_match_year_aggregate(export_df, data_path):
+    expected = _compute_year_aggregates(export_df).set_index('College').sort_index()
+    snapshot = Snapshot.build(export_df, "v", 0).aggregates().set_index('College').sort_index()
+    streaming = build_aggregates(data_path, chunk_rows=100).aggregates().set_index('College').sort_index()
+    for agg in (snapshot, streaming):
+        assert list(agg.index) == list(expected.index)
+        np.testing.assert_allclose(agg.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+
+
+def test_without_all_uc_rows_campuses_are_summed(campus_only):
+    expected = system_totals(campus_only)
+    assert_totals(all_rows_entry(_compute_year_aggregates(campus_only)), expected)
+    assert_totals(all_rows_entry(Snapshot.build(campus_only, "v", 0).aggregates()), expected)
+
+
+def test_all_rows_sketch_covers_the_all_uc_rows(export_df, data_path):
+    expected = CampusSketch().add(export_df[export_df['College'] == SYSTEM_COLLEGE]).rates.counts
+    np.testing.assert_array_equal(build_sketches(export_df)[ALL_ROWS].rates.counts, expected)
+    merged = build_aggregates(data_path, chunk_rows=100).sketches
+    np.testing.assert_array_equal(merged[ALL_ROWS].rates.counts, expected)
+
+
+def test_all_rows_sketch_without_all_uc_rows_covers_every_row(campus_only):
+    expected = CampusSketch().add(campus_only).rates.counts
+    np.testing.assert_array_equal(build_sketches(campus_only)[ALL_ROWS].rates.counts, expected)
@@ -0,0 +1,63 @@
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.parse import quote
+
+import pytest
+
+from api import ApiHandler, DataApi
+from datasets import DatasetRegistry
+from exports import content_disposition, export_filename
+
+
+@pytest.fixture(scope="module")
+def server(data_path):
+    ApiHandler.api = DataApi(DatasetRegistry.single(data_path))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ApiHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(server, path):
+    conn = http.client.HTTPConnection(*server, timeout=30)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_export_rejects_unknown_college(server):
+    response, body = get(server, "/api/export?college=x%0d%0aSet-Cookie:%20pwn=1")
+    assert response.status == 400
+    assert response.getheader('Set-Cookie') is None
+    assert "Unknown college" in json.loads(body)['error']
+
+
+def test_export_filename_is_header_safe(server):
+    response, body = get(server, "/api/export?college=UC%20Berkeley")
+    assert response.status == 200
+    assert response.getheader('Content-Disposition') == (
+        "attachment; filename=\"uc_rankings_UC_Berkeley.csv\"; filename*=UTF-8''uc_rankings_UC_Berkeley.csv")
+    assert body.startswith(b"School")
+
+
+def test_filenames_never_carry_control_characters():
+    filename = export_filename("uc_rankings_x\r\nSet-Cookie: pwn=1\"é", 'csv')
+    assert filename == "uc_rankings_x_Set-Cookie_pwn_1.csv"
+    header = content_disposition("données \"q\".csv")
+    assert "\r" not in header and "\n" not in header
+    assert header.endswith("filename*=UTF-8''donn%C3%A9es%20%22q%22.csv")
+    assert 'filename="donn_es_q_.csv"' in header
+
+
+def test_compare_ignores_a_name_parameter(server):
+    schools = ["ABRAHAM LINCOLN HIGH SCHOOL", "ACE CHARTER HIGH SCHOOL"]
+    query = "&".join(f"school={quote(s)}" for s in schools)
+    response, body = get(server, f"/api/compare?{query}&name={quote(schools[0])}&college=UCLA")
+    assert response.status == 200
+    assert [row['School'] for row in json.loads(body)['schools']] == schools
@@ -0,0 +1,20 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exports import encode
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_parquet_chunks_share_the_first_schema():
+    frames = [
+        pd.DataFrame({'School': ["A", "B"], 'Applied': [10, 20], 'City': [None, None]}),
+        pd.DataFrame({'School': ["C", "D"], 'Applied': [30.0, np.nan], 'City': ["Oakland", None]}),
+    ]
+    table = pq.read_table(io.BytesIO(b"".join(encode(iter(frames), 'parquet'))))
+    assert table.num_rows == 4
+    assert table.column('Applied').to_pylist() == [10, 20, 30, None]
+    assert table.column('City').to_pylist() == [None, None, "Oakland", None]
@@ -0,0 +1,107 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components import COUNTY_METRICS, build_county_figures
+from geo import (
+    CA_COUNTY_FIPS, GEO_DIR, GEO_URL, build_geometry, choose_level, county_codes,
+    geometry_url, load_manifest, simplify_ring
+)
+
+
+def square(x, y, size, points=40):
+    """Closed square ring with extra points along its edges"""
+    t = np.linspace(0, 1, points // 4, endpoint=False)
+    edges = [np.c_[x + t * size, np.full_like(t, y)],
+             np.c_[np.full_like(t, x + size), y + t * size],
+             np.c_[x + size - t * size, np.full_like(t, y + size)],
+             np.c_[np.full_like(t, x), y + size - t * size]]
+    ring = np.concatenate(edges)
+    return np.vstack([ring, ring[:1]]).tolist()
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    source = tmp_path / "counties.geojson"
+    source.write_text(json.dumps({'type': "FeatureCollection", 'features': [
+        {'type': "Feature", 'properties': {'GEOID': "06001"},
+         'geometry': {'type': "Polygon", 'coordinates': [square(-122.3, 37.5, 0.4)]}},
+        {'type': "Feature", 'properties': {'STATEFP': "06", 'COUNTYFP': "003"},
+         'geometry': {'type': "MultiPolygon", 'coordinates': [[square(-120.0, 38.5, 0.5)], [square(-119.4, 38.5, 0.001)]]}},
+        {'type': "Feature", 'properties': {'GEOID': "32001"},
+         'geometry': {'type': "Polygon", 'coordinates': [square(-118.0, 39.0, 1.0)]}},
+    ]}))
+    build_geometry(str(source), str(tmp_path / "geo"))
+    return load_manifest(str(tmp_path / "geo"))
+
+
+@pytest.fixture
+def county_stats():
+    return pd.DataFrame({
+        'County': ["Alameda", "Alpine County", "Atlantis"],
+        'Schools': [12, 1, 3],
+        'Applied': [5000, 40, 90],
+        'Pooled_Admit_Rate': [61.5, 70.0, 12.0],
+    })
+
+
+def test_simplify_keeps_corners_of_a_square():
+    ring = np.array(square(0, 0, 1))
+    simplified = simplify_ring(ring, 0.01)
+    assert len(simplified) == 5
+    np.testing.assert_array_equal(simplified[0], simplified[-1])
+
+
+def test_bundle_keeps_only_california_counties(manifest, tmp_path):
+    assert sorted(manifest['bounds']) == ["06001", "06003"]
+    assert set(manifest['levels']) == {'coarse', 'medium', 'fine'}
+    with open(tmp_path / "geo" / manifest['levels']['coarse']['file']) as f:
+        features = json.load(f)['features']
+    assert [feature['id'] for feature in features] == ["06001", "06003"]
+    assert features[0]['properties']['name'] == "Alameda"
+    assert len(features[0]['geometry']['coordinates'][0]) == 5
+    # The sliver of Alpine collapses at coarse detail, its main part stays
+    assert features[1]['geometry']['type'] == "Polygon"
+
+
+def test_level_follows_extent_of_counties_in_view(manifest):
+    assert choose_level(manifest, ["06001"]) == 'fine'
+    assert choose_level(manifest, ["06001", "06003"]) == 'medium'
+    assert choose_level(manifest, []) == 'coarse'
+    assert geometry_url(manifest, 'fine') == f"{GEO_URL}/ca_counties_fine.geojson"
+
+
+def test_county_codes_match_names_with_or_without_suffix(county_stats):
+    assert county_codes(county_stats['County']).tolist()[:2] == ["06001", "06003"]
+    assert pd.isna(county_codes(county_stats['County'])[2])
+
+
+def test_county_map_references_geometry_by_url(manifest, county_stats):
+    figures, is_map = build_county_figures(county_stats, manifest)
+    assert is_map
+    assert set(figures) == set(COUNTY_METRICS)
+    trace = figures["Admit Rate"].data[0]
+    assert trace.type == "choropleth"
+    assert trace.geojson == f"{GEO_URL}/ca_counties_medium.geojson"
+    assert trace.featureidkey == 'id'
+    assert list(trace.locations) == ["06001", "06003"]
+    assert list(trace.z) == [61.5, 70.0]
+    assert list(figures["Applicants"].data[0].z) == [5000, 40]
+
+
+def test_county_chart_without_geometry(county_stats):
+    figures, is_map = build_county_figures(county_stats, None)
+    assert not is_map
+    assert figures["Admit Rate"].data[0].type == "bar"
+    assert len(figures["Admit Rate"].data[0].y) == 3
+
+
+def test_bundled_geometry_covers_every_county(export_df):
+    manifest = load_manifest(GEO_DIR)
+    assert manifest is not None
+    assert set(manifest['bounds']) == set(CA_COUNTY_FIPS.values())
+    codes = county_codes(pd.Series(export_df['County'].dropna().unique()))
+    assert codes.notna().all()
+    assert set(codes) <= set(manifest['bounds'])
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import load_export, sniff_separator
+from ingest import SAMPLE_ROWS, QualityReport
+from streaming import iter_chunks
+
+
+@pytest.fixture
+def flagged_export(tmp_path, data_path):
+    """The bundled export repeated past the sample cap, every other row inconsistent"""
+    raw = pd.read_csv(data_path, sep=sniff_separator(data_path))
+    raw = pd.concat([raw] * (2 * SAMPLE_ROWS // len(raw) + 2), ignore_index=True)
+    bad = np.arange(len(raw)) % 2 == 0
+    raw.loc[bad, 'Admitted'] = raw.loc[bad, 'Applied'] + 1
+    path = tmp_path / "export.csv"
+    raw.to_csv(path, index=False)
+    return str(path)
+
+
+def test_flagged_count_is_not_capped_by_samples(flagged_export):
+    _, quality = load_export(flagged_export)
+    assert quality.flagged > SAMPLE_ROWS
+    assert quality.flagged >= quality.quarantined
+    assert len(quality.samples) == SAMPLE_ROWS
+    assert quality.summary()['flagged'] == quality.flagged
+
+
+def test_streaming_merge_counts_every_chunk(flagged_export):
+    _, whole = load_export(flagged_export)
+    merged = QualityReport()
+    for _ in iter_chunks(flagged_export, chunk_rows=700, quality=merged):
+        pass
+    assert merged.summary() == whole.summary()
+    assert len(merged.samples) == SAMPLE_ROWS
+
+
+def test_report_round_trips_through_dict(flagged_export):
+    _, quality = load_export(flagged_export)
+    restored = QualityReport.from_dict(quality.to_dict())
+    assert restored.summary() == quality.summary()
+    assert len(restored.samples) == len(quality.samples)
@@ -0,0 +1,68 @@
+import mmap
+
+import numpy as np
+import pandas as pd
+
+from data_store import Snapshot, read_partition, write_partition
+from exports import split_frame
+from memory import MemoryLedger, enable_copy_on_write, estimate_bytes
+from view_state import ResultCache
+
+
+def _shares(left, right, column):
+    return np.shares_memory(left[column].to_numpy(), right[column].to_numpy())
+
+
+def test_copy_on_write_is_on():
+    assert enable_copy_on_write()
+    if int(pd.__version__.split(".")[0]) < 3:
+        assert pd.options.mode.copy_on_write is True
+
+
+def test_snapshot_shares_columns_with_the_ingested_frame(export_df):
+    snapshot = Snapshot.build(export_df, "v1", 0)
+    assert _shares(snapshot.df, export_df, 'Applied')
+
+
+def test_export_chunks_are_views(export_df):
+    chunks = list(split_frame(export_df, chunk_rows=100))
+    assert sum(len(chunk) for chunk in chunks) == len(export_df)
+    assert all(_shares(chunk, export_df, 'Admit_Rate_%') for chunk in chunks)
+
+
+def test_writes_to_a_view_do_not_reach_the_snapshot(export_df):
+    snapshot = Snapshot.build(export_df, "v1", 0)
+    before = snapshot.df['Applied'].copy()
+    chunk = next(split_frame(snapshot.df, chunk_rows=10))
+    chunk.loc[chunk.index[0], 'Applied'] = -1
+    pd.testing.assert_series_equal(snapshot.df['Applied'], before)
+
+
+def test_partition_columns_are_memory_mapped(tmp_path, export_df):
+    meta = write_partition(export_df, str(tmp_path / "part"))
+    df = read_partition(str(tmp_path / "part"), meta, ['Applied', 'Admit_Rate_%'])
+    for column in df.columns:
+        base = df[column].to_numpy()
+        while base is not None and not isinstance(base, mmap.mmap):
+            base = getattr(base, 'base', None)
+        assert base is not None, f"{column} was copied out of the partition"
+
+
+def test_year_cache_measures_entries_once(export_df):
+    calls = []
+
+    def sizer(value):
+        calls.append(value)
+        return estimate_bytes(value)
+
+    cache = ResultCache(max_entries=2, sizer=sizer)
+    ledger = MemoryLedger(global_budget=1)
+    ledger.register_cache("Years", lambda: (cache.bytes, len(cache)))
+    for _ in range(3):
+        cache.get_or_compute((2023, "sig"), lambda: export_df)
+        ledger.cache_usage()
+    assert len(calls) == 1
+
+    # Enforcing the budget can free the entry
+    assert ledger.enforce([cache.shrink]) == 0
+    assert len(cache) == 0 and cache.bytes == 0
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pivot
+from pivot import DIMENSIONS, MEASURES, MISSING_LABEL, PivotEngine
+
+
+def reference_pivot(df, rows, columns, measure, filters=None):
+    """The same pivot with a pandas groupby"""
+    numerator, denominator, scale = MEASURES[measure]
+    dims = rows + columns
+    frame = pd.DataFrame({dim: df[DIMENSIONS[dim]].astype(object).fillna(MISSING_LABEL)
+                          for dim in dims + list(filters or {})})
+    frame['num'] = numerator(df)
+    frame['den'] = denominator(df) if denominator is not None else 1.0
+    for dim, label in (filters or {}).items():
+        frame = frame[frame[dim] == label]
+
+    sums = frame.groupby(dims)[['num', 'den']].sum()
+    if denominator is not None:
+        values = (sums['num'] / sums['den'] * scale).where(sums['den'] > 0)
+    else:
+        values = sums['num'] * scale
+    if not columns:
+        return values.to_frame(measure)
+    table = values.unstack(columns)
+    if len(columns) > 1:
+        table.columns = [" · ".join(str(label) for label in combo) for combo in table.columns]
+    else:
+        table.columns = [str(label) for label in table.columns]
+    return table
+
+
+def assert_same_pivot(actual, expected):
+    actual = actual.sort_index().sort_index(axis=1)
+    expected = expected.sort_index().sort_index(axis=1)
+    assert list(actual.index) == list(expected.index)
+    assert list(actual.columns) == list(expected.columns)
+    np.testing.assert_allclose(actual.to_numpy(dtype=float), expected.to_numpy(dtype=float), equal_nan=True)
+
+
+@pytest.fixture
+def frame(export_df):
+    """The export with some counties missing, so the missing label is covered"""
+    df = export_df.copy()
+    df['County'] = df['County'].astype(object)
+    df.loc[df.index[::7], 'County'] = np.nan
+    return df
+
+
+CASES = [
+    (["County"], [], "Applied", None),
+    (["Campus"], ["School Type"], "Admit Rate (%)", None),
+    (["County", "School Type"], ["Campus"], "Schools", None),
+    (["City"], ["School Type"], "Yield (%)", {"Campus": "UCLA"}),
+    (["School Type", "County"], [], "Hispanic/Latinx Admit Rate (%)", {"Campus": "All UC"}),
+    (["Campus", "County"], ["School Type"], "Asian Share of Applicants (%)", None),
+    (["City"], ["County", "School Type"], "White Admitted", {"Campus": "UC Berkeley"}),
+]
+
+
+@pytest.mark.parametrize("rows, columns, measure, filters", CASES)
+def test_pivot_matches_groupby(frame, rows, columns, measure, filters):
+    table = PivotEngine(frame).pivot(rows, columns, measure, filters)
+    assert table.notna().any().any()
+    assert_same_pivot(table, reference_pivot(frame, rows, columns, measure, filters))
+
+
+@pytest.mark.parametrize("rows, columns, measure, filters", CASES)
+def test_compacted_keys_match_dense(frame, rows, columns, measure, filters, monkeypatch):
+    dense = PivotEngine(frame).pivot(rows, columns, measure, filters)
+    monkeypatch.setattr(pivot, 'DENSE_CELL_LIMIT', 1)
+    compacted = PivotEngine(frame).pivot(rows, columns, measure, filters)
+    pd.testing.assert_frame_equal(compacted, dense)
+
+
+def test_missing_values_get_their_own_label(frame):
+    table = PivotEngine(frame).pivot(["County"], [], "Schools")
+    assert table.index[-1] == MISSING_LABEL
+    assert table.loc[MISSING_LABEL, "Schools"] == frame['County'].isna().sum()
+
+
+def test_filter_without_matching_rows_is_empty(frame):
+    table = PivotEngine(frame).pivot(["County"], [], "Applied", {"Campus": "UC Nowhere"})
+    assert len(table) == 0
+
+
+def test_rows_are_required_and_unique(frame):
+    engine = PivotEngine(frame)
+    with pytest.raises(ValueError):
+        engine.pivot([], ["County"])
+    with pytest.raises(ValueError):
+        engine.pivot(["County"], ["County"])
@@ -0,0 +1,105 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import data_store
+from data_store import ALL_ROWS, HISTOGRAM_EDGES
+from sketches import (
+    RATE_RESOLUTION, HyperLogLog, RateSketch, build_sketches, merge_sketches,
+    sketches_from_arrays, sketches_to_arrays, year_sketches
+)
+
+
+@pytest.fixture
+def rates():
+    rng = np.random.default_rng(7)
+    return np.concatenate([rng.uniform(0, 100, 5000), rng.beta(2, 8, 5000) * 100, [0, 100]])
+
+
+def test_rate_quantiles_are_accurate_to_half_a_bin(rates):
+    sketch = RateSketch().add(rates)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        expected = np.quantile(rates, q, method='inverted_cdf')
+        assert abs(sketch.quantile(q) - expected) <= RATE_RESOLUTION / 2 + 1e-9
+    assert sketch.mean() == pytest.approx(rates.mean())
+
+
+def test_rate_merge_equals_one_pass(rates):
+    merged = RateSketch().add(rates[:3000]).merge(RateSketch().add(rates[3000:]))
+    whole = RateSketch().add(rates)
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    assert merged.total == pytest.approx(whole.total)
+
+
+def test_rate_histogram_matches_numpy(rates):
+    rounded = np.rint(rates / RATE_RESOLUTION) * RATE_RESOLUTION
+    expected = np.histogram(rounded, bins=HISTOGRAM_EDGES)[0]
+    np.testing.assert_array_equal(RateSketch().add(rates).histogram(HISTOGRAM_EDGES), expected)
+
+
+def test_rate_sketch_ignores_missing_and_clips():
+    sketch = RateSketch().add([np.nan, -5, 120])
+    assert sketch.count == 2
+    assert sketch.quantile(0) == 0 and sketch.quantile(1) == 100
+    assert RateSketch().quantile(0.5) is None
+
+
+@pytest.mark.parametrize("n", [10, 1000, 50_000])
+def test_hll_estimate_is_within_error_bounds(n):
+    hll = HyperLogLog().add([f"city-{i}" for i in range(n)])
+    # 1.6% standard error at p=12; allow four standard errors
+    assert abs(hll.estimate() - n) <= max(1, 4 * 0.016 * n)
+
+
+def test_hll_ignores_duplicates():
+    values = [f"city-{i}" for i in range(500)]
+    once = HyperLogLog().add(values)
+    thrice = HyperLogLog().add(values * 3)
+    np.testing.assert_array_equal(once.registers, thrice.registers)
+
+
+def test_hll_merge_equals_union():
+    left = [f"s-{i}" for i in range(0, 6000)]
+    right = [f"s-{i}" for i in range(4000, 10000)]
+    merged = HyperLogLog().add(left).merge(HyperLogLog().add(right))
+    np.testing.assert_array_equal(merged.registers, HyperLogLog().add(left + right).registers)
+    assert abs(merged.estimate() - 10000) <= 4 * 0.016 * 10000
+
+
+def test_chunked_sketches_match_whole_frame(export_df):
+    chunks = [export_df.iloc[i:i + 100] for i in range(0, len(export_df), 100)]
+    merged = {}
+    for chunk in chunks:
+        merged = merge_sketches(merged, build_sketches(chunk))
+    whole = build_sketches(export_df)
+
+    assert set(merged) == set(whole)
+    for college, sketch in whole.items():
+        np.testing.assert_array_equal(merged[college].rates.counts, sketch.rates.counts)
+        np.testing.assert_array_equal(merged[college].cities.registers, sketch.cities.registers)
+    assert whole[ALL_ROWS].summary()['cities'] == export_df['City'].nunique()
+
+
+def test_sketches_round_trip_through_arrays(export_df):
+    sketches = build_sketches(export_df)
+    restored = sketches_from_arrays(sketches_to_arrays(sketches))
+    assert {college: s.summary() for college, s in restored.items()} == \
+        {college: s.summary() for college, s in sketches.items()}
+
+
+def test_truncated_year_sketches_are_rebuilt(tmp_path, data_path, monkeypatch):
+    monkeypatch.setattr(data_store, 'YEARS_DIR', str(tmp_path))
+    shutil.copy(data_path, tmp_path / "uc_2024.csv")
+    built = year_sketches(2024)
+
+    path = os.path.join(data_store.partition_dir(2024), "sketches.npz")
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+    rebuilt = year_sketches(2024)
+    np.testing.assert_array_equal(rebuilt[ALL_ROWS].rates.counts, built[ALL_ROWS].rates.counts)
+    assert not os.path.exists(path + ".tmp")
+    with np.load(path) as arrays:
+        assert sorted(sketches_from_arrays(dict(arrays))) == sorted(built)
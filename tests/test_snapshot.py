@@ -0,0 +1,115 @@
+import pandas as pd
+
+import data_store
+from data_store import KEY_COLS, LiveDataset, Snapshot, load_export
+
+
+def _edited(df):
+    """A next version of ``df`` with changed, removed and added rows"""
+    new = df.copy()
+    changed = new.index[[0, 5, 40]]
+    new.loc[changed, 'Applied'] += 7
+    new.loc[changed, 'Admitted'] += 3
+    new.loc[changed, 'Admit_Rate_%'] = new.loc[changed, 'Admitted'] / new.loc[changed, 'Applied'] * 100
+    new = new.drop(index=new.index[[10, 11, 300]])
+    added = df.iloc[[20, 21]].assign(School=lambda d: d['School'] + " (NEW)")
+    return pd.concat([new, added], ignore_index=True), df.iloc[[0, 5, 40]], df.iloc[[10, 11, 300]], added
+
+
+def _by_key(df):
+    return df.sort_values(KEY_COLS).reset_index(drop=True)
+
+
+def _assert_same(snapshot, rebuilt):
+    pd.testing.assert_frame_equal(_by_key(snapshot.df), _by_key(rebuilt.df))
+    assert set(snapshot.index) == set(rebuilt.index)
+    for key, label in snapshot.index.items():
+        assert tuple(snapshot.df.loc[label, KEY_COLS]) == key
+    pd.testing.assert_series_equal(snapshot.hashes.sort_index(), rebuilt.hashes.sort_index())
+    assert snapshot.school_counts == rebuilt.school_counts
+    assert set(snapshot.totals) >= {c for c, v in rebuilt.totals.items() if v['Rows']}
+    pd.testing.assert_frame_equal(
+        snapshot.aggregates().sort_values('College').reset_index(drop=True),
+        rebuilt.aggregates().sort_values('College').reset_index(drop=True))
+
+
+def test_apply_matches_full_rebuild(export_df):
+    old = Snapshot.build(export_df, "v1", 0)
+    new_df, changed, removed, added = _edited(old.df)
+
+    snapshot, affected = old.apply(new_df, "v2", 1)
+
+    _assert_same(snapshot, Snapshot.build(new_df, "v2", 1))
+    expected = {tuple(key) for frame in (changed, removed, added) for key in frame[KEY_COLS].to_numpy()}
+    assert affected == expected
+
+
+def test_apply_leaves_the_previous_snapshot_intact(export_df):
+    old = Snapshot.build(export_df, "v1", 0)
+    before = old.df.copy()
+    old.apply(_edited(old.df)[0], "v2", 1)
+    pd.testing.assert_frame_equal(old.df, before)
+
+
+def test_repeated_applies_match_full_rebuild(export_df):
+    snapshot = Snapshot.build(export_df, "v1", 0)
+    current = export_df
+    for step in range(3):
+        current = _edited(current.reset_index(drop=True))[0]
+        snapshot, _ = snapshot.apply(current, f"v{step + 2}", step)
+    _assert_same(snapshot, Snapshot.build(current, "v5", 0))
+
+
+def test_apply_drops_figures_of_affected_rows_only(export_df):
+    old = Snapshot.build(export_df, "v1", 0)
+    untouched = tuple(old.df.iloc[100][KEY_COLS])
+    edited = tuple(old.df.iloc[0][KEY_COLS])
+    old.figure(*untouched, "chart", lambda: "kept")
+    old.figure(*edited, "chart", lambda: "dropped")
+
+    snapshot, _ = old.apply(_edited(old.df)[0], "v2", 1)
+
+    assert snapshot.figures == {(*untouched, "chart"): "kept"}
+
+
+def test_apply_with_a_new_schema_rebuilds(export_df):
+    old = Snapshot.build(export_df, "v1", 0)
+    snapshot, affected = old.apply(export_df.assign(Extra=1), "v2", 1)
+    assert affected is None
+    assert 'Extra' in snapshot.df.columns
+
+
+def test_refresh_keeps_the_last_good_snapshot(tmp_path, data_path):
+    path = tmp_path / "export.csv"
+    path.write_bytes(open(data_path, "rb").read())
+    live = LiveDataset(str(path), interval=60)
+    good = live.current
+
+    # Half-written file: the header is cut off mid-column
+    path.write_text("School\tCol")
+    assert live.refresh() is False
+    assert live.current is good
+    assert live.last_error is not None
+
+    df = load_export(data_path)[0]
+    df.loc[df.index[0], 'Applied'] += 1
+    df.to_csv(path, sep="\t", index=False)
+    assert live.refresh() is True
+    assert live.current.version != good.version
+    assert live.last_error is None
+    assert live.last_changes == {tuple(df.iloc[0][KEY_COLS])}
+
+
+def test_refresh_survives_unexpected_errors(tmp_path, data_path, monkeypatch):
+    path = tmp_path / "export.csv"
+    path.write_bytes(open(data_path, "rb").read())
+    live = LiveDataset(str(path), interval=60)
+    good = live.current
+
+    def broken(path):
+        raise KeyError("Applied")
+    monkeypatch.setattr(data_store, "load_export", broken)
+    path.write_bytes(open(data_path, "rb").read() + b"\n")
+    assert live.refresh() is False
+    assert live.current is good
+    assert isinstance(live.last_error[1], KeyError)
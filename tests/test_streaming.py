@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+import streaming
+from data_store import filter_rankings, load_export, sniff_separator
+from streaming import build_aggregates, find_rows, row_offsets
+
+
+@pytest.fixture(params=[1, 7, 1024])
+def aggregates(request, data_path):
+    agg = build_aggregates(data_path, chunk_rows=100)
+    agg.stride = request.param
+    agg.offsets = row_offsets(data_path, agg.stride)
+    return agg
+
+
+def test_school_rows_match_a_scan(aggregates, data_path, monkeypatch):
+    agg = aggregates
+    monkeypatch.setattr(streaming, 'find_rows', lambda *args: pytest.fail("fell back to a scan"))
+    for school in sorted(agg.positions)[::10]:
+        pd.testing.assert_frame_equal(agg.school_rows(school), find_rows(data_path, school))
+        for college in agg.positions[school]:
+            pd.testing.assert_frame_equal(agg.school_rows(school, college), find_rows(data_path, school, college))
+    assert len(agg.school_rows("No Such School")) == 0
+
+
+def test_school_rows_fall_back_when_lines_shift(tmp_path, data_path):
+    raw = pd.read_csv(data_path, sep=sniff_separator(data_path))
+    raw.loc[0, 'City'] = "Line\nBreak"
+    path = tmp_path / "export.csv"
+    raw.to_csv(path, index=False)
+    agg = build_aggregates(str(path), chunk_rows=100)
+    school = raw.loc[len(raw) - 1, 'School']
+    pd.testing.assert_frame_equal(agg.school_rows(school), find_rows(str(path), school))
+
+
+def test_tied_rankings_match_in_memory_order(tmp_path, data_path):
+    raw = pd.read_csv(data_path, sep=sniff_separator(data_path))
+    copies = [raw.assign(School=raw['School'] + f" #{n}") for n in range(3)]
+    tied = pd.concat(copies, ignore_index=True).sample(frac=1, random_state=0)
+    path = tmp_path / "tied.csv"
+    tied.to_csv(path, index=False)
+
+    df, _ = load_export(str(path))
+    agg = build_aggregates(str(path), chunk_rows=50)
+    for college, school_type, city in [("All UC", "All", "All Cities"), ("UCLA", "All", "All Cities"),
+                                       ("UCSD", "Public", "All Cities")]:
+        expected = filter_rankings(df, college, school_type, city)
+        streamed = agg.leaderboard(college, school_type, city)
+        assert list(streamed['School']) == list(expected['School'])
@@ -0,0 +1,58 @@
+import threading
+
+from view_state import ResultCache, decode_view, encode_view, view_signature
+
+
+def test_default_view_adds_nothing_to_the_url():
+    state = {'pivot_rows': ["County"], 'pivot_columns': [], 'pivot_measure': "Applied", 'uc_filter': "All UC"}
+    assert encode_view(state) == {}
+    assert view_signature('pivot', pivot_rows=["County"], pivot_measure="Applied") == ('pivot', ())
+
+
+def test_view_round_trips_through_the_url():
+    state = {'pivot_rows': ["City", "County"], 'pivot_measure': "Schools", 'uc_filter': "UCLA"}
+    assert decode_view(encode_view(state)) == state
+
+
+def test_revalidate_serves_latest_of_lineage_then_fresh_value():
+    cache = ResultCache()
+    old_key = ('v1', view_signature('rankings', uc_filter="UCLA"))
+    new_key = ('v1', view_signature('rankings', uc_filter="UCSD"))
+    cache.get_or_compute(old_key, lambda: "ucla", lineage='rankings')
+
+    release = threading.Event()
+    built = threading.Event()
+
+    def build():
+        release.wait(5)
+        built.set()
+        return "ucsd"
+
+    value, stale_key = cache.get_or_revalidate(new_key, 'rankings', build)
+    assert (value, stale_key) == ("ucla", old_key)
+    assert cache.stale_hits == 1
+
+    # A second caller does not start another build
+    assert cache.get_or_revalidate(new_key, 'rankings', lambda: "again")[1] == old_key
+
+    release.set()
+    assert built.wait(5)
+    for _ in range(100):
+        value, stale_key = cache.get_or_revalidate(new_key, 'rankings', build)
+        if stale_key is None:
+            break
+        threading.Event().wait(0.01)
+    assert (value, stale_key) == ("ucsd", None)
+
+
+def test_revalidate_without_a_stale_value_builds_in_place():
+    cache = ResultCache()
+    assert cache.get_or_revalidate(('v1', 'pivot'), 'pivot', lambda: 42) == (42, None)
+    assert cache.get_or_revalidate(('v2', 'pivot'), 'other', lambda: 7) == (7, None)
+
+
+def test_evicting_the_latest_drops_its_lineage():
+    cache = ResultCache(max_entries=1)
+    cache.get_or_compute('a', lambda: 1, lineage='view')
+    cache.get_or_compute('b', lambda: 2)
+    assert cache.get_or_revalidate('c', 'view', lambda: 3) == (3, None)
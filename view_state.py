@@ -0,0 +1,228 @@
+"""
+Shareable view state and a cross-session result cache for the dashboard
+
+Filter and selection widgets are mirrored into the URL query string, so any
+view can be shared as a link. Results computed for a view (filtered frames,
+rendered card HTML, figures) are stored in one process-wide cache keyed by the
+dataset version and a normalised view signature, so sessions opening the same
+link reuse one computation instead of repeating it.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+RESULT_CACHE_SIZE = 256
+
+# Widget key -> (query parameter, default); list-valued widgets default to [] (pivot rows
+# need at least one dimension)
+VIEW_PARAMS = {
+    'dataset': ('dataset', None),
+    'year': ('year', "Current"),
+    'uc_filter': ('campus', "All UC"),
+    'type_filter': ('type', "All"),
+    'city_filter': ('city', "All Cities"),
+    'detail_uc': ('detail_campus', None),
+    'detail_school': ('school', None),
+    'compare_uc': ('compare_campus', "All UC"),
+    'compare_schools': ('compare', []),
+    'analytics_uc': ('analytics_campus', "All UC"),
+    'county_metric': ('map', "Admit Rate"),
+    'pivot_rows': ('rows', ["County"]),
+    'pivot_columns': ('cols', []),
+    'pivot_measure': ('measure', "Applied"),
+    'pivot_campus': ('pivot_campus', "All UC"),
+}
+
+
+def decode_view(query):
+    """Widget values from query parameters: {widget key: value}
+
+    ``query`` maps parameter names to lists of values (as returned by
+    ``st.query_params.to_dict()`` for repeated keys or ``parse_qs``), or to
+    plain strings.
+    """
+    state = {}
+    for key, (param, default) in VIEW_PARAMS.items():
+        if param not in query:
+            continue
+        values = query[param]
+        values = [values] if isinstance(values, str) else list(values)
+        state[key] = values if isinstance(default, list) else values[-1]
+    return state
+
+
+def encode_view(state):
+    """Query parameters for the non-default widget values in ``state``"""
+    query = {}
+    for key, (param, default) in VIEW_PARAMS.items():
+        value = state.get(key)
+        if value is None or value == default:
+            continue
+        query[param] = list(value) if isinstance(default, list) else str(value)
+    return query
+
+
+def view_signature(scope, **values):
+    """Normalised, hashable cache key for one view of the data
+
+    Values equal to their default are dropped and sequences become tuples, so
+    equivalent views map to the same key.
+    """
+    defaults = {key: default for key, (_, default) in VIEW_PARAMS.items()}
+    items = []
+    for name, value in sorted(values.items()):
+        if name in defaults and value == defaults[name]:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = tuple(value)
+        items.append((name, value))
+    return (scope, tuple(items))
+
+
+class _Pending:
+    """A computation in progress that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResultCache:
+    """Bounded LRU of view results that coalesces concurrent computations
+
+    When several sessions ask for the same key at once, one of them builds the
+    value and the others wait for it. Failed builds are not cached; the error
+    is raised in every waiting caller. With a ``sizer``, entry sizes are
+    tracked so memory budgets can inspect and shrink the cache. Values stored
+    with a ``lineage`` (a view across dataset versions and selections) can be
+    served stale while their next version is built.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, sizer=None):
+        self.max_entries = max_entries
+        self.sizer = sizer
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._pending = {}
+        self._latest = {}
+        self._lineages = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get_or_compute(self, key, builder, admit=None, lineage=None):
+        """Return the cached value for ``key``, building it once if missing
+
+        ``admit(size)`` can veto keeping a freshly built value (it is still
+        returned to the caller and to anyone waiting on it). A kept value
+        becomes the latest of its ``lineage``.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = builder()
+        except BaseException as e:
+            pending.error = e
+            raise
+        else:
+            size = self.sizer(pending.value) if self.sizer is not None else 0
+            if admit is None or admit(size):
+                with self._lock:
+                    self._entries[key] = pending.value
+                    self._sizes[key] = size
+                    self.bytes += size
+                    if lineage is not None:
+                        self._latest[lineage] = key
+                        self._lineages[key] = lineage
+                    while len(self._entries) > self.max_entries:
+                        self._evict_oldest()
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.done.set()
+        return pending.value
+
+    def get_or_revalidate(self, key, lineage, builder, admit=None):
+        """(value, stale key): the cached value for ``key``, or else the latest of its lineage
+
+        A stale value is returned at once, with the key it was stored under,
+        while ``key`` is built in the background; ``builder`` then runs in
+        another thread, so it must not touch per-session state. Without a
+        stale value this is ``get_or_compute()`` and the stale key is None.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key], None
+            stale_key = self._latest.get(lineage)
+            stale = stale_key in self._entries
+            if stale:
+                value = self._entries[stale_key]
+                self.stale_hits += 1
+                refresh = key not in self._pending
+        if not stale:
+            return self.get_or_compute(key, builder, admit, lineage), None
+        if refresh:
+            threading.Thread(target=self._revalidate, args=(key, builder, admit, lineage), daemon=True).start()
+        return value, stale_key
+
+    def _revalidate(self, key, builder, admit, lineage):
+        try:
+            self.get_or_compute(key, builder, admit, lineage)
+        except Exception:
+            pass  # Not cached; the next caller builds it again
+
+    def _evict_oldest(self):
+        key, _ = self._entries.popitem(last=False)
+        size = self._sizes.pop(key, 0)
+        self.bytes -= size
+        lineage = self._lineages.pop(key, None)
+        if lineage is not None and self._latest.get(lineage) == key:
+            del self._latest[lineage]
+        return size
+
+    def entry_bytes(self, key):
+        """Tracked size of a cached entry, or None when it is not cached"""
+        with self._lock:
+            return self._sizes.get(key)
+
+    def shrink(self, nbytes):
+        """Evict least recently used entries until ``nbytes`` are freed"""
+        freed = 0
+        with self._lock:
+            while freed < nbytes and self._entries:
+                freed += self._evict_oldest()
+        return freed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._latest.clear()
+            self._lineages.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)